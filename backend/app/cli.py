@@ -0,0 +1,87 @@
+"""
+Comandos de manutenção executados fora do servidor.
+
+Uso (dentro da pasta backend):
+    python -m app.cli resumo              # confere o resumo do dashboard
+    python -m app.cli resumo --reconstruir
+    python -m app.cli importar pedidos.csv   # ou .ndjson
+    python -m app.cli miniaturas          # gera as miniaturas das artes antigas
+"""
+
+import argparse
+from pathlib import Path
+
+from sqlmodel import Session
+
+from .config import create_db_and_tables, engine
+from .services.dashboard_service import dashboard_service
+from .services.importacao_service import importacao_service
+from .utils.imagem import generate_missing_variants
+
+
+def cmd_resumo(args: argparse.Namespace) -> int:
+    """Confere (e opcionalmente reconstrói) os resumos do dashboard, por status e por dia."""
+    with Session(engine) as session:
+        if args.reconstruir:
+            dashboard_service.rebuild_summary(session)
+            print("Resumo do dashboard reconstruído.")
+            return 0
+
+        divergencias = dashboard_service.check_summary(session)
+        if not divergencias:
+            print("Resumo do dashboard consistente.")
+            return 0
+
+        print("Divergências encontradas:")
+        for linha in divergencias:
+            print(f"  {linha}")
+        print("Use --reconstruir para corrigir.")
+        return 1
+
+
+def cmd_importar(args: argparse.Namespace) -> int:
+    """Importa pedidos de um arquivo CSV ou NDJSON."""
+    caminho = Path(args.arquivo)
+    formato = "csv" if caminho.suffix.lower() == ".csv" else "ndjson"
+
+    with Session(engine) as session, open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        resultado = importacao_service.import_file(session, arquivo, formato)
+
+    print(f"Pedidos importados: {resultado.importados}")
+    for erro in resultado.erros:
+        print(f"  Linha {erro.linha}: {erro.detalhe}")
+    return 1 if resultado.erros else 0
+
+
+def cmd_miniaturas(_: argparse.Namespace) -> int:
+    """Gera as miniaturas que faltam nas artes convertidas antes delas existirem."""
+    print(f"Artes com miniaturas geradas: {generate_missing_variants()}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    resumo = subparsers.add_parser("resumo", help="Confere o resumo do dashboard")
+    resumo.add_argument(
+        "--reconstruir", action="store_true", help="Recria o resumo a partir dos pedidos"
+    )
+    resumo.set_defaults(func=cmd_resumo)
+
+    importar = subparsers.add_parser("importar", help="Importa pedidos em lote")
+    importar.add_argument("arquivo", help="Arquivo .csv ou .ndjson")
+    importar.set_defaults(func=cmd_importar)
+
+    miniaturas = subparsers.add_parser(
+        "miniaturas", help="Gera as miniaturas que faltam nas artes já convertidas"
+    )
+    miniaturas.set_defaults(func=cmd_miniaturas)
+
+    args = parser.parse_args()
+    create_db_and_tables()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
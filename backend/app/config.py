@@ -1,8 +1,19 @@
+import os
+from collections.abc import Callable
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any, TypeVar
 
+from dotenv import load_dotenv
 from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
 from sqlmodel import Session, SQLModel, create_engine, text  # type: ignore
+from starlette.concurrency import run_in_threadpool
+
+from .utils.busca import configurar_fts
+
+load_dotenv()
 
 # Define o caminho dos arquivos e pastas
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -13,17 +24,108 @@ BACKUP_DIR = BASE_DIR / "backups"
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 FRONTEND_DIST_DIR = Path(__file__).resolve().parent.parent.parent / "frontend" / "dist"
 
+# Cache de respostas das listagens e do dashboard
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+
+# Processos usados na conversão das artes enviadas
+ARTE_WORKERS = int(os.getenv("ARTE_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+# Lado máximo opcional da arte convertida. Com 0 (padrão) a arte guarda a resolução
+# original, que é a usada na produção; as telas usam as miniaturas
+ARTE_MAX_DIMENSAO = int(os.getenv("ARTE_MAX_DIMENSAO", "0"))
+
+# Quantas execuções do mesmo SELECT em uma requisição indicam um possível N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Backups automáticos: intervalo (0 desativa) e quantos manter em cada faixa de retenção
+BACKUP_INTERVAL_MINUTES = int(os.getenv("BACKUP_INTERVAL_MINUTES", "60"))
+BACKUP_KEEP_HOURLY = int(os.getenv("BACKUP_KEEP_HOURLY", "24"))
+BACKUP_KEEP_DAILY = int(os.getenv("BACKUP_KEEP_DAILY", "7"))
+BACKUP_KEEP_WEEKLY = int(os.getenv("BACKUP_KEEP_WEEKLY", "8"))
+
 db_name = "gestor.db"
 db_path = DB_DIR / db_name
 db_url = f"sqlite:///{db_path}"
 
+DEBUG = os.getenv("DEBUG", "false").lower() in ("1", "true", "sim")
+
+# Perfis de ajuste do SQLite aplicados em cada nova conexão.
+# 'producao' usa WAL para que leituras não fiquem bloqueadas por escritas
+# e 'busy_timeout' para esperar o lock em vez de falhar com "database is locked".
+SQLITE_PROFILES: dict[str, dict[str, str | int]] = {
+    "producao": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": 5000,
+        "cache_size": -64000,  # Negativo = KiB (64 MB)
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+    },
+    "desenvolvimento": {
+        "busy_timeout": 5000,
+    },
+}
+DB_PROFILE = os.getenv("DB_PROFILE", "producao")
+if DB_PROFILE not in SQLITE_PROFILES:
+    raise ValueError(
+        f"DB_PROFILE inválido: '{DB_PROFILE}'. Use um de: {', '.join(SQLITE_PROFILES)}"
+    )
+
+# Mesmo número de threads do threadpool do FastAPI, para que cada
+# requisição síncrona consiga uma conexão sem esperar na fila do pool
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "40"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(THREADPOOL_SIZE)))
+
 connect_args = {"check_same_thread": False}
-engine = create_engine(db_url, echo=True, connect_args=connect_args)
+engine = create_engine(
+    db_url,
+    echo=os.getenv("DB_ECHO", str(DEBUG)).lower() in ("1", "true", "sim"),
+    connect_args=connect_args,
+    poolclass=QueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=10,
+    pool_timeout=30,
+)
 
 
-def run_migrations():
+@event.listens_for(engine, "connect")
+def aplicar_pragmas(dbapi_connection, _connection_record):
+    """Aplica os PRAGMAs do perfil escolhido em cada conexão aberta pelo pool."""
+    cursor = dbapi_connection.cursor()
+    for pragma, valor in SQLITE_PROFILES[DB_PROFILE].items():
+        cursor.execute(f"PRAGMA {pragma}={valor}")
+    cursor.close()
+
+
+# Caminho assíncrono opcional: com DB_ASYNC as rotas usam uma AsyncSession (aiosqlite)
+# e não ocupam uma thread do threadpool enquanto esperam o banco.
+# Requer as dependências opcionais 'async' (uv sync --extra async)
+DB_ASYNC = os.getenv("DB_ASYNC", "false").lower() in ("1", "true", "sim")
+
+async_engine: Any = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{db_path}",
+        echo=engine.echo,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=10,
+        pool_timeout=30,
+    )
+    event.listen(async_engine.sync_engine, "connect", aplicar_pragmas)
+
+
+def _coluna_ja_existe(erro: OperationalError) -> bool:
+    """A migração já rodou antes: o SQLite recusa adicionar a coluna de novo."""
+    return "duplicate column name" in str(erro.orig)
+
+
+def run_migrations(engine: Any = engine):
     """
-    PLACEHOLDER: Função para migrações manuais de banco de dados.
+    Migrações manuais de banco de dados: colunas novas em tabelas que já existiam
+    (o create_all só cria tabelas novas).
     """
     with Session(engine) as session:  # type: ignore
         # --- Modelo de uso ---
@@ -33,17 +135,164 @@ def run_migrations():
             # print("Mensagem personalizada")
         # except Exception:
             # session.rollback()  # Dá rollback se a coluna já existir
-        pass
 
+        # Quantidade de itens e subtotal desnormalizados no pedido
+        try:
+            session.connection().execute(
+                text("ALTER TABLE pedido ADD COLUMN qtd_itens INTEGER NOT NULL DEFAULT 0")
+            )
+            session.connection().execute(
+                text("ALTER TABLE pedido ADD COLUMN subtotal NUMERIC(10, 2) NOT NULL DEFAULT 0")
+            )
+            # Preenche os pedidos existentes a partir dos itens
+            session.connection().execute(
+                text(
+                    "UPDATE pedido SET "
+                    "qtd_itens = (SELECT count(*) FROM item_pedido WHERE pedido_id = pedido.id), "
+                    "subtotal = coalesce((SELECT round(sum(preco_unitario * quantidade), 2) "
+                    "FROM item_pedido WHERE pedido_id = pedido.id), 0)"
+                )
+            )
+            session.commit()
+            print("Colunas 'qtd_itens' e 'subtotal' adicionadas aos pedidos.")
+        except OperationalError as e:
+            session.rollback()
+            if not _coluna_ja_existe(e):
+                raise
+
+        # Unidades do pedido (resumo diário do dashboard)
+        try:
+            session.connection().execute(
+                text("ALTER TABLE pedido ADD COLUMN qtd_unidades INTEGER NOT NULL DEFAULT 0")
+            )
+            session.connection().execute(
+                text(
+                    "UPDATE pedido SET qtd_unidades = coalesce("
+                    "(SELECT sum(quantidade) FROM item_pedido WHERE pedido_id = pedido.id), 0)"
+                )
+            )
+            session.commit()
+            print("Coluna 'qtd_unidades' adicionada aos pedidos.")
+        except OperationalError as e:
+            session.rollback()
+            if not _coluna_ja_existe(e):
+                raise
 
-def create_db_and_tables():
+        # Índices das chaves estrangeiras e dos filtros combinados de pedidos.
+        # O create_all só cria índices junto com as tabelas novas
+        for comando in (
+            "CREATE INDEX IF NOT EXISTS ix_pedido_cliente_id ON pedido (cliente_id)",
+            "CREATE INDEX IF NOT EXISTS ix_item_pedido_produto_id ON item_pedido (produto_id)",
+            (
+                "CREATE INDEX IF NOT EXISTS ix_pedido_status_data_pedido "
+                "ON pedido (status, data_pedido)"
+            ),
+            "CREATE INDEX IF NOT EXISTS ix_pedido_status_total ON pedido (status, total)",
+            # Coberto pelos índices compostos, que começam pelo status
+            "DROP INDEX IF EXISTS ix_pedido_status",
+        ):
+            session.connection().execute(text(comando))
+        session.commit()
+
+        # Mês e dia de nascimento indexados (aniversariantes)
+        try:
+            session.connection().execute(
+                text("ALTER TABLE cliente ADD COLUMN mes_nascimento INTEGER")
+            )
+            session.connection().execute(
+                text("ALTER TABLE cliente ADD COLUMN dia_nascimento INTEGER")
+            )
+            session.connection().execute(
+                text(
+                    "UPDATE cliente SET "
+                    "mes_nascimento = CAST(strftime('%m', data_nascimento) AS INTEGER), "
+                    "dia_nascimento = CAST(strftime('%d', data_nascimento) AS INTEGER) "
+                    "WHERE data_nascimento IS NOT NULL"
+                )
+            )
+            session.connection().execute(
+                text(
+                    "CREATE INDEX IF NOT EXISTS ix_cliente_aniversario "
+                    "ON cliente (mes_nascimento, dia_nascimento)"
+                )
+            )
+            session.commit()
+            print("Colunas 'mes_nascimento' e 'dia_nascimento' adicionadas aos clientes.")
+        except OperationalError as e:
+            session.rollback()
+            if not _coluna_ja_existe(e):
+                raise
+
+
+def create_db_and_tables(engine: Any = engine):
+    """Cria as tabelas novas e atualiza o banco (o da aplicação ou outro, como um
+    backup antes de ser restaurado) para o esquema atual."""
     SQLModel.metadata.create_all(engine)
-    run_migrations()
+    run_migrations(engine)
+
+    # Índices de busca textual (mantidos por triggers no próprio banco)
+    with engine.begin() as connection:
+        configurar_fts(connection)
 
 
 def get_session():
-    with Session(engine) as session:
+    # As requisições terminam logo depois do commit: sem expirar os objetos, a resposta
+    # é montada com o que já está carregado, sem um novo SELECT por registro alterado
+    with Session(engine, expire_on_commit=False) as session:
         yield session
 
 
 SessionDep = Annotated[Session, Depends(get_session)]
+
+T = TypeVar("T")
+
+
+class Banco:
+    """
+    Acesso ao banco de uma requisição nas rotas 'async def'.
+    Como no 'get_session', os objetos não expiram no commit.
+
+    'run' executa uma função síncrona que recebe a Session, então os serviços são os
+    mesmos nos dois modos. Com DB_ASYNC ela roda sobre a AsyncSession: o SQLAlchemy
+    executa o código síncrono em um greenlet e cada query espera o aiosqlite sem
+    bloquear o event loop nem ocupar o threadpool. Sem DB_ASYNC, roda no threadpool,
+    como uma rota síncrona.
+    """
+
+    def __init__(self, engine: Any = engine, async_engine: Any = async_engine):
+        self._engine = engine
+        self._async_engine = async_engine
+        self._session: Any = None
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Executa 'func(session, *args)'. Serialize a resposta dentro de 'func' quando ela
+        acessar relações ainda não carregadas (lazy load só funciona dentro do 'run')."""
+        if self._async_engine is not None:
+            if self._session is None:
+                from sqlmodel.ext.asyncio.session import AsyncSession
+
+                self._session = AsyncSession(self._async_engine, expire_on_commit=False)
+            return await self._session.run_sync(func, *args)
+
+        if self._session is None:
+            self._session = Session(self._engine, expire_on_commit=False)
+        return await run_in_threadpool(func, self._session, *args)
+
+    async def close(self) -> None:
+        if self._session is None:
+            return
+        if self._async_engine is not None:
+            await self._session.close()
+        else:
+            await run_in_threadpool(self._session.close)
+
+
+async def get_banco():
+    banco = Banco()
+    try:
+        yield banco
+    finally:
+        await banco.close()
+
+
+BancoDep = Annotated[Banco, Depends(get_banco)]
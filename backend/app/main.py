@@ -1,21 +1,45 @@
+import asyncio
 import os
+import time
 from contextlib import asynccontextmanager
 
+from anyio import to_thread
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
-
-from .config import FRONTEND_DIST_DIR, UPLOAD_DIR, create_db_and_tables
+from fastapi.responses import JSONResponse
+from sqlmodel import Session
+
+from .config import (
+    BACKUP_INTERVAL_MINUTES,
+    FRONTEND_DIST_DIR,
+    THREADPOOL_SIZE,
+    UPLOAD_DIR,
+    async_engine,
+    create_db_and_tables,
+    engine,
+)
 from .routers import (
+    backup_router,
+    cache_router,
     clientes_router,
     dashboard_router,
+    jobs_router,
+    metricas_router,
     pedidos_router,
     produtos_router,
-    backup_router,
 )
+from .services.arte_service import arte_service
+from .services.backup_service import backup_service
+from .services.dashboard_service import dashboard_service
+from .utils.metricas import (
+    MetricasRequisicao,
+    instrumentar_engine,
+    registro_metricas,
+    requisicao_atual,
+)
+from .utils.static import FrontendEstatico, UploadStaticFiles
 
 load_dotenv()
 origin = os.getenv("FRONT_URL")
@@ -25,14 +49,65 @@ origin = os.getenv("FRONT_URL")
 # Cria o banco apenas uma vez, se ainda não existir
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Alinha o threadpool das rotas síncronas com o tamanho do pool de conexões
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
     print("Verificando integridade do banco de dados...")
     create_db_and_tables()
+    with Session(engine) as session:
+        dashboard_service.ensure_summary(session)
+    arte_service.backfill_variants()
+
+    agendador = None
+    if BACKUP_INTERVAL_MINUTES > 0:
+        agendador = asyncio.create_task(backup_service.run_schedule(BACKUP_INTERVAL_MINUTES))
     yield
     print("Encerrando...")
+    if agendador:
+        agendador.cancel()
+    arte_service.shutdown()
+    engine.dispose()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 
 app = FastAPI(lifespan=lifespan)
 
+# Conta queries e tempo de banco de cada requisição (ver medir_requisicao)
+instrumentar_engine(engine)
+if async_engine is not None:
+    instrumentar_engine(async_engine.sync_engine)
+
+
+@app.middleware("http")
+async def medir_requisicao(request: Request, call_next):
+    """Mede a duração, o tempo no banco e as queries de cada requisição,
+    alimentando o /metrics e o cabeçalho Server-Timing."""
+    metricas = MetricasRequisicao()
+    token = requisicao_atual.set(metricas)
+    inicio = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        requisicao_atual.reset(token)
+    duracao = time.perf_counter() - inicio
+
+    # Usa o caminho da rota (ex: /pedidos/{pedido_id}) para não criar uma série por ID
+    rota = getattr(request.scope.get("route"), "path", "desconhecida")
+    registro_metricas.registrar(
+        request.method, rota, response.status_code, duracao, metricas
+    )
+
+    for comando, vezes in metricas.suspeitas_n_mais_1():
+        comando = " ".join(comando.split())[:200]
+        print(f"Possível N+1 em {request.method} {rota}: {vezes}x {comando}")
+
+    response.headers["Server-Timing"] = (
+        f'db;dur={metricas.tempo_db * 1000:.1f};desc="{metricas.queries} queries", '
+        f"total;dur={duracao * 1000:.1f}"
+    )
+    return response
+
 
 @app.exception_handler(RequestValidationError)
 def validation_exception_handler(_request: Request, exc: RequestValidationError):
@@ -79,7 +154,7 @@ def validation_exception_handler(_request: Request, exc: RequestValidationError)
     )
 
 
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
 
 app.add_middleware(
     CORSMiddleware,
@@ -87,6 +162,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # O frontend lê o id da tarefa criada pelo upload de arte
+    expose_headers=["X-Job-Id", "Location"],
 )
 
 app.include_router(clientes_router)
@@ -94,21 +171,15 @@ app.include_router(produtos_router)
 app.include_router(pedidos_router)
 app.include_router(dashboard_router)
 app.include_router(backup_router)
+app.include_router(cache_router)
+app.include_router(jobs_router)
+app.include_router(metricas_router)
 
 if FRONTEND_DIST_DIR.exists():
-    # Serve a pasta 'assets' (JS e CSS compilados)
-    app.mount(
-        "/assets", StaticFiles(directory=FRONTEND_DIST_DIR / "assets"), name="assets"
-    )
-
-    # Serve o frontend e resolve as rotas do React
-    @app.get("/{catchall:path}")
-    def serve_react_app(catchall: str):
-        file_path = FRONTEND_DIST_DIR / catchall
-
-        # Se for um arquivo real que existe na pasta, serve ele
-        if file_path.is_file():
-            return FileResponse(file_path)
+    # Resolve os arquivos do build (e as versões .br/.gz) uma única vez
+    frontend = FrontendEstatico(FRONTEND_DIST_DIR)
 
-        # Se não, devolve o index.html e deixa o React Router assumir
-        return FileResponse(FRONTEND_DIST_DIR / "index.html")
+    # Serve o frontend (inclusive a pasta 'assets') e resolve as rotas do React
+    @app.get("/{catchall:path}", include_in_schema=False)
+    async def serve_react_app(catchall: str, request: Request):
+        return frontend.response(catchall, request)
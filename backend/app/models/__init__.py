@@ -1,19 +1,34 @@
 # Centraliza os imports das models e schemas
+from .backup import BackupPublic
 from .cliente import (
     Cliente,
+    ClienteAniversariante,
+    ClienteAniversariantePaginated,
     ClienteCreate,
     ClientePublic,
     ClientePublicPaginated,
     ClienteUpdate,
 )
-from .dashboard import DashboardResponse, DashboardStats
+from .dashboard import (
+    DashboardResponse,
+    DashboardStats,
+    PontoSerie,
+    ResumoDiario,
+    ResumoStatus,
+    SerieResponse,
+)
+from .importacao import ErroImportacao, ImportacaoResultado
 from .item_pedido import ItemPedido, ItemPedidoPublic, ItemPedidoUpdate
+from .job import JobPublic, StatusJob
 from .pedido import (
     ItemPedidoInput,
+    OperacaoItem,
     Pedido,
     PedidoCreate,
     PedidoPublic,
     PedidoPublicPaginated,
+    PedidoResumoPaginated,
+    PedidoResumoPublic,
     PedidoUpdate,
     StatusPedido,
 )
@@ -28,6 +43,8 @@ from .produto import (
 # Exporta a lista para conferência
 __all__ = [
     "Cliente",
+    "ClienteAniversariante",
+    "ClienteAniversariantePaginated",
     "ClienteCreate",
     "ClientePublic",
     "ClientePublicPaginated",
@@ -41,12 +58,24 @@ __all__ = [
     "PedidoCreate",
     "PedidoPublic",
     "PedidoPublicPaginated",
+    "PedidoResumoPublic",
+    "PedidoResumoPaginated",
     "PedidoUpdate",
     "StatusPedido",
     "ItemPedido",
     "ItemPedidoPublic",
     "ItemPedidoUpdate",
     "ItemPedidoInput",
+    "OperacaoItem",
     "DashboardResponse",
     "DashboardStats",
+    "ResumoStatus",
+    "ResumoDiario",
+    "PontoSerie",
+    "SerieResponse",
+    "ErroImportacao",
+    "ImportacaoResultado",
+    "JobPublic",
+    "StatusJob",
+    "BackupPublic",
 ]
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from sqlmodel import SQLModel
+
+
+class BackupPublic(SQLModel):
+    nome: str
+    tamanho: int
+    criado_em: datetime
+    comprimido: bool
+    # Resultado do PRAGMA integrity_check (None enquanto não verificado)
+    integro: bool | None = None
+    verificado_em: datetime | None = None
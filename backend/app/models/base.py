@@ -1,19 +1,44 @@
-from datetime import datetime, timezone
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import func
+from sqlalchemy import Numeric, event, func, inspect
+from sqlalchemy.orm import Mapper
 from sqlmodel import Field, SQLModel
 
 
 class TimestampMixin(SQLModel):
     created_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
+        default_factory=lambda: datetime.now(UTC),
         sa_column_kwargs={"server_default": func.now()},
     )
 
+    # Atualizado pelo Python (e não pelo CURRENT_TIMESTAMP do SQLite, que só tem segundos)
+    # para que duas alterações no mesmo segundo gerem ETags diferentes
     updated_at: datetime = Field(
-        default_factory=lambda: datetime.now(timezone.utc),
+        default_factory=lambda: datetime.now(UTC),
         sa_column_kwargs={
-            "onupdate": func.now(),
+            "onupdate": lambda: datetime.now(UTC),
             "server_default": func.now(),
         },
     )
+
+
+@event.listens_for(Mapper, "before_insert")
+@event.listens_for(Mapper, "before_update")
+def normalizar_decimais(mapper: Mapper, _connection: Any, target: Any) -> None:
+    """
+    Deixa os valores das colunas Numeric como o banco os devolve (Decimal com as casas
+    da coluna: 10 vira 10.00). As sessões das requisições não expiram os objetos no
+    commit, então a resposta sai desses valores, e não de uma nova leitura do registro.
+    """
+    valores = inspect(target).dict
+    for atributo in mapper.column_attrs:
+        tipo = atributo.columns[0].type
+        valor = valores.get(atributo.key)
+        if valor is None or not isinstance(tipo, Numeric) or tipo.scale is None:
+            continue
+        if isinstance(valor, Decimal) and valor.as_tuple().exponent == -tipo.scale:
+            continue
+        casas = Decimal(1).scaleb(-tipo.scale)
+        setattr(target, atributo.key, Decimal(str(valor)).quantize(casas))
@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING, Any
 
 from pydantic import EmailStr, field_validator
 from pydantic_extra_types.phone_numbers import PhoneNumber
+from sqlalchemy import Index, event
 from sqlmodel import Field, Relationship, SQLModel  # type: ignore
 
 from .base import TimestampMixin
@@ -44,11 +45,32 @@ class ClienteBase(TimestampMixin, SQLModel):
 
 
 class Cliente(ClienteBase, table=True):
+    __table_args__ = (
+        Index("ix_cliente_aniversario", "mes_nascimento", "dia_nascimento"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
+
+    # Mês e dia do nascimento em colunas indexadas: o SQLite não usa índice em
+    # extract('month', data_nascimento). Mantidos por 'sincronizar_aniversario'
+    mes_nascimento: int | None = Field(default=None)
+    dia_nascimento: int | None = Field(default=None)
+
     # Relacionamento um para muitos com pedidos
     pedidos: list["Pedido"] = Relationship(back_populates="cliente")
 
 
+# Na gravação, e não nos validadores: as models de tabela não validam no
+# 'sqlmodel_update' usado pelas atualizações parciais
+@event.listens_for(Cliente, "before_insert")
+@event.listens_for(Cliente, "before_update")
+def sincronizar_aniversario(_mapper: Any, _connection: Any, target: Cliente) -> None:
+    """Copia o mês e o dia da data de nascimento para as colunas indexadas."""
+    nascimento = target.data_nascimento
+    target.mes_nascimento = nascimento.month if nascimento else None
+    target.dia_nascimento = nascimento.day if nascimento else None
+
+
 class ClienteCreate(ClienteBase):
     pass
 
@@ -62,6 +84,22 @@ class ClientePublicPaginated(SQLModel):
     total: int
 
 
+class ClienteAniversariante(SQLModel):
+    """Só as colunas usadas na lista de próximos aniversários."""
+
+    id: int
+    nome: str
+    telefone: str | None = None
+    data_nascimento: date
+    proximo_aniversario: date
+    dias_restantes: int
+
+
+class ClienteAniversariantePaginated(SQLModel):
+    dados: list[ClienteAniversariante]
+    total: int
+
+
 class ClienteUpdate(SQLModel):
     nome: str | None = None
     telefone: TelefoneBR | None = Field(default=None, max_length=20)
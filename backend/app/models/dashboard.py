@@ -1,9 +1,57 @@
+from datetime import date
 from decimal import Decimal
+from enum import Enum
+from typing import Any, Literal
 
-from sqlmodel import SQLModel
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Field, Session, SQLModel
 
 from .cliente import ClientePublic
-from .pedido import PedidoPublic
+from .pedido import Pedido, PedidoResumoPublic
+
+
+class ResumoStatus(SQLModel, table=True):
+    """Contagem e soma dos pedidos por status, mantida a cada flush de pedidos."""
+
+    __tablename__ = "resumo_status"  # type: ignore
+
+    status: str = Field(primary_key=True)
+    quantidade: int = 0
+    total: Decimal = Field(default=0.0, max_digits=14, decimal_places=2)
+
+
+class ResumoDiario(SQLModel, table=True):
+    """
+    Pedidos, faturamento e unidades por dia do pedido e status, mantido a cada flush de
+    pedidos como o resumo por status. Responde às séries do dashboard sem varrer os pedidos.
+    """
+
+    __tablename__ = "resumo_diario"  # type: ignore
+
+    data: date = Field(primary_key=True)
+    status: str = Field(primary_key=True)
+    quantidade: int = 0
+    total: Decimal = Field(default=0.0, max_digits=14, decimal_places=2)
+    unidades: int = 0
+
+
+Agrupamento = Literal["dia", "semana", "mes"]
+
+
+class PontoSerie(SQLModel):
+    periodo: date  # Primeiro dia do período (semanas começam na segunda-feira)
+    pedidos: int
+    faturamento: Decimal
+    unidades: int
+
+
+class SerieResponse(SQLModel):
+    inicio: date
+    fim: date
+    agrupamento: Agrupamento
+    status: str | None = None
+    pontos: list[PontoSerie]
 
 
 class DashboardStats(SQLModel):
@@ -20,5 +68,124 @@ class DashboardStats(SQLModel):
 
 class DashboardResponse(SQLModel):
     status: DashboardStats
-    pedidosRecentes: list[PedidoPublic]
+    pedidosRecentes: list[PedidoResumoPublic]
     aniversariantes: list[ClientePublic]
+
+
+def _normalizar_status(status: Any) -> str:
+    return status.value if isinstance(status, Enum) else status
+
+
+def _valor_anterior(pedido: Pedido, campo: str) -> Any:
+    """Retorna o valor do campo como está no banco, antes das mudanças pendentes."""
+    historico = inspect(pedido).attrs[campo].history
+    if historico.deleted:
+        return historico.deleted[0]
+    return getattr(pedido, campo)
+
+
+# Os valores antigos precisam estar no histórico para calcular as diferenças
+@event.listens_for(Pedido.total, "set", active_history=True)
+@event.listens_for(Pedido.data_pedido, "set", active_history=True)
+@event.listens_for(Pedido.qtd_unidades, "set", active_history=True)
+def ao_mudar_campo_resumo(*_: Any) -> None:
+    pass
+
+
+# Campos do pedido que entram nos resumos
+CAMPOS_RESUMO = ("status", "total", "data_pedido", "qtd_unidades")
+
+
+@event.listens_for(Session, "before_flush")
+def calcular_deltas_resumo(session: Session, *_: Any) -> None:
+    """Calcula as diferenças por status e por dia geradas pelos pedidos que serão gravados."""
+    deltas: dict[str, list[Any]] = {}
+    deltas_diarios: dict[tuple[date, str], list[Any]] = {}
+
+    def aplicar(valores: dict[str, Any], sinal: int) -> None:
+        status = _normalizar_status(valores["status"])
+        total = Decimal(str(valores["total"] or 0)) * sinal
+
+        delta = deltas.setdefault(status, [0, Decimal("0.0")])
+        delta[0] += sinal
+        delta[1] += total
+
+        diario = deltas_diarios.setdefault(
+            (valores["data_pedido"], status), [0, Decimal("0.0"), 0]
+        )
+        diario[0] += sinal
+        diario[1] += total
+        diario[2] += (valores["qtd_unidades"] or 0) * sinal
+
+    def atuais(pedido: Pedido) -> dict[str, Any]:
+        return {campo: getattr(pedido, campo) for campo in CAMPOS_RESUMO}
+
+    def anteriores(pedido: Pedido) -> dict[str, Any]:
+        return {campo: _valor_anterior(pedido, campo) for campo in CAMPOS_RESUMO}
+
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Pedido):
+                aplicar(atuais(obj), 1)
+
+        for obj in session.deleted:
+            if isinstance(obj, Pedido):
+                aplicar(anteriores(obj), -1)
+
+        for obj in session.dirty:
+            if not isinstance(obj, Pedido) or not session.is_modified(obj):
+                continue
+
+            estado = inspect(obj).attrs
+            if not any(estado[campo].history.has_changes() for campo in CAMPOS_RESUMO):
+                continue
+
+            aplicar(anteriores(obj), -1)
+            aplicar(atuais(obj), 1)
+
+    session.info["resumo_deltas"] = deltas
+    session.info["resumo_deltas_diarios"] = deltas_diarios
+
+
+@event.listens_for(Session, "after_flush")
+def gravar_deltas_resumo(session: Session, *_: Any) -> None:
+    """Aplica as diferenças nos resumos dentro da mesma transação do flush."""
+    deltas = session.info.pop("resumo_deltas", None)
+    deltas_diarios = session.info.pop("resumo_deltas_diarios", None)
+    if not deltas and not deltas_diarios:
+        return
+
+    connection = session.connection()
+
+    tabela = ResumoStatus.__table__  # type: ignore
+    for status, (quantidade, total) in (deltas or {}).items():
+        if not quantidade and not total:
+            continue
+
+        stmt = insert(tabela).values(status=status, quantidade=quantidade, total=total)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabela.c.status],
+            set_={
+                "quantidade": tabela.c.quantidade + stmt.excluded.quantidade,
+                "total": tabela.c.total + stmt.excluded.total,
+            },
+        )
+        connection.execute(stmt)
+
+    tabela = ResumoDiario.__table__  # type: ignore
+    for (data, status), (quantidade, total, unidades) in (deltas_diarios or {}).items():
+        if not quantidade and not total and not unidades:
+            continue
+
+        stmt = insert(tabela).values(
+            data=data, status=status, quantidade=quantidade, total=total, unidades=unidades
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[tabela.c.data, tabela.c.status],
+            set_={
+                "quantidade": tabela.c.quantidade + stmt.excluded.quantidade,
+                "total": tabela.c.total + stmt.excluded.total,
+                "unidades": tabela.c.unidades + stmt.excluded.unidades,
+            },
+        )
+        connection.execute(stmt)
@@ -0,0 +1,11 @@
+from sqlmodel import SQLModel
+
+
+class ErroImportacao(SQLModel):
+    linha: int
+    detalhe: str
+
+
+class ImportacaoResultado(SQLModel):
+    importados: int = 0
+    erros: list[ErroImportacao] = []
@@ -1,8 +1,10 @@
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
+from pydantic import computed_field
 from sqlmodel import Field, Relationship, SQLModel  # type:ignore
 
+from ..utils.imagem import art_variant_paths
 from .base import TimestampMixin
 
 if TYPE_CHECKING:
@@ -19,8 +21,9 @@ class ItemPedidoBase(TimestampMixin, SQLModel):
     pedido_id: int | None = Field(
         default=None, foreign_key="pedido.id", primary_key=True
     )
+    # A chave primária começa por pedido_id: as buscas por produto precisam do próprio índice
     produto_id: int | None = Field(
-        default=None, foreign_key="produto.id", primary_key=True
+        default=None, foreign_key="produto.id", primary_key=True, index=True
     )
 
 
@@ -38,6 +41,12 @@ class ItemPedidoCreate(ItemPedidoBase):
 class ItemPedidoPublic(ItemPedidoBase):
     valor_total: Decimal | None = None
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def miniaturas(self) -> dict[str, str] | None:
+        """Caminhos das versões da arte por tamanho ('128', '512' e 'full')."""
+        return art_variant_paths(self.caminho_arte)
+
 
 class ItemPedidoUpdate(SQLModel):
     quantidade: int | None = Field(default=None, ge=1)
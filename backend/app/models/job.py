@@ -0,0 +1,25 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any
+
+from sqlmodel import SQLModel
+
+
+class StatusJob(str, Enum):
+    PENDENTE = "pendente"
+    PROCESSANDO = "processando"
+    CONCLUIDO = "concluido"
+    ERRO = "erro"
+
+
+class JobPublic(SQLModel):
+    """Estado de uma tarefa executada em segundo plano (não é salva no banco)."""
+
+    id: str
+    tipo: str
+    status: StatusJob = StatusJob.PENDENTE
+    progresso: float = 0.0
+    resultado: Any = None
+    erro: str | None = None
+    criado_em: datetime
+    atualizado_em: datetime
@@ -1,9 +1,9 @@
 from datetime import date
 from decimal import Decimal
 from enum import Enum
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Literal
 
-from sqlalchemy import event
+from sqlalchemy import Index, event
 from sqlmodel import Field, Relationship, SQLModel
 
 from .base import TimestampMixin
@@ -23,6 +23,22 @@ class ItemPedidoInput(SQLModel):
     )
 
 
+class OperacaoItem(SQLModel):
+    """
+    Uma operação da edição em lote dos itens (PATCH /pedidos/{id}/itens).
+    'adicionar' funciona como o POST de itens, 'atualizar' altera só os campos
+    enviados e 'remover' usa apenas o produto_id.
+    """
+
+    acao: Literal["adicionar", "atualizar", "remover"]
+    produto_id: int
+    quantidade: int | None = Field(default=None, ge=1)
+    observacoes: str | None = None
+    preco_unitario: Decimal | None = Field(
+        default=None, max_digits=10, decimal_places=2, ge=0
+    )
+
+
 class StatusPedido(str, Enum):
     AGUARDANDO_PAGAMENTO = "Aguardando Pagamento"
     AGUARDANDO_ARTE = "Aguardando Arte"
@@ -35,16 +51,30 @@ class StatusPedido(str, Enum):
 class PedidoBase(TimestampMixin, SQLModel):
     data_pedido: date = Field(default_factory=date.today, index=True)
     data_conclusao: date | None = Field(default=None, index=True)
-    status: str = Field(default=StatusPedido.AGUARDANDO_PAGAMENTO, index=True)
+    status: str = Field(default=StatusPedido.AGUARDANDO_PAGAMENTO)
     observacoes: str | None = None
     desconto: Decimal = Field(default=0.0, max_digits=10, decimal_places=2, ge=0)
     total: Decimal = Field(default=0.0, max_digits=10, decimal_places=2, index=True)
-    cliente_id: int = Field(foreign_key="cliente.id")
+    cliente_id: int = Field(foreign_key="cliente.id", index=True)
 
 
 class Pedido(PedidoBase, table=True):
+    # Filtros combinados da listagem. O status sozinho usa a primeira coluna, e
+    # (status, data_pedido) também entrega a ordem da paginação por cursor
+    __table_args__ = (
+        Index("ix_pedido_status_data_pedido", "status", "data_pedido"),
+        Index("ix_pedido_status_total", "status", "total"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
 
+    # Desnormalizados para as listagens não precisarem carregar os itens.
+    # Mantidos pelo PedidoService._recalculate_totals
+    qtd_itens: int = Field(default=0)
+    subtotal: Decimal = Field(default=0.0, max_digits=10, decimal_places=2)
+    # Soma das quantidades dos itens (unidades no resumo diário do dashboard)
+    qtd_unidades: int = Field(default=0)
+
     cliente: "Cliente" = Relationship(back_populates="pedidos")
 
     # Acesso à tabela associativa (para ler quantidade de produto, arte, etc)
@@ -54,7 +84,9 @@ class Pedido(PedidoBase, table=True):
     )
 
 
-@event.listens_for(Pedido.status, "set", named=True)
+# 'active_history' carrega o status anterior mesmo com o objeto expirado,
+# o que também mantém correto o histórico usado pelo resumo do dashboard
+@event.listens_for(Pedido.status, "set", named=True, active_history=True)
 def ao_mudar_status(target: "Pedido", value: Any, oldvalue: Any, **_: Any) -> None:
     """
     Atualiza automaticamente a data_conclusao com base na mudança do status.
@@ -77,15 +109,30 @@ class PedidoCreate(PedidoBase):
     itens: list[ItemPedidoInput] = []
 
 
-class PedidoPublic(PedidoBase):
+class PedidoResumoPublic(PedidoBase):
+    """Pedido sem os itens, usado nas listagens leves."""
+
     id: int
     cliente: ClientePublic | None = None
+    qtd_itens: int = 0
+    subtotal: Decimal = Decimal("0.0")
+
+
+class PedidoPublic(PedidoResumoPublic):
     itens: list[ItemPedidoPublic] = []
 
 
 class PedidoPublicPaginated(SQLModel):
     dados: list[PedidoPublic]
-    total: int
+    # Pode vir nulo quando o cliente pede para não contar o total
+    total: int | None
+    proximo_cursor: str | None = None
+
+
+class PedidoResumoPaginated(SQLModel):
+    dados: list[PedidoResumoPublic]
+    total: int | None
+    proximo_cursor: str | None = None
 
 
 class PedidoUpdate(SQLModel):
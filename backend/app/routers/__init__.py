@@ -3,6 +3,9 @@ from .produtos import router as produtos_router
 from .pedidos import router as pedidos_router
 from .dashboard import router as dashboard_router
 from .backup import router as backup_router
+from .cache import router as cache_router
+from .jobs import router as jobs_router
+from .metricas import router as metricas_router
 
 __all__ = [
     "clientes_router",
@@ -10,4 +13,7 @@ __all__ = [
     "pedidos_router",
     "dashboard_router",
     "backup_router",
+    "cache_router",
+    "jobs_router",
+    "metricas_router",
 ]
@@ -1,43 +1,45 @@
-import shutil
-from datetime import datetime
+from fastapi import APIRouter, Response, status
+from fastapi.responses import FileResponse
 
-from fastapi import APIRouter, HTTPException, status
-
-from ..config import BACKUP_DIR, db_path
+from ..models import BackupPublic, JobPublic
+from ..services.backup_service import Compressao, backup_service
 
 router = APIRouter(prefix="/backup", tags=["backup"])
 
 
-@router.post("/")
-def create_backup():
-    """Gera uma cópia física do banco de dados SQLite com timestamp."""
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+def create_backup(
+    response: Response, compressao: Compressao = "nenhuma"
+) -> dict[str, str | JobPublic]:
+    """Inicia em segundo plano um backup online do banco de dados SQLite com timestamp.
+
+    O andamento pode ser consultado em /jobs/{id}. Com 'compressao=gzip' o arquivo é salvo comprimido.
+    Se nada mudou desde o último backup, o arquivo anterior é reaproveitado."""
+    job = backup_service.start_backup(compressao)
+
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return {"success": "Backup iniciado.", "job": job}
+
+
+@router.get("/")
+def list_backups() -> list[BackupPublic]:
+    """Lista os backups disponíveis, com tamanho e resultado da última verificação de integridade."""
+    return backup_service.list_backups()
 
-    if not db_path.exists():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Arquivo do banco de dados não encontrado para backup.",
-        )
 
-    try:
-        # Gera o nome com a data e hora atual (Ex: backup_2026-03-01_14-30-05.db)
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        nome_backup = f"backup_{timestamp}.db"
+@router.get("/{nome}")
+def download_backup(nome: str) -> FileResponse:
+    """Baixa um arquivo de backup (enviado em blocos, sem carregar tudo na memória)."""
+    caminho = backup_service.get_backup_path(nome)
+    return FileResponse(caminho, filename=caminho.name, media_type="application/octet-stream")
 
-        # Caminho final 
-        caminho_destino = BACKUP_DIR / nome_backup
 
-        # Faz a cópia exata do arquivo
-        shutil.copy2(db_path, caminho_destino)
+@router.post("/{nome}/restaurar", status_code=status.HTTP_202_ACCEPTED)
+def restore_backup(nome: str, response: Response) -> dict[str, str | JobPublic]:
+    """Restaura o banco a partir de um backup em segundo plano.
 
-        return {"success": f"Backup '{nome_backup}' salvo com sucesso!"}
+    O backup é verificado antes e um novo backup do estado atual é feito, permitindo desfazer."""
+    job = backup_service.start_restore(nome)
 
-    except PermissionError:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Erro de permissão: O sistema não tem acesso à pasta.",
-        )
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Falha ao realizar backup: {str(e)}",
-        )
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return {"success": "Restauração iniciada.", "job": job}
@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi import APIRouter, Response, status
+
+from ..utils.cache import response_cache
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+
+@router.get("/")
+def get_cache_stats() -> dict[str, Any]:
+    """Retorna os contadores de acertos, falhas e descartes do cache de respostas."""
+    return response_cache.stats()
+
+
+@router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
+def clear_cache():
+    """Esvazia o cache de respostas."""
+    response_cache.clear()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,56 +1,144 @@
-from typing import Sequence
+from datetime import date
 
-from fastapi import APIRouter, Response, status
+from fastapi import APIRouter, Request, Response, status
+from sqlmodel import Session
 
-from ..config import SessionDep
+from ..config import BancoDep
 from ..models import (
     Cliente,
+    ClienteAniversariantePaginated,
     ClienteCreate,
     ClientePublic,
     ClientePublicPaginated,
     ClienteUpdate,
 )
 from ..services import cliente_service
+from ..utils.cache import cached_json_response
+from ..utils.condicional import (
+    nao_modificado,
+    resposta_nao_modificada,
+    verificar_if_match,
+)
+from ..utils.projecao import campos_de_coluna, parse_campos, schema_projetado
+from ..utils.resposta import json_response
 
 router = APIRouter(prefix="/clientes", tags=["clientes"])
 
 
 @router.post("/", response_model=ClientePublic, status_code=status.HTTP_201_CREATED)
-def create_client(cliente: ClienteCreate, session: SessionDep) -> Cliente:
+async def create_client(cliente: ClienteCreate, banco: BancoDep) -> Response:
     """Cria um novo cliente."""
-    return cliente_service.create(session, cliente)
+
+    def criar(session: Session) -> Response:
+        db_cliente = cliente_service.create(session, cliente)
+        return json_response(
+            ClientePublic,
+            db_cliente,
+            status_code=status.HTTP_201_CREATED,
+            headers=cliente_service.version_of(db_cliente).headers(),
+        )
+
+    return await banco.run(criar)
 
 
 @router.get("/", response_model=ClientePublicPaginated)
-def get_all_clients(
-    session: SessionDep, q: str | None = None, skip: int = 0, limit: int = 10
-) -> dict[str, Sequence[Cliente] | int]:
-    """Retorna a lista de todos os clientes com paginação e filtro de busca geral por nome, email e telefone."""
-    return cliente_service.get_all(
-        session,
-        q=q,
-        skip=skip,
-        limit=limit,
-        search_fields=["nome", "email", "telefone"],
+async def get_all_clients(
+    banco: BancoDep,
+    q: str | None = None,
+    skip: int = 0,
+    limit: int = 10,
+    fields: str | None = None,
+) -> Response:
+    """Retorna a lista de todos os clientes com paginação e filtro de busca geral por nome, email e telefone.
+
+    'fields' (ex: 'nome,telefone') limita as colunas buscadas e devolvidas de cada cliente."""
+    campos = parse_campos(fields, campos_de_coluna(ClientePublic, Cliente))
+    schema = ClientePublicPaginated
+    if campos:
+        schema = schema_projetado(ClientePublicPaginated, ClientePublic, campos)
+    return await cached_json_response(
+        "clientes",
+        {"q": q, "skip": skip, "limit": limit, "fields": campos},
+        schema,
+        banco,
+        lambda session: cliente_service.get_all(
+            session,
+            q=q,
+            skip=skip,
+            limit=limit,
+            search_fields=["nome", "email", "telefone"],
+            campos=campos,
+        ),
+    )
+
+
+@router.get("/aniversariantes", response_model=ClienteAniversariantePaginated)
+async def get_upcoming_birthdays(
+    banco: BancoDep,
+    dias: int = 30,
+    skip: int = 0,
+    limit: int = 10,
+) -> Response:
+    """Clientes que fazem aniversário nos próximos 'dias' dias (incluindo hoje, até 365), do mais próximo ao mais distante."""
+    hoje = date.today()
+    return await cached_json_response(
+        "clientes",
+        # A data entra na chave: a janela muda na virada do dia
+        {"aniversariantes": dias, "hoje": hoje, "skip": skip, "limit": limit},
+        ClienteAniversariantePaginated,
+        banco,
+        lambda session: cliente_service.get_upcoming_birthdays(
+            session, dias=dias, skip=skip, limit=limit, hoje=hoje
+        ),
     )
 
 
 @router.get("/{id}", response_model=ClientePublic)
-def get_client_by_id(id: int, session: SessionDep) -> Cliente:
-    """Busca um cliente por ID se existir"""
-    return cliente_service.get_or_404(session, id)
+async def get_client_by_id(id: int, banco: BancoDep, request: Request) -> Response:
+    """Busca um cliente por ID se existir.
+
+    A resposta traz 'ETag' e 'Last-Modified'. Enviando-os de volta em 'If-None-Match' ou
+    'If-Modified-Since', a resposta é 304 (sem corpo) enquanto o cliente não mudar."""
+
+    def buscar(session: Session) -> Response:
+        db_cliente = cliente_service.get_or_404(session, id)
+        versao = cliente_service.version_of(db_cliente)
+        if nao_modificado(request, versao):
+            return resposta_nao_modificada(versao)
+        return json_response(ClientePublic, db_cliente, headers=versao.headers())
+
+    return await banco.run(buscar)
 
 
 @router.patch("/{id}", response_model=ClientePublic)
-def update_client(
-    id: int, cliente: ClienteUpdate, session: SessionDep
-) -> Cliente:
-    """Atualiza dados de um cliente de forma parcial."""
-    return cliente_service.update(session, id, cliente)
+async def update_client(
+    id: int, cliente: ClienteUpdate, banco: BancoDep, request: Request
+) -> Response:
+    """Atualiza dados de um cliente de forma parcial.
+
+    Com 'If-Match' (a ETag lida antes), só atualiza se ninguém alterou o cliente nesse meio tempo (senão, 412)."""
+
+    def atualizar(session: Session) -> Response:
+        verificar_if_match(
+            request, session, lambda: cliente_service.get_version(session, id)
+        )
+        db_cliente = cliente_service.update(session, id, cliente)
+        return json_response(
+            ClientePublic, db_cliente, headers=cliente_service.version_of(db_cliente).headers()
+        )
+
+    return await banco.run(atualizar)
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_client(id: int, session: SessionDep):
-    """Remove um cliente."""
-    cliente_service.delete(session, id)
+async def delete_client(id: int, banco: BancoDep, request: Request):
+    """Remove um cliente. Aceita 'If-Match', como a atualização."""
+
+    def remover(session: Session) -> None:
+        verificar_if_match(
+            request, session, lambda: cliente_service.get_version(session, id)
+        )
+        cliente_service.delete(session, id)
+
+    await banco.run(remover)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -1,12 +1,63 @@
-from fastapi import APIRouter
+from datetime import date
 
-from ..config import SessionDep
-from ..models.dashboard import DashboardResponse
+from fastapi import APIRouter, Response, status
+
+from ..config import BancoDep
+from ..models import JobPublic, StatusPedido
+from ..models.dashboard import Agrupamento, DashboardResponse, SerieResponse
 from ..services.dashboard_service import dashboard_service
+from ..utils.cache import cached_json_response
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 @router.get("/", response_model=DashboardResponse)
-def get_dashboard(session: SessionDep) -> DashboardResponse:
+async def get_dashboard(banco: BancoDep) -> Response:
     """Retorna todas as métricas pré-calculadas para o Dashboard."""
-    return dashboard_service.get_dashboard_data(session)
\ No newline at end of file
+    return await cached_json_response(
+        "dashboard",
+        {},
+        DashboardResponse,
+        banco,
+        dashboard_service.get_dashboard_data,
+    )
+
+
+@router.get("/series", response_model=SerieResponse)
+async def get_series(
+    banco: BancoDep,
+    inicio: date | None = None,
+    fim: date | None = None,
+    agrupamento: Agrupamento = "dia",
+    status: StatusPedido | None = None,
+) -> Response:
+    """Pedidos, faturamento e unidades por dia, semana ou mês entre 'inicio' e 'fim' (pela data do pedido).
+
+    Lê o resumo diário materializado, sem varrer os pedidos. Períodos sem pedidos vêm zerados.
+    Com 'status', conta só os pedidos nesse status."""
+    fim = fim or date.today()
+    status_pedido = status.value if status else None
+    return await cached_json_response(
+        "dashboard",
+        {
+            "series": agrupamento,
+            "inicio": inicio,
+            "fim": fim,
+            "status": status_pedido,
+        },
+        SerieResponse,
+        banco,
+        lambda session: dashboard_service.get_series(
+            session, inicio, fim, agrupamento, status_pedido
+        ),
+    )
+
+
+@router.post("/resumo/reconstruir", status_code=status.HTTP_202_ACCEPTED)
+def rebuild_summary(response: Response) -> dict[str, str | JobPublic]:
+    """Recria em segundo plano os resumos do dashboard (por status e por dia) a partir de todo o histórico de pedidos.
+
+    O andamento pode ser consultado em /jobs/{id}."""
+    job = dashboard_service.start_rebuild()
+
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return {"success": "Reconstrução do resumo iniciada.", "job": job}
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, Response, status
+
+from ..models import JobPublic
+from ..utils.jobs import job_registry
+from ..utils.resposta import json_response
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}", response_model=JobPublic)
+def get_job(job_id: str) -> Response:
+    """Consulta o andamento de uma tarefa em segundo plano."""
+    job = job_registry.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Tarefa não encontrada."
+        )
+    return json_response(JobPublic, job)
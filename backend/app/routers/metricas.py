@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from ..utils.metricas import registro_metricas
+
+router = APIRouter(tags=["metricas"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    """Métricas por rota (duração, tempo no banco, queries, suspeitas de N+1) e do cache,
+    no formato de texto do Prometheus."""
+    return PlainTextResponse(
+        registro_metricas.exportar(), media_type="text/plain; version=0.0.4"
+    )
@@ -1,35 +1,89 @@
+import io
 from datetime import date
 from decimal import Decimal
-from typing import Sequence
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, File, UploadFile, status
+from fastapi import APIRouter, File, Request, Response, UploadFile, status
+from sqlmodel import Session
 
-from ..config import SessionDep
+from ..config import BancoDep, SessionDep
 from ..models import (
+    ClientePublic,
+    ImportacaoResultado,
     ItemPedidoInput,
+    ItemPedidoPublic,
     ItemPedidoUpdate,
+    OperacaoItem,
     Pedido,
     PedidoCreate,
     PedidoPublic,
     PedidoPublicPaginated,
+    PedidoResumoPaginated,
+    PedidoResumoPublic,
     PedidoUpdate,
     StatusPedido,
 )
 from ..services import pedido_service
-from ..utils.imagem import process_art_image
+from ..services.arte_service import arte_service
+from ..services.importacao_service import importacao_service
+from ..utils.condicional import (
+    nao_modificado,
+    resposta_nao_modificada,
+    verificar_if_match,
+)
+from ..utils.projecao import campos_de_coluna, parse_campos, schema_projetado
+from ..utils.resposta import json_response
 
 router = APIRouter(prefix="/pedidos", tags=["pedidos"])
 
+# Relações que podem ser incluídas com ?expand= e o schema de cada uma
+RELACOES_PEDIDO = {"cliente": ClientePublic | None, "itens": list[ItemPedidoPublic]}
+
+
+def _resposta_pedido(db_pedido: Pedido, **kwargs) -> Response:
+    """Serializa o pedido com a ETag da versão devolvida. A versão é calculada depois da
+    serialização, que já carregou o cliente e os itens usados nela."""
+    resposta = json_response(PedidoPublic, db_pedido, **kwargs)
+    resposta.headers.update(pedido_service.version_of(db_pedido).headers())
+    return resposta
+
+
+def _verificar_versao(request: Request, session: Session, pedido_id: int) -> None:
+    """Aplica o 'If-Match' às escritas no pedido e nos seus itens."""
+    verificar_if_match(
+        request,
+        session,
+        lambda: pedido_service.get_version(session, pedido_id, "Pedido não encontrado"),
+    )
+
 
 @router.post("/", response_model=PedidoPublic, status_code=status.HTTP_201_CREATED)
-def create_order(pedido: PedidoCreate, session: SessionDep) -> Pedido:
+async def create_order(pedido: PedidoCreate, banco: BancoDep) -> Response:
     """Cria um pedido completo com itens e cálculo de total."""
-    return pedido_service.create(session, pedido)
+    return await banco.run(
+        lambda session: _resposta_pedido(
+            pedido_service.create(session, pedido), status_code=status.HTTP_201_CREATED
+        )
+    )
+
+
+@router.post("/importar", response_model=ImportacaoResultado)
+def import_orders(session: SessionDep, file: Annotated[UploadFile, File()]) -> Response:
+    """Importa pedidos em lote de um arquivo NDJSON (um pedido por linha) ou CSV (um item por linha,
+    agrupados em linhas consecutivas com a mesma 'ref'). Linhas com erro são relatadas sem
+    interromper as demais.
+
+    Continua síncrona (threadpool) mesmo com DB_ASYNC: ler o arquivo enviado bloquearia o event loop."""
+    formato = "csv" if (file.filename or "").lower().endswith(".csv") else "ndjson"
+    arquivo = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    return json_response(
+        ImportacaoResultado, importacao_service.import_file(session, arquivo, formato)
+    )
 
 
 @router.get("/", response_model=PedidoPublicPaginated)
-def get_all_orders(
-    session: SessionDep,
+async def get_all_orders(
+    banco: BancoDep,
     q: str | None = None,
     status: StatusPedido | None = None,
     data_pedido: date | None = None,
@@ -38,74 +92,192 @@ def get_all_orders(
     max_total: Decimal | None = None,
     skip: int = 0,
     limit: int = 10,
-) -> dict[str, Sequence[Pedido] | int]:
-    """Retorna a lista de pedidos com paginação e filtros de busca por cliente, status, data de início e valor total do pedido."""
-    return pedido_service.get_all_detailed(
-        session,
-        q=q,
-        status=status,
-        data_pedido=data_pedido,
-        data_conclusao=data_conclusao,
-        min_total=min_total,
-        max_total=max_total,
-        skip=skip,
-        limit=limit,
-    )
+    cursor: str | None = None,
+    contagem: Literal["exata", "estimada", "nenhuma"] = "exata",
+    incluir_itens: bool = True,
+    fields: str | None = None,
+    expand: str | None = None,
+) -> Response:
+    """Retorna a lista de pedidos com paginação e filtros de busca por cliente, status, data de início e valor total do pedido.
+
+    Envie 'cursor' (vazio na primeira página e depois o 'proximo_cursor' recebido) para paginar por chave.
+    O parâmetro 'contagem' permite pular ('nenhuma') ou estimar ('estimada') o total.
+    Com 'incluir_itens=false' os itens não são carregados e cada pedido traz apenas 'qtd_itens' e 'subtotal'.
+
+    'fields' (ex: 'status,total,qtd_itens') limita as colunas de cada pedido e 'expand' ('cliente', 'itens')
+    escolhe as relações incluídas. Usando qualquer um dos dois, o SQL busca só o que foi pedido."""
+    permitidos = campos_de_coluna(PedidoResumoPublic, Pedido)
+    campos = parse_campos(fields, permitidos)
+    relacoes = parse_campos(expand, tuple(RELACOES_PEDIDO), "expand")
+    if campos is None and relacoes is not None:
+        campos = permitidos
+
+    if campos is not None:
+        schema = schema_projetado(
+            PedidoPublicPaginated,
+            PedidoResumoPublic,
+            campos,
+            tuple((nome, RELACOES_PEDIDO[nome]) for nome in relacoes or ()),
+        )
+    elif not incluir_itens:
+        # Sem itens usa o schema resumido (o PedidoPublic acessaria 'itens' em cada pedido)
+        schema = PedidoResumoPaginated
+    else:
+        schema = PedidoPublicPaginated
+
+    def listar(session: Session) -> Response:
+        resultado = pedido_service.get_all_detailed(
+            session,
+            q=q,
+            status=status,
+            data_pedido=data_pedido,
+            data_conclusao=data_conclusao,
+            min_total=min_total,
+            max_total=max_total,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            contagem=contagem,
+            incluir_itens=incluir_itens,
+            campos=campos,
+            expand=relacoes,
+        )
+        return json_response(schema, resultado)
+
+    return await banco.run(listar)
 
 
 @router.get("/{pedido_id}", response_model=PedidoPublic)
-def get_order_by_id(pedido_id: int, session: SessionDep) -> Pedido:
-    """Busca um pedido por ID com detalhes se existir."""
-    return pedido_service.get_by_id_detailed(session, pedido_id)
+async def get_order_by_id(pedido_id: int, banco: BancoDep, request: Request) -> Response:
+    """Busca um pedido por ID com detalhes se existir.
+
+    A resposta traz 'ETag' e 'Last-Modified' (considerando também o cliente e os itens).
+    Enviando-os de volta em 'If-None-Match' ou 'If-Modified-Since', a resposta é 304
+    sem carregar o pedido, enquanto nada mudar."""
+
+    def buscar(session: Session) -> Response:
+        versao = pedido_service.get_version(session, pedido_id, "Pedido não encontrado")
+        if nao_modificado(request, versao):
+            return resposta_nao_modificada(versao)
+        return _resposta_pedido(pedido_service.get_by_id_detailed(session, pedido_id))
+
+    return await banco.run(buscar)
 
 
 @router.patch("/{pedido_id}", response_model=PedidoPublic)
-def update_order(
-    pedido_id: int, pedido: PedidoUpdate, session: SessionDep
-) -> Pedido:
-    """Atualiza dados básicos do pedido."""
-    db_pedido = pedido_service.get_or_404(session, pedido_id)
-
-    pedido_atualizado = pedido_service.update_and_recalculate(
-        session, db_pedido=db_pedido, obj=pedido
-    )
+async def update_order(
+    pedido_id: int, pedido: PedidoUpdate, banco: BancoDep, request: Request
+) -> Response:
+    """Atualiza dados básicos do pedido.
+
+    Com 'If-Match' (a ETag lida antes), esta e as demais escritas no pedido e nos seus
+    itens só acontecem se ninguém o alterou nesse meio tempo (senão, 412)."""
+
+    def atualizar(session: Session) -> Response:
+        _verificar_versao(request, session, pedido_id)
+        # Carrega cliente e itens junto: os itens entram no recálculo e os dois na resposta
+        db_pedido = pedido_service.get_by_id_detailed(session, pedido_id)
+
+        pedido_atualizado = pedido_service.update_and_recalculate(
+            session, db_pedido=db_pedido, obj=pedido
+        )
 
-    return pedido_atualizado
+        return _resposta_pedido(pedido_atualizado)
+
+    return await banco.run(atualizar)
 
 
 @router.post("/{pedido_id}/itens", response_model=PedidoPublic)
-def add_item_to_order(
-    pedido_id: int, item: ItemPedidoInput, session: SessionDep
-) -> Pedido:
-    """Adiciona um novo produto ao pedido e recalcula o total."""
-    return pedido_service.add_item(session, pedido_id, item)
+async def add_item_to_order(
+    pedido_id: int,
+    item: ItemPedidoInput | list[ItemPedidoInput],
+    banco: BancoDep,
+    request: Request,
+) -> Response:
+    """Adiciona um ou mais produtos ao pedido e recalcula o total."""
+
+    def adicionar(session: Session) -> Response:
+        _verificar_versao(request, session, pedido_id)
+        return _resposta_pedido(pedido_service.add_item(session, pedido_id, item))
+
+    return await banco.run(adicionar)
+
+
+@router.patch("/{pedido_id}/itens", response_model=PedidoPublic)
+async def update_order_items(
+    pedido_id: int,
+    operacoes: list[OperacaoItem],
+    banco: BancoDep,
+    request: Request,
+) -> Response:
+    """Adiciona, atualiza e remove vários itens de uma vez, na ordem enviada, com um único
+    recálculo do total. Se alguma operação falhar, nenhuma alteração é salva."""
+
+    def aplicar(session: Session) -> Response:
+        _verificar_versao(request, session, pedido_id)
+        return _resposta_pedido(
+            pedido_service.apply_item_operations(session, pedido_id, operacoes)
+        )
+
+    return await banco.run(aplicar)
 
 
 @router.patch("/{pedido_id}/itens/{produto_id}", response_model=PedidoPublic)
-def update_item_in_order(
-    pedido_id: int, produto_id: int, item: ItemPedidoUpdate, session: SessionDep
-) -> Pedido:
+async def update_item_in_order(
+    pedido_id: int,
+    produto_id: int,
+    item: ItemPedidoUpdate,
+    banco: BancoDep,
+    request: Request,
+) -> Response:
     """Atualiza quantidade ou valor de um item específico do pedido."""
-    return pedido_service.update_item(session, pedido_id, produto_id, item)
+
+    def atualizar(session: Session) -> Response:
+        _verificar_versao(request, session, pedido_id)
+        return _resposta_pedido(
+            pedido_service.update_item(session, pedido_id, produto_id, item)
+        )
+
+    return await banco.run(atualizar)
 
 
 @router.delete("/{pedido_id}/itens/{produto_id}", response_model=PedidoPublic)
-def remove_item_from_order(
-    pedido_id: int, produto_id: int, session: SessionDep
-) -> Pedido:
+async def remove_item_from_order(
+    pedido_id: int, produto_id: int, banco: BancoDep, request: Request
+) -> Response:
     """Remove um item e recalcula o total, impedindo pedidos vazios."""
-    return pedido_service.remove_item(session, pedido_id, produto_id)
 
+    def remover(session: Session) -> Response:
+        _verificar_versao(request, session, pedido_id)
+        return _resposta_pedido(
+            pedido_service.remove_item(session, pedido_id, produto_id)
+        )
+
+    return await banco.run(remover)
 
-@router.post("/{pedido_id}/itens/{produto_id}/upload-arte", response_model=PedidoPublic)
+
+@router.post(
+    "/{pedido_id}/itens/{produto_id}/upload-arte",
+    response_model=PedidoPublic,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 def upload_item_art(
-    pedido_id: int, produto_id: int, session: SessionDep, file: UploadFile = File(...)
-) -> Pedido:
-    """Processa o upload da arte e vincula ao item do pedido."""
-    # Processa a imagem e retorna seu caminho de arquivo
-    caminho_arte = process_art_image(file, pedido_id, produto_id)
-
-    # Salva o caminho no banco
-    return pedido_service.update_item_art_path(
-        session, pedido_id, produto_id, caminho_arte
+    pedido_id: int,
+    produto_id: int,
+    session: SessionDep,
+    request: Request,
+    file: Annotated[UploadFile, File()],
+) -> Response:
+    """Recebe a arte e vincula ao item do pedido.
+
+    O item aponta para o arquivo enviado até a conversão para WEBP terminar em segundo plano.
+    O andamento pode ser consultado em /jobs/{id}, indicado no header 'Location'.
+    Continua síncrona (threadpool) mesmo com DB_ASYNC, pois grava o arquivo enviado no disco."""
+    _verificar_versao(request, session, pedido_id)
+    db_pedido, job = arte_service.enqueue_upload(session, pedido_id, produto_id, file)
+
+    return _resposta_pedido(
+        db_pedido,
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": f"/jobs/{job.id}", "X-Job-Id": job.id},
     )
@@ -1,9 +1,9 @@
 from decimal import Decimal
-from typing import Sequence
 
-from fastapi import APIRouter, Response, status
+from fastapi import APIRouter, Request, Response, status
+from sqlmodel import Session
 
-from ..config import SessionDep
+from ..config import BancoDep
 from ..models import (
     Produto,
     ProdutoCreate,
@@ -12,52 +12,121 @@ from ..models import (
     ProdutoUpdate,
 )
 from ..services import produto_service
+from ..utils.cache import cached_json_response
+from ..utils.condicional import (
+    nao_modificado,
+    resposta_nao_modificada,
+    verificar_if_match,
+)
+from ..utils.projecao import campos_de_coluna, parse_campos, schema_projetado
+from ..utils.resposta import json_response
 
 router = APIRouter(prefix="/produtos", tags=["produtos"])
 
 
 @router.post("/", response_model=ProdutoPublic, status_code=status.HTTP_201_CREATED)
-def create_product(produto: ProdutoCreate, session: SessionDep) -> Produto:
+async def create_product(produto: ProdutoCreate, banco: BancoDep) -> Response:
     """Cria um novo produto."""
-    return produto_service.create(session, produto)
+
+    def criar(session: Session) -> Response:
+        db_produto = produto_service.create(session, produto)
+        return json_response(
+            ProdutoPublic,
+            db_produto,
+            status_code=status.HTTP_201_CREATED,
+            headers=produto_service.version_of(db_produto).headers(),
+        )
+
+    return await banco.run(criar)
 
 
 @router.get("/", response_model=ProdutoPublicPaginated)
-def get_all_products(
-    session: SessionDep,
+async def get_all_products(
+    banco: BancoDep,
     q: str | None = None,
     min_preco: Decimal | None = None,
     max_preco: Decimal | None = None,
     skip: int = 0,
     limit: int = 10,
-) -> dict[str, Sequence[Produto] | int]:
-    """Retorna a lista de todos os produtos com paginação e filtro de busca geral por nome, descrição, intervalo de preço e unidade de medida."""
-    return produto_service.get_all_paginated(
-        session,
-        q=q,
-        min_preco=min_preco,
-        max_preco=max_preco,
-        skip=skip,
-        limit=limit,
+    fields: str | None = None,
+) -> Response:
+    """Retorna a lista de todos os produtos com paginação e filtro de busca geral por nome, descrição, intervalo de preço e unidade de medida.
+
+    'fields' (ex: 'nome,preco_base') limita as colunas buscadas e devolvidas de cada produto."""
+    campos = parse_campos(fields, campos_de_coluna(ProdutoPublic, Produto))
+    schema = ProdutoPublicPaginated
+    if campos:
+        schema = schema_projetado(ProdutoPublicPaginated, ProdutoPublic, campos)
+    return await cached_json_response(
+        "produtos",
+        {
+            "q": q,
+            "min_preco": min_preco,
+            "max_preco": max_preco,
+            "skip": skip,
+            "limit": limit,
+            "fields": campos,
+        },
+        schema,
+        banco,
+        lambda session: produto_service.get_all_paginated(
+            session,
+            q=q,
+            min_preco=min_preco,
+            max_preco=max_preco,
+            skip=skip,
+            limit=limit,
+            campos=campos,
+        ),
     )
 
 
 @router.get("/{id}", response_model=ProdutoPublic)
-def get_product_by_id(id: int, session: SessionDep) -> Produto:
-    """Busca um produto por ID se existir"""
-    return produto_service.get_or_404(session, id)
+async def get_product_by_id(id: int, banco: BancoDep, request: Request) -> Response:
+    """Busca um produto por ID se existir.
+
+    A resposta traz 'ETag' e 'Last-Modified'. Enviando-os de volta em 'If-None-Match' ou
+    'If-Modified-Since', a resposta é 304 (sem corpo) enquanto o produto não mudar."""
+
+    def buscar(session: Session) -> Response:
+        db_produto = produto_service.get_or_404(session, id)
+        versao = produto_service.version_of(db_produto)
+        if nao_modificado(request, versao):
+            return resposta_nao_modificada(versao)
+        return json_response(ProdutoPublic, db_produto, headers=versao.headers())
+
+    return await banco.run(buscar)
 
 
 @router.patch("/{id}", response_model=ProdutoPublic)
-def update_product(
-    id: int, produto: ProdutoUpdate, session: SessionDep
-) -> Produto:
-    """Atualiza dados de um produto de forma parcial."""
-    return produto_service.update(session, id, produto)
+async def update_product(
+    id: int, produto: ProdutoUpdate, banco: BancoDep, request: Request
+) -> Response:
+    """Atualiza dados de um produto de forma parcial.
+
+    Com 'If-Match' (a ETag lida antes), só atualiza se ninguém alterou o produto nesse meio tempo (senão, 412)."""
+
+    def atualizar(session: Session) -> Response:
+        verificar_if_match(
+            request, session, lambda: produto_service.get_version(session, id)
+        )
+        db_produto = produto_service.update(session, id, produto)
+        return json_response(
+            ProdutoPublic, db_produto, headers=produto_service.version_of(db_produto).headers()
+        )
+
+    return await banco.run(atualizar)
 
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(id: int, session: SessionDep):
-    """Remove um produto."""
-    produto_service.delete(session, id)
+async def delete_product(id: int, banco: BancoDep, request: Request):
+    """Remove um produto. Aceita 'If-Match', como a atualização."""
+
+    def remover(session: Session) -> None:
+        verificar_if_match(
+            request, session, lambda: produto_service.get_version(session, id)
+        )
+        produto_service.delete(session, id)
+
+    await banco.run(remover)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,162 @@
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, text
+
+from ..config import ARTE_WORKERS, engine
+from ..models import JobPublic, Pedido
+from ..utils.imagem import (
+    arts_missing_variants,
+    delete_art_image,
+    generate_missing_variants,
+    process_art_image,
+    save_pending_upload,
+)
+from ..utils.jobs import job_registry
+from .pedido_service import pedido_service
+
+
+def _lock_for_write(session: Session) -> None:
+    """Pega o lock de escrita do SQLite antes do lock do serviço, sempre nessa ordem
+    (a rota de upload pode já estar com ele por causa do If-Match)."""
+    if not session.connection().connection.dbapi_connection.in_transaction:  # type: ignore
+        session.execute(text("BEGIN IMMEDIATE"))
+
+
+class ArteService:
+    """Recebe os uploads de arte e converte as imagens em um pool de processos,
+    liberando a requisição assim que o arquivo original é gravado em disco."""
+
+    def __init__(self):
+        self._executor: ProcessPoolExecutor | None = None
+        # Última arte convertida de cada upload pendente, restaurada se a conversão falhar.
+        # Um novo envio para o mesmo item herda a arte do envio que ele substituiu
+        self._arte_anterior: dict[str, str | None] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Criado sob demanda; 'spawn' evita copiar as threads do servidor no fork
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=ARTE_WORKERS, mp_context=get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=False)
+            self._executor = None
+
+    def backfill_variants(self) -> None:
+        """Gera em segundo plano as miniaturas que faltam nas artes antigas."""
+        if arts_missing_variants():
+            self._get_executor().submit(generate_missing_variants)
+
+    def enqueue_upload(
+        self, session: Session, pedido_id: int, produto_id: int, file: UploadFile
+    ) -> tuple[Pedido, JobPublic]:
+        """Grava o upload, vincula o item ao arquivo pendente e agenda a conversão."""
+        origem = save_pending_upload(file, pedido_id, produto_id)
+        caminho_pendente = f"/uploads/pendentes/{origem.name}"
+
+        # Vincular o item e registrar a arte anterior juntos: um envio que termine nesse
+        # meio tempo já encontra a arte repassada para este
+        try:
+            _lock_for_write(session)
+            with self._lock:
+                db_pedido, caminho_antigo = pedido_service.set_pending_art(
+                    session, pedido_id, produto_id, caminho_pendente
+                )
+                if caminho_antigo and "/pendentes/" in caminho_antigo:
+                    # Outro envio ainda em conversão: o original dele será apagado
+                    caminho_antigo = self._arte_anterior.pop(caminho_antigo, None)
+                self._arte_anterior[caminho_pendente] = caminho_antigo
+        except Exception:
+            origem.unlink(missing_ok=True)
+            raise
+
+        job = job_registry.create("arte")
+        job_registry.start(job.id)
+
+        try:
+            future = self._get_executor().submit(process_art_image, str(origem))
+        except Exception as e:
+            # Sem a conversão o item ficaria pendente para sempre: volta para a arte anterior
+            self._apply(job.id, pedido_id, produto_id, caminho_pendente, None)
+            job_registry.fail(job.id, "Não foi possível agendar a conversão da arte.")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Não foi possível agendar a conversão da arte. Tente novamente.",
+            ) from e
+
+        future.add_done_callback(
+            lambda f: self._finish(f, job.id, pedido_id, produto_id, caminho_pendente)
+        )
+
+        return db_pedido, job
+
+    def _finish(
+        self,
+        future: Future,
+        job_id: str,
+        pedido_id: int,
+        produto_id: int,
+        caminho_pendente: str,
+    ) -> None:
+        # Qualquer erro do processo de conversão (imagem inválida, processo encerrado...)
+        falhou = future.cancelled() or future.exception() is not None
+        caminho_final = None if falhou else future.result()
+
+        self._apply(job_id, pedido_id, produto_id, caminho_pendente, caminho_final)
+
+    def _apply(
+        self,
+        job_id: str,
+        pedido_id: int,
+        produto_id: int,
+        caminho_pendente: str,
+        caminho_final: str | None,
+    ) -> None:
+        """Troca o arquivo pendente pela arte convertida e limpa o que ficou órfão.
+        Sem 'caminho_final' (conversão falhou), o item volta para a arte anterior."""
+        aplicado = False
+        caminho_antigo = None
+        try:
+            with Session(engine) as session:
+                _lock_for_write(session)
+                with self._lock:
+                    # Ausente quando um envio mais novo herdou a arte anterior
+                    caminho_antigo = self._arte_anterior.pop(caminho_pendente, None)
+                    aplicado = pedido_service.finish_pending_art(
+                        session,
+                        pedido_id,
+                        produto_id,
+                        caminho_pendente,
+                        caminho_final or caminho_antigo,
+                    )
+        except SQLAlchemyError as e:
+            print(f"Falha ao salvar a arte convertida do pedido {pedido_id}: {e}")
+
+        # O original só servia enquanto a conversão não terminava
+        delete_art_image(caminho_pendente)
+
+        # Arte convertida não vinculada (item removido ou substituído por outro upload)
+        if caminho_final and not aplicado:
+            delete_art_image(caminho_final)
+
+        # A arte anterior só continua em uso se foi restaurada após uma falha
+        if caminho_final or not aplicado:
+            delete_art_image(caminho_antigo)
+
+        if caminho_final is None:
+            job_registry.fail(job_id, "Erro ao processar imagem ou arquivo corrompido.")
+        elif not aplicado:
+            job_registry.fail(job_id, "O item não aponta mais para este upload.")
+        else:
+            job_registry.finish(job_id, resultado=caminho_final)
+
+
+arte_service = ArteService()
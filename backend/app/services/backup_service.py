@@ -0,0 +1,392 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Literal
+
+from anyio import to_thread
+from fastapi import HTTPException, status
+from sqlmodel import Session, create_engine
+
+from ..config import (
+    BACKUP_DIR,
+    BACKUP_KEEP_DAILY,
+    BACKUP_KEEP_HOURLY,
+    BACKUP_KEEP_WEEKLY,
+    async_engine,
+    create_db_and_tables,
+    db_path,
+    engine,
+)
+from ..models import BackupPublic, JobPublic
+from ..utils.cache import response_cache
+from ..utils.jobs import job_registry
+from .dashboard_service import dashboard_service
+
+PAGINAS_POR_PASSO = 256  # Páginas copiadas por passo da API de backup (~1 MB com páginas de 4 KB)
+PAUSA_ENTRE_PASSOS = 0.005  # Segundos entre os passos, liberando o banco para as escritas
+TAMANHO_BLOCO = 1024 * 1024
+
+# Guarda o hash do último snapshot para não repetir cópias idênticas
+ULTIMO_BACKUP = BACKUP_DIR / "ultimo_backup.json"
+# Resultados do integrity_check de cada snapshot
+VERIFICACOES = BACKUP_DIR / "verificacoes.json"
+
+FORMATO_DATA = "%Y-%m-%d_%H-%M-%S"
+# Arquivos curtos demais são abertos pelo SQLite como banco vazio e passariam no integrity_check
+CABECALHO_SQLITE = b"SQLite format 3\x00"
+# Backups gerados no mesmo segundo recebem um número no final (backup_..._2.db)
+NOME_BACKUP = re.compile(
+    r"^backup_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:_(\d+))?\.db(\.gz)?$"
+)
+
+Compressao = Literal["nenhuma", "gzip"]
+
+
+class BackupService:
+    """Backups online do SQLite: a cópia é feita página a página pela API de backup,
+    sem travar as escritas e sem o risco de copiar um arquivo pela metade."""
+
+    def __init__(self):
+        # Serializa backups, verificações, limpeza e restauração entre threads
+        self._lock = threading.Lock()
+
+    def _snapshot(self, destino: Path, progresso: Callable[[float], None]) -> None:
+        """Copia o banco para 'destino' em passos pela API de backup do SQLite."""
+
+        def ao_copiar(_status: int, restantes: int, total: int) -> None:
+            if total:
+                progresso((total - restantes) / total)
+
+        origem = sqlite3.connect(db_path)
+        copia = sqlite3.connect(destino)
+        try:
+            with copia:
+                origem.backup(
+                    copia,
+                    pages=PAGINAS_POR_PASSO,
+                    progress=ao_copiar,
+                    sleep=PAUSA_ENTRE_PASSOS,
+                )
+        finally:
+            copia.close()
+            origem.close()
+
+    def _finalize(self, temporario: Path, destino: Path, compressao: Compressao) -> None:
+        """Move o snapshot para o destino, comprimindo em streaming se pedido."""
+        if compressao == "gzip":
+            with open(temporario, "rb") as entrada, gzip.open(destino, "wb") as saida:
+                shutil.copyfileobj(entrada, saida, TAMANHO_BLOCO)
+            temporario.unlink()
+        else:
+            temporario.replace(destino)
+
+    def _hash_file(self, caminho: Path) -> str:
+        sha256 = hashlib.sha256()
+        with open(caminho, "rb") as arquivo:
+            while bloco := arquivo.read(TAMANHO_BLOCO):
+                sha256.update(bloco)
+        return sha256.hexdigest()
+
+    def _last_backup(self) -> dict[str, str] | None:
+        try:
+            ultimo = json.loads(ULTIMO_BACKUP.read_text())
+        except (OSError, ValueError):
+            return None
+
+        if not (BACKUP_DIR / Path(ultimo.get("arquivo", "")).name).is_file():
+            return None
+        return ultimo
+
+    def run_backup(
+        self,
+        compressao: Compressao = "nenhuma",
+        progresso: Callable[[float], None] = lambda _: None,
+    ) -> dict[str, str | bool]:
+        """Gera o snapshot com timestamp. Se o conteúdo for igual ao do último backup,
+        descarta a cópia nova e devolve o arquivo anterior.
+
+        Backups agendados, manuais e os feitos antes de uma restauração rodam um de cada
+        vez: dividem o arquivo temporário e a referência do último backup."""
+        if not db_path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Arquivo do banco de dados não encontrado para backup.",
+            )
+
+        with self._lock:
+            nome_backup = self._new_name(compressao)
+            temporario = BACKUP_DIR / f".{nome_backup}.tmp"
+
+            try:
+                self._snapshot(temporario, progresso)
+                sha256 = self._hash_file(temporario)
+
+                ultimo = self._last_backup()
+                if ultimo and ultimo.get("sha256") == sha256:
+                    temporario.unlink()
+                    return {"arquivo": ultimo["arquivo"], "deduplicado": True}
+
+                self._finalize(temporario, BACKUP_DIR / nome_backup, compressao)
+            except BaseException:
+                temporario.unlink(missing_ok=True)
+                raise
+
+            ULTIMO_BACKUP.write_text(
+                json.dumps({"arquivo": nome_backup, "sha256": sha256})
+            )
+        return {"arquivo": nome_backup, "deduplicado": False}
+
+    def _new_name(self, compressao: Compressao) -> str:
+        """Nome com a data e hora atual (Ex: backup_2026-03-01_14-30-05.db), numerado
+        quando já existe um backup do mesmo segundo."""
+        base = f"backup_{datetime.now().strftime(FORMATO_DATA)}"
+        nome, numero = base, 1
+        while any((BACKUP_DIR / f"{nome}{ext}").exists() for ext in (".db", ".db.gz")):
+            numero += 1
+            nome = f"{base}_{numero}"
+        return f"{nome}.db" + (".gz" if compressao == "gzip" else "")
+
+    def get_backup_path(self, nome: str) -> Path:
+        """Valida o nome do backup (sem caminhos) e devolve o arquivo ou lança 404."""
+        caminho = BACKUP_DIR / Path(nome).name
+        if not NOME_BACKUP.match(caminho.name) or not caminho.is_file():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Backup não encontrado."
+            )
+        return caminho
+
+    def _read_checks(self) -> dict[str, dict[str, Any]]:
+        try:
+            return json.loads(VERIFICACOES.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_checks(self, verificacoes: dict[str, dict[str, Any]]) -> None:
+        # Descarta resultados de backups que já foram apagados
+        existentes = {v: r for v, r in verificacoes.items() if (BACKUP_DIR / v).is_file()}
+        VERIFICACOES.write_text(json.dumps(existentes))
+
+    def list_backups(self) -> list[BackupPublic]:
+        """Lista os backups do mais recente para o mais antigo."""
+        verificacoes = self._read_checks()
+        backups: list[tuple[int, BackupPublic]] = []
+
+        for caminho in BACKUP_DIR.iterdir():
+            encontrado = NOME_BACKUP.match(caminho.name)
+            if not encontrado or not caminho.is_file():
+                continue
+
+            verificacao = verificacoes.get(caminho.name, {})
+            numero = int(encontrado.group(2) or 1)
+            backups.append(
+                (
+                    numero,
+                    BackupPublic(
+                        nome=caminho.name,
+                        tamanho=caminho.stat().st_size,
+                        criado_em=datetime.strptime(encontrado.group(1), FORMATO_DATA),
+                        comprimido=caminho.suffix == ".gz",
+                        integro=verificacao.get("integro"),
+                        verificado_em=verificacao.get("verificado_em"),
+                    ),
+                )
+            )
+
+        # Backups do mesmo segundo ficam na ordem em que foram numerados
+        backups.sort(key=lambda b: (b[1].criado_em, b[0]), reverse=True)
+        return [backup for _, backup in backups]
+
+    def _extract(self, caminho: Path, pasta: str) -> Path:
+        """Devolve um arquivo .db legível pelo SQLite, descomprimindo em 'pasta' se preciso."""
+        if caminho.suffix != ".gz":
+            return caminho
+
+        destino = Path(pasta) / caminho.with_suffix("").name
+        try:
+            with gzip.open(caminho, "rb") as entrada, open(destino, "wb") as saida:
+                shutil.copyfileobj(entrada, saida, TAMANHO_BLOCO)
+        except (OSError, EOFError):
+            # Arquivo .gz truncado ou inválido: o snapshot fica vazio e falha na verificação
+            destino.write_bytes(b"")
+        return destino
+
+    def verify_backup(self, nome: str) -> bool:
+        """Roda o PRAGMA integrity_check no snapshot e registra o resultado."""
+        caminho = self.get_backup_path(nome)
+
+        with tempfile.TemporaryDirectory(dir=BACKUP_DIR) as pasta:
+            arquivo = self._extract(caminho, pasta)
+            with open(arquivo, "rb") as conteudo:
+                cabecalho_valido = conteudo.read(len(CABECALHO_SQLITE)) == CABECALHO_SQLITE
+            try:
+                # Abre só para leitura para não alterar o snapshot
+                conexao = sqlite3.connect(f"file:{arquivo}?mode=ro", uri=True)
+                try:
+                    resultado = conexao.execute("PRAGMA integrity_check").fetchone()[0]
+                finally:
+                    conexao.close()
+                integro = cabecalho_valido and resultado == "ok"
+            except sqlite3.DatabaseError:
+                integro = False
+
+        with self._lock:
+            verificacoes = self._read_checks()
+            verificacoes[caminho.name] = {
+                "integro": integro,
+                "verificado_em": datetime.now().isoformat(),
+            }
+            self._save_checks(verificacoes)
+
+        return integro
+
+    def apply_retention(self, agora: datetime | None = None) -> list[str]:
+        """
+        Mantém o backup mais recente de cada uma das últimas N horas, N dias e N semanas
+        e apaga o restante. O último backup (referência da deduplicação) nunca é apagado.
+        """
+        agora = agora or datetime.now()
+        faixas = [
+            (BACKUP_KEEP_HOURLY, timedelta(hours=1), "%Y-%m-%d %H"),
+            (BACKUP_KEEP_DAILY, timedelta(days=1), "%Y-%m-%d"),
+            (BACKUP_KEEP_WEEKLY, timedelta(weeks=1), "%G-%V"),
+        ]
+
+        manter = set()
+        ultimo = self._last_backup()
+        if ultimo:
+            manter.add(ultimo["arquivo"])
+
+        backups = self.list_backups()  # Do mais recente para o mais antigo
+        for quantidade, periodo, chave in faixas:
+            limite = agora - periodo * quantidade
+            vistos = set()
+            for backup in backups:
+                faixa = backup.criado_em.strftime(chave)
+                if backup.criado_em >= limite and faixa not in vistos:
+                    vistos.add(faixa)
+                    manter.add(backup.nome)
+
+        removidos = []
+        with self._lock:
+            for backup in backups:
+                if backup.nome not in manter:
+                    (BACKUP_DIR / backup.nome).unlink(missing_ok=True)
+                    removidos.append(backup.nome)
+            self._save_checks(self._read_checks())
+
+        return removidos
+
+    def restore_backup(self, nome: str) -> dict[str, str | bool]:
+        """
+        Substitui o banco atual pelo snapshot. O snapshot é verificado antes e um
+        backup do estado atual é feito, permitindo desfazer a restauração.
+        """
+        caminho = self.get_backup_path(nome)
+        if not self.verify_backup(nome):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="O backup está corrompido e não pode ser restaurado.",
+            )
+
+        anterior = self.run_backup()
+
+        with self._lock, tempfile.TemporaryDirectory(dir=BACKUP_DIR) as pasta:
+            arquivo = self._upgrade_copy(caminho, pasta)
+
+            # A API de backup grava no banco em uso com o lock de escrita do próprio
+            # SQLite, então as outras conexões nunca veem um arquivo pela metade
+            origem = sqlite3.connect(f"file:{arquivo}?mode=ro", uri=True)
+            destino = sqlite3.connect(db_path, timeout=30)
+            try:
+                with destino:
+                    origem.backup(destino)
+            finally:
+                destino.close()
+                origem.close()
+
+        # Conexões do pool e respostas em cache ainda refletem o banco antigo.
+        # As conexões do aiosqlite pertencem ao event loop da aplicação: o pool é
+        # trocado sem fechá-las aqui
+        engine.dispose()
+        if async_engine is not None:
+            async_engine.sync_engine.dispose(close=False)
+        response_cache.clear()
+
+        return {"restaurado": caminho.name, "backup_anterior": anterior["arquivo"]}
+
+    def _upgrade_copy(self, caminho: Path, pasta: str) -> Path:
+        """
+        Copia o snapshot para 'pasta' e aplica as mesmas atualizações da inicialização
+        (migrações, índices de busca e resumos do dashboard). Um backup feito por uma
+        versão anterior entra no banco já com o esquema atual.
+        """
+        arquivo = self._extract(caminho, pasta)
+        if arquivo == caminho:
+            arquivo = Path(pasta) / caminho.name
+            shutil.copyfile(caminho, arquivo)
+
+        motor = create_engine(f"sqlite:///{arquivo}")
+        try:
+            create_db_and_tables(motor)
+            # Os resumos do snapshot podem faltar ou ser de antes de alguma coluna nova
+            with Session(motor) as session:
+                dashboard_service.rebuild_summary(session)
+        finally:
+            motor.dispose()
+        return arquivo
+
+    def backup_and_maintain(
+        self,
+        compressao: Compressao = "nenhuma",
+        progresso: Callable[[float], None] = lambda _: None,
+    ) -> dict[str, Any]:
+        """Faz o backup, verifica a integridade do snapshot e aplica a retenção."""
+        resultado: dict[str, Any] = dict(self.run_backup(compressao, progresso))
+        resultado["integro"] = self.verify_backup(resultado["arquivo"])
+        resultado["removidos"] = self.apply_retention()
+        return resultado
+
+    def start_backup(self, compressao: Compressao = "nenhuma") -> JobPublic:
+        """Agenda o backup em segundo plano e devolve a tarefa para acompanhamento."""
+        if not db_path.exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Arquivo do banco de dados não encontrado para backup.",
+            )
+
+        return job_registry.run_in_background(
+            "backup",
+            lambda job: self.backup_and_maintain(
+                compressao, progresso=lambda p: job_registry.update(job.id, progresso=p)
+            ),
+        )
+
+    def start_restore(self, nome: str) -> JobPublic:
+        """Agenda a restauração em segundo plano."""
+        self.get_backup_path(nome)
+        return job_registry.run_in_background(
+            "restauracao", lambda _: self.restore_backup(nome)
+        )
+
+    async def run_schedule(self, intervalo_minutos: int) -> None:
+        """Laço do agendador, iniciado no lifespan da aplicação."""
+        while True:
+            await asyncio.sleep(intervalo_minutos * 60)
+            try:
+                if db_path.exists():
+                    resultado = await to_thread.run_sync(self.backup_and_maintain)
+                    print(f"Backup automático concluído: {resultado}")
+            except (HTTPException, OSError, sqlite3.Error) as e:
+                print(f"Falha no backup automático: {e}")
+
+
+backup_service = BackupService()
@@ -1,10 +1,14 @@
 from typing import Any, Generic, Sequence, Type, TypeVar
 
 from fastapi import HTTPException, status
-from sqlalchemy import func, or_
+from sqlalchemy import Row, func, or_
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, SQLModel, select
 
+from ..utils.busca import busca_fts, fts_disponivel, montar_termo_fts
+from ..utils.cache import response_cache
+from ..utils.condicional import Versao, criar_versao
+
 # Define tipos genéricos para a model e para os schemas de criação e atualização
 ModelType = TypeVar("ModelType", bound=SQLModel)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=SQLModel)
@@ -12,9 +16,26 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=SQLModel)
 
 
 class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Índice FTS5 usado na busca textual ('q'). Sem ele, a busca usa LIKE nos 'search_fields'
+    fts_index: str | None = None
+
+    # Namespaces do cache de respostas que dependem dos dados desta model
+    cache_namespaces: tuple[str, ...] = ()
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    def _invalidate_cache(self) -> None:
+        """Descarta as respostas em cache afetadas por uma escrita já comitada."""
+        if self.cache_namespaces:
+            response_cache.invalidate(*self.cache_namespaces)
+
+    def _fts_term(self, q: str | None) -> str | None:
+        """Retorna o termo MATCH para 'q' se a busca FTS estiver disponível para a model."""
+        if not q or not self.fts_index or not fts_disponivel():
+            return None
+        return montar_termo_fts(q)
+
     def get_by_id(self, session: Session, id: Any) -> ModelType | None:
         """Busca básica por ID."""
         return session.get(self.model, id)
@@ -28,6 +49,30 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
         return db_obj
 
+    def _version_query(self, id: Any) -> Any:
+        """Colunas que mudam a cada escrita do registro (ver '_version_marks')."""
+        return select(self.model.updated_at).where(self.model.id == id)  # type: ignore
+
+    def _version_marks(self, db_obj: ModelType) -> tuple[Any, ...]:
+        """Os mesmos valores de '_version_query', tirados do objeto já carregado."""
+        return (db_obj.updated_at,)  # type: ignore
+
+    def version_of(self, db_obj: ModelType) -> Versao:
+        """ETag e data de alteração do objeto já carregado."""
+        return criar_versao(
+            self.model.__tablename__, db_obj.id, self._version_marks(db_obj)  # type: ignore
+        )
+
+    def get_version(
+        self, session: Session, id: Any, detail: str = "Recurso não encontrado"
+    ) -> Versao:
+        """ETag e data de alteração atuais sem carregar o registro (nem as relações)."""
+        marcas = session.exec(self._version_query(id)).first()
+        if marcas is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+        marcas = tuple(marcas) if isinstance(marcas, Row) else (marcas,)
+        return criar_versao(self.model.__tablename__, id, marcas)  # type: ignore
+
     def get_all(
         self,
         session: Session,
@@ -35,8 +80,10 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         skip: int = 0,
         limit: int = 10,
         search_fields: list[str] | None = None,
-    ) -> dict[str, Sequence[ModelType] | int]:
-        """Retorna todos os registros da tabela paginados e filtrados."""
+        campos: Sequence[str] | None = None,
+    ) -> dict[str, Sequence[ModelType] | Sequence[dict[str, Any]] | int]:
+        """Retorna todos os registros da tabela paginados e filtrados.
+        Com 'campos', busca só essas colunas e devolve dicionários em vez de objetos."""
 
         # Trava de segurança para desempenho
         if limit > 100:
@@ -44,8 +91,15 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         query = select(self.model)
 
-        # Aplica busca se houver 'q' e campos definidos
-        if q and search_fields:
+        # Busca pelo índice FTS, ordenando pela relevância
+        if termo := self._fts_term(q):
+            busca = busca_fts(self.fts_index, termo)  # type: ignore
+            query = query.join(
+                busca, busca.c.rowid == self.model.id  # type: ignore
+            ).order_by(busca.c.rank)
+
+        # Sem FTS, aplica busca com LIKE se houver 'q' e campos definidos
+        elif q and search_fields:
             filters = [
                 getattr(self.model, field).ilike(f"%{q}%") for field in search_fields
             ]
@@ -59,17 +113,27 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
 
         # Aplica e executa paginação
         query = query.offset(skip).limit(limit)
+        if campos:
+            return {"dados": self._select_columns(session, query, campos), "total": total}
         results = session.exec(query).all()
 
         return {"dados": results, "total": total}
 
+    def _select_columns(
+        self, session: Session, query: Any, campos: Sequence[str]
+    ) -> list[dict[str, Any]]:
+        """Executa a query trazendo só as colunas pedidas (sem montar objetos do ORM)."""
+        colunas = [getattr(self.model, campo) for campo in campos]
+        resultado = session.execute(query.with_only_columns(*colunas))
+        return [dict(linha) for linha in resultado.mappings()]
+
     def create(self, session: Session, obj: CreateSchemaType) -> ModelType:
-        """Cria, comita e atualiza o objeto no banco."""
+        """Cria e comita o objeto. O id e os valores gerados no flush já ficam no objeto."""
         try:
             db_obj = self.model.model_validate(obj)
             session.add(db_obj)
             session.commit()
-            session.refresh(db_obj)
+            self._invalidate_cache()
             return db_obj
         except IntegrityError:
             session.rollback()
@@ -92,7 +156,7 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         try:
             session.add(db_obj)
             session.commit()
-            session.refresh(db_obj)
+            self._invalidate_cache()
             return db_obj
         except IntegrityError:
             session.rollback()
@@ -111,6 +175,7 @@ class BaseService(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         try:
             session.delete(db_obj)
             session.commit()
+            self._invalidate_cache()
         # Captura exception de forma genérica para dar mensagem personalizada
         except Exception:
             session.rollback()
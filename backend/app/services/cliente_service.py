@@ -1,9 +1,125 @@
+import calendar
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import and_, case, func, or_
+from sqlmodel import Session, select
+
 from ..models import Cliente, ClienteCreate, ClienteUpdate
 from .base_service import BaseService
 
 
+def _janela_aniversarios(inicio: date, dias: int) -> list[tuple[int, int, int]]:
+    """
+    Divide a janela [inicio, inicio + dias] em trechos (mês, primeiro dia, último dia),
+    um por mês coberto, atravessando a virada do mês e do ano.
+    """
+    fim = inicio + timedelta(days=dias)
+    trechos = []
+    atual = inicio
+    while atual <= fim:
+        ultimo_do_mes = date(
+            atual.year, atual.month, calendar.monthrange(atual.year, atual.month)[1]
+        )
+        ate = min(fim, ultimo_do_mes)
+        ultimo_dia = ate.day
+        # Quem nasceu em 29/02 comemora em 28/02 nos anos não bissextos
+        if ate.month == 2 and ate.day == 28 and not calendar.isleap(ate.year):
+            ultimo_dia = 29
+        trechos.append((atual.month, atual.day, ultimo_dia))
+        atual = ate + timedelta(days=1)
+    return trechos
+
+
+def _proximo_aniversario(mes: int, dia: int, hoje: date) -> date:
+    for ano in (hoje.year, hoje.year + 1):
+        try:
+            aniversario = date(ano, mes, dia)
+        except ValueError:  # 29/02 em ano não bissexto
+            aniversario = date(ano, 2, 28)
+        if aniversario >= hoje:
+            return aniversario
+    raise ValueError("Data de aniversário inválida")
+
+
 class ClienteService(BaseService[Cliente, ClienteCreate, ClienteUpdate]):
-    pass
+    fts_index = "cliente_fts"
+    # Clientes aparecem nos pedidos recentes e nos aniversariantes do dashboard
+    cache_namespaces = ("clientes", "dashboard")
+
+    def get_upcoming_birthdays(
+        self,
+        session: Session,
+        dias: int = 30,
+        skip: int = 0,
+        limit: int = 10,
+        hoje: date | None = None,
+    ) -> dict[str, list[dict[str, Any]] | int]:
+        """
+        Clientes que fazem aniversário de hoje até daqui a 'dias' dias, do mais próximo
+        ao mais distante. Filtra pelo índice (mes_nascimento, dia_nascimento), um
+        intervalo por mês da janela, e busca só as colunas da resposta.
+        """
+        # Travas de segurança: no máximo um ano de janela e 100 por página
+        dias = min(max(dias, 0), 365)
+        limit = min(limit, 100)
+        hoje = hoje or date.today()
+
+        filtro = or_(
+            *(
+                and_(
+                    Cliente.mes_nascimento == mes,
+                    Cliente.dia_nascimento.between(primeiro, ultimo),  # type: ignore
+                )
+                for mes, primeiro, ultimo in _janela_aniversarios(hoje, dias)
+            )
+        )
+        total = session.exec(
+            select(func.count()).select_from(Cliente).where(filtro)
+        ).one()
+
+        # Posição do aniversário contada a partir de hoje (os meses já passados no ano
+        # vão para o fim), para ordenar e paginar no próprio banco
+        ordem = (
+            (Cliente.mes_nascimento - hoje.month + 12) % 12 * 31
+            + Cliente.dia_nascimento
+            + case(
+                (
+                    and_(
+                        Cliente.mes_nascimento == hoje.month,
+                        Cliente.dia_nascimento < hoje.day,
+                    ),
+                    12 * 31,
+                ),
+                else_=0,
+            )
+        )
+        query = (
+            select(
+                Cliente.id,
+                Cliente.nome,
+                Cliente.telefone,
+                Cliente.data_nascimento,
+                Cliente.mes_nascimento,
+                Cliente.dia_nascimento,
+            )
+            .where(filtro)
+            .order_by(ordem, Cliente.nome)
+            .offset(skip)
+            .limit(limit)
+        )
+
+        dados = []
+        for linha in session.execute(query).mappings():
+            linha = dict(linha)
+            proximo = _proximo_aniversario(
+                linha.pop("mes_nascimento"), linha.pop("dia_nascimento"), hoje
+            )
+            linha["proximo_aniversario"] = proximo
+            linha["dias_restantes"] = (proximo - hoje).days
+            dados.append(linha)
+
+        return {"dados": dados, "total": total}
 
 
 cliente_service = ClienteService(Cliente)
@@ -1,23 +1,280 @@
-from datetime import datetime
+from collections.abc import Iterator
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import extract, func
+from fastapi import HTTPException
+from fastapi import status as http_status
+from sqlalchemy import case, delete, func, insert
 from sqlalchemy.orm import joinedload
 from sqlmodel import Session, select
 
-from ..models import Cliente, Pedido, StatusPedido
-from ..models.dashboard import DashboardResponse, DashboardStats
+from ..config import engine
+from ..models import Cliente, JobPublic, Pedido, ResumoStatus, StatusPedido
+from ..models.dashboard import (
+    Agrupamento,
+    DashboardResponse,
+    DashboardStats,
+    ResumoDiario,
+)
+from ..utils.cache import response_cache
+from ..utils.jobs import job_registry
+
+# Status cujos pedidos ainda não contam como faturamento
+STATUS_SEM_FATURAMENTO = (
+    StatusPedido.CANCELADO,
+    StatusPedido.AGUARDANDO_PAGAMENTO,
+    StatusPedido.AGUARDANDO_ARTE,
+)
+
+# Trava de segurança: pontos por série
+MAX_PONTOS_SERIE = 1000
+
+
+def _inicio_periodo(data: date, agrupamento: Agrupamento) -> date:
+    if agrupamento == "semana":
+        return data - timedelta(days=data.weekday())
+    if agrupamento == "mes":
+        return data.replace(day=1)
+    return data
+
+
+def _somar_periodos(periodo: date, quantidade: int, agrupamento: Agrupamento) -> date:
+    """Avança (ou recua) 'quantidade' períodos a partir do início de um período."""
+    if agrupamento == "dia":
+        return periodo + timedelta(days=quantidade)
+    if agrupamento == "semana":
+        return periodo + timedelta(weeks=quantidade)
+    meses = periodo.year * 12 + periodo.month - 1 + quantidade
+    return date(meses // 12, meses % 12 + 1, 1)
+
+
+def _periodos(inicio: date, fim: date, agrupamento: Agrupamento) -> Iterator[date]:
+    """Primeiro dia de cada período entre as datas, inclusive os que não têm pedidos."""
+    atual = _inicio_periodo(inicio, agrupamento)
+    while atual <= fim:
+        yield atual
+        atual = _somar_periodos(atual, 1, agrupamento)
 
 
 class DashboardService:
-    def get_dashboard_data(self, session: Session) -> DashboardResponse:
+    def _calculate_summary(self, session: Session) -> dict[str, tuple[int, Decimal]]:
+        """Agrega a tabela de pedidos inteira por status (usado só na conferência/reconstrução)."""
         query_stats = select(
             Pedido.status,
             func.count(Pedido.id),  # type: ignore
             func.sum(Pedido.total),
         ).group_by(Pedido.status)
 
-        resultados = session.exec(query_stats).all()
+        return {
+            status: (contagem, Decimal(str(soma or 0)))
+            for status, contagem, soma in session.exec(query_stats).all()
+        }
+
+    def _calculate_daily(
+        self, session: Session
+    ) -> dict[tuple[str, str], tuple[int, Decimal, int]]:
+        """Agrega a tabela de pedidos inteira por dia e status (conferência do resumo diário)."""
+        query = select(
+            Pedido.data_pedido,
+            Pedido.status,
+            func.count(Pedido.id),  # type: ignore
+            func.sum(Pedido.total),
+            func.sum(Pedido.qtd_unidades),
+        ).group_by(Pedido.data_pedido, Pedido.status)
+
+        return {
+            (str(data), status): (contagem, Decimal(str(soma or 0)), unidades or 0)
+            for data, status, contagem, soma, unidades in session.exec(query).all()
+        }
+
+    def check_summary(self, session: Session) -> list[str]:
+        """Compara os resumos materializados com a agregação real e lista as divergências."""
+        esperado = self._calculate_summary(session)
+        atual = {
+            r.status: (r.quantidade, Decimal(str(r.total)))
+            for r in session.exec(select(ResumoStatus)).all()
+        }
+
+        divergencias = []
+        for status in sorted(esperado.keys() | atual.keys()):
+            qtd_esperada, total_esperado = esperado.get(status, (0, Decimal(0)))
+            qtd_atual, total_atual = atual.get(status, (0, Decimal(0)))
+            if qtd_esperada != qtd_atual or abs(total_esperado - total_atual) >= Decimal("0.01"):
+                divergencias.append(
+                    f"{status}: resumo={qtd_atual}/{total_atual} real={qtd_esperada}/{total_esperado}"
+                )
+
+        esperado_diario = self._calculate_daily(session)
+        atual_diario = {
+            (str(r.data), r.status): (r.quantidade, Decimal(str(r.total)), r.unidades)
+            for r in session.exec(select(ResumoDiario)).all()
+        }
+        vazio = (0, Decimal(0), 0)
+        for chave in sorted(esperado_diario.keys() | atual_diario.keys()):
+            qtd_esperada, total_esperado, unid_esperadas = esperado_diario.get(chave, vazio)
+            qtd_atual, total_atual, unid_atuais = atual_diario.get(chave, vazio)
+            if (
+                qtd_esperada != qtd_atual
+                or unid_esperadas != unid_atuais
+                or abs(total_esperado - total_atual) >= Decimal("0.01")
+            ):
+                divergencias.append(
+                    f"{chave[0]} {chave[1]}: resumo={qtd_atual}/{total_atual}/{unid_atuais}"
+                    f" real={qtd_esperada}/{total_esperado}/{unid_esperadas}"
+                )
+        return divergencias
+
+    def _rebuild_status_summary(self, session: Session) -> None:
+        session.exec(delete(ResumoStatus))  # type: ignore
+        for status, (contagem, soma) in self._calculate_summary(session).items():
+            session.add(ResumoStatus(status=status, quantidade=contagem, total=soma))
+
+    def _rebuild_daily_summary(self, session: Session) -> None:
+        # Um único INSERT ... SELECT: o histórico inteiro é agregado dentro do SQLite
+        session.exec(delete(ResumoDiario))  # type: ignore
+        agregado = select(
+            Pedido.data_pedido,
+            Pedido.status,
+            func.count(Pedido.id),  # type: ignore
+            func.round(func.sum(Pedido.total), 2),
+            func.sum(Pedido.qtd_unidades),
+        ).group_by(Pedido.data_pedido, Pedido.status)
+        session.execute(
+            insert(ResumoDiario).from_select(  # type: ignore
+                ["data", "status", "quantidade", "total", "unidades"], agregado
+            )
+        )
+
+    def rebuild_summary(self, session: Session) -> None:
+        """Recria os resumos (por status e por dia) a partir da tabela de pedidos."""
+        self._rebuild_status_summary(session)
+        self._rebuild_daily_summary(session)
+        session.commit()
+        response_cache.invalidate("dashboard")
+
+    def start_rebuild(self) -> JobPublic:
+        """Agenda a reconstrução dos resumos em segundo plano (histórico inteiro)."""
+
+        def reconstruir(_: JobPublic) -> dict[str, int]:
+            with Session(engine) as session:
+                self.rebuild_summary(session)
+                dias = session.exec(
+                    select(func.count(func.distinct(ResumoDiario.data)))
+                ).one()
+            return {"dias": dias}
+
+        return job_registry.run_in_background("resumo", reconstruir)
+
+    def ensure_summary(self, session: Session) -> None:
+        """Popula os resumos em bancos que já tinham pedidos antes das tabelas existirem."""
+        if not session.exec(select(Pedido.id).limit(1)).first():
+            return
+
+        if not session.exec(select(ResumoStatus.status).limit(1)).first():
+            self._rebuild_status_summary(session)
+        if not session.exec(select(ResumoDiario.data).limit(1)).first():
+            self._rebuild_daily_summary(session)
+        session.commit()
+
+    def get_series(
+        self,
+        session: Session,
+        inicio: date | None = None,
+        fim: date | None = None,
+        agrupamento: Agrupamento = "dia",
+        status_pedido: str | None = None,
+    ) -> dict[str, Any]:
+        """
+        Pedidos, faturamento e unidades por dia, semana ou mês, lidos do resumo diário.
+        'pedidos' e 'unidades' contam todos os status (ou só 'status_pedido');
+        'faturamento' segue a regra do dashboard e ignora os status sem faturamento.
+        Os períodos são sempre completos: 'inicio' e 'fim' são estendidos até o começo
+        e o fim dos seus períodos. Sem 'inicio', cobre os últimos 30 dias, 12 semanas
+        ou 12 meses.
+        """
+        fim = fim or date.today()
+        if inicio is None:
+            quantidade = 30 if agrupamento == "dia" else 12
+            inicio = _somar_periodos(
+                _inicio_periodo(fim, agrupamento), 1 - quantidade, agrupamento
+            )
+
+        if inicio > fim:
+            raise HTTPException(
+                status_code=http_status.HTTP_400_BAD_REQUEST,
+                detail="A data inicial não pode ser posterior à data final.",
+            )
+
+        periodos = []
+        for periodo in _periodos(inicio, fim, agrupamento):
+            periodos.append(periodo)
+            if len(periodos) > MAX_PONTOS_SERIE:
+                raise HTTPException(
+                    status_code=http_status.HTTP_400_BAD_REQUEST,
+                    detail=f"Intervalo muito longo: a série pode ter no máximo {MAX_PONTOS_SERIE} pontos. Use um agrupamento maior.",
+                )
+        inicio = periodos[0]
+        fim = _somar_periodos(periodos[-1], 1, agrupamento) - timedelta(days=1)
+
+        if agrupamento == "semana":
+            # Segunda-feira da semana ('weekday 0' avança até o domingo)
+            coluna_periodo = func.date(ResumoDiario.data, "weekday 0", "-6 days")
+        elif agrupamento == "mes":
+            coluna_periodo = func.strftime("%Y-%m-01", ResumoDiario.data)
+        else:
+            coluna_periodo = ResumoDiario.data
+
+        faturamento = func.sum(
+            case(
+                (ResumoDiario.status.not_in(STATUS_SEM_FATURAMENTO), ResumoDiario.total),  # type: ignore
+                else_=0,
+            )
+        )
+        query = (
+            select(
+                coluna_periodo,
+                func.sum(ResumoDiario.quantidade),
+                faturamento,
+                func.sum(ResumoDiario.unidades),
+            )
+            .where(ResumoDiario.data.between(inicio, fim))  # type: ignore
+            .group_by(coluna_periodo)
+        )
+        if status_pedido:
+            query = query.where(ResumoDiario.status == status_pedido)
+
+        valores = {
+            str(periodo): (pedidos, soma, unidades)
+            for periodo, pedidos, soma, unidades in session.exec(query).all()
+        }
+
+        pontos = []
+        for periodo in periodos:
+            pedidos, soma, unidades = valores.get(periodo.isoformat(), (0, 0, 0))
+            pontos.append(
+                {
+                    "periodo": periodo,
+                    "pedidos": pedidos,
+                    "faturamento": Decimal(str(soma or 0)).quantize(Decimal("0.01")),
+                    "unidades": unidades or 0,
+                }
+            )
+
+        return {
+            "inicio": inicio,
+            "fim": fim,
+            "agrupamento": agrupamento,
+            "status": status_pedido,
+            "pontos": pontos,
+        }
+
+    def get_dashboard_data(self, session: Session) -> DashboardResponse:
+        # Lê o resumo materializado (uma linha por status)
+        resultados = [
+            (r.status, r.quantidade, r.total)
+            for r in session.exec(select(ResumoStatus)).all()
+        ]
 
         # Dicionário para armazenar valores padrão e passar direto pro objeto
         status_dict: dict[str, int | Decimal] = {
@@ -50,11 +307,7 @@ class DashboardService:
                 status_dict["concluidos"] = contagem
 
             # Regras de negócio de faturamento e ativos
-            if status not in [
-                StatusPedido.CANCELADO,
-                StatusPedido.AGUARDANDO_PAGAMENTO,
-                StatusPedido.AGUARDANDO_ARTE,
-            ]:
+            if status not in STATUS_SEM_FATURAMENTO:
                 status_dict["faturamento"] += Decimal(soma)
 
             if status not in [StatusPedido.CONCLUIDO, StatusPedido.CANCELADO]:
@@ -67,12 +320,14 @@ class DashboardService:
             .order_by(Pedido.id.desc())  # type: ignore
             .limit(5)
         )
-        recentes = session.exec(query_recentes).unique().all()
+        recentes = session.exec(query_recentes).all()
 
-        # Aniversariantes do mês
+        # Aniversariantes do mês (pelo índice do mês e dia de nascimento)
         mes_atual = datetime.now().month
-        query_aniversariantes = select(Cliente).where(
-            extract("month", Cliente.data_nascimento) == mes_atual  # type: ignore
+        query_aniversariantes = (
+            select(Cliente)
+            .where(Cliente.mes_nascimento == mes_atual)
+            .order_by(Cliente.dia_nascimento)  # type: ignore
         )
         aniversariantes = session.exec(query_aniversariantes).all()
 
@@ -0,0 +1,231 @@
+import csv
+import json
+import re
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any, TextIO
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from ..models import (
+    Cliente,
+    ErroImportacao,
+    ImportacaoResultado,
+    Pedido,
+    PedidoCreate,
+)
+from .pedido_service import pedido_service
+
+TAMANHO_LOTE = 500  # Pedidos validados e gravados por transação
+
+# Colunas do CSV que pertencem ao pedido (lidas da primeira linha de cada 'ref')
+COLUNAS_PEDIDO = [
+    "cliente_id",
+    "data_pedido",
+    "data_conclusao",
+    "status",
+    "observacoes",
+    "desconto",
+]
+COLUNAS_DECIMAIS = ["desconto", "preco_unitario"]
+
+# Decimal com vírgula das planilhas brasileiras: '12,5' ou '1.234,56' (ponto só como milhar)
+DECIMAL_VIRGULA = re.compile(r"^-?(?:\d{1,3}(?:\.\d{3})+|\d+),\d+$")
+
+# Cada linha do arquivo vira (número da linha, dados do pedido ou mensagem de erro)
+LinhaImportacao = tuple[int, dict[str, Any] | str]
+
+
+def read_ndjson(arquivo: TextIO) -> Iterator[LinhaImportacao]:
+    """Lê um pedido (no formato do POST /pedidos/) por linha."""
+    for numero, linha in enumerate(arquivo, start=1):
+        if not linha.strip():
+            continue
+        try:
+            dados = json.loads(linha)
+        except json.JSONDecodeError:
+            yield numero, "JSON inválido."
+            continue
+
+        if not isinstance(dados, dict):
+            yield numero, "Cada linha deve conter um objeto JSON."
+            continue
+        yield numero, dados
+
+
+def _decimal_com_virgula(valor: str) -> str:
+    """
+    Converte '1.234,56' em '1234.56'. O ponto só é tratado como separador de milhar
+    quando o valor também tem a vírgula decimal: '12.5' continua 12.5. Valores fora
+    desses formatos ficam como vieram e são recusados na validação da linha.
+    """
+    if DECIMAL_VIRGULA.match(valor):
+        return valor.replace(".", "").replace(",", ".")
+    return valor
+
+
+def read_csv(arquivo: TextIO) -> Iterator[LinhaImportacao]:
+    """
+    Lê um CSV com uma linha por item. Linhas consecutivas com a mesma 'ref' formam um
+    pedido e os dados do pedido vêm da primeira delas. Aceita ',' ou ';' como separador
+    (com ';' os valores decimais podem usar vírgula, como nas planilhas brasileiras).
+
+    Cada pedido é entregue assim que a 'ref' muda, sem guardar o arquivo inteiro.
+    Uma 'ref' que reaparece depois de outras é relatada como erro.
+    """
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    dialeto = csv.Sniffer().sniff(amostra, delimiters=",;")
+    virgula_decimal = dialeto.delimiter == ";"
+
+    leitor = csv.DictReader(arquivo, dialect=dialeto)
+    atual: tuple[str, int, dict[str, Any]] | None = None
+    concluidas: set[str] = set()
+
+    # O cabeçalho é a linha 1
+    for numero, linha in enumerate(leitor, start=2):
+        valores = {k.strip(): (v or "").strip() for k, v in linha.items() if k}
+        for coluna in COLUNAS_DECIMAIS:
+            if virgula_decimal and valores.get(coluna):
+                valores[coluna] = _decimal_com_virgula(valores[coluna])
+
+        ref = valores.get("ref") or f"linha-{numero}"
+        if atual is None or atual[0] != ref:
+            if atual is not None:
+                concluidas.add(atual[0])
+                yield atual[1], atual[2]
+                atual = None
+
+            if ref in concluidas:
+                yield numero, (
+                    f"As linhas do pedido '{ref}' devem ser consecutivas "
+                    "(o pedido já foi lido antes desta linha)."
+                )
+                continue
+
+            dados = {c: valores[c] for c in COLUNAS_PEDIDO if valores.get(c)}
+            atual = (ref, numero, {**dados, "itens": []})
+
+        atual[2]["itens"].append(
+            {
+                "produto_id": valores.get("produto_id"),
+                "quantidade": valores.get("quantidade") or 1,
+                "preco_unitario": valores.get("preco_unitario") or None,
+                "observacoes": valores.get("observacoes_item") or None,
+            }
+        )
+
+    if atual is not None:
+        yield atual[1], atual[2]
+
+
+class ImportacaoService:
+    def _import_batch(
+        self, session: Session, lote: list[LinhaImportacao], resultado: ImportacaoResultado
+    ) -> None:
+        """Valida um lote inteiro com uma query por tabela e grava tudo em uma transação."""
+        validos: list[tuple[int, PedidoCreate]] = []
+        for numero, dados in lote:
+            if isinstance(dados, str):
+                resultado.erros.append(ErroImportacao(linha=numero, detalhe=dados))
+                continue
+            try:
+                validos.append((numero, PedidoCreate.model_validate(dados)))
+            except ValidationError as e:
+                erro = e.errors()[0]
+                campo = ".".join(str(p) for p in erro.get("loc", []))
+                resultado.erros.append(
+                    ErroImportacao(linha=numero, detalhe=f"{campo}: {erro.get('msg')}")
+                )
+
+        # Resolve clientes e produtos referenciados pelo lote com um IN cada
+        cliente_ids = {obj.cliente_id for _, obj in validos}
+        clientes = set(
+            session.exec(select(Cliente.id).where(Cliente.id.in_(cliente_ids))).all()  # type: ignore
+        )
+        produtos = pedido_service._get_products_map(
+            session, {item.produto_id for _, obj in validos for item in obj.itens}
+        )
+
+        novos: list[tuple[int, PedidoCreate, Pedido]] = []
+        for numero, obj in validos:
+            if obj.cliente_id not in clientes:
+                resultado.erros.append(
+                    ErroImportacao(linha=numero, detalhe="Cliente não encontrado")
+                )
+                continue
+            try:
+                novos.append((numero, obj, pedido_service._build_order(obj, produtos)))
+            except HTTPException as e:
+                resultado.erros.append(ErroImportacao(linha=numero, detalhe=e.detail))
+
+        if not novos:
+            return
+
+        try:
+            session.add_all([pedido for _, _, pedido in novos])
+            session.commit()
+            resultado.importados += len(novos)
+        except SQLAlchemyError:
+            session.rollback()
+            # Se o lote falhar no banco, grava um a um para isolar as linhas com problema.
+            # Os objetos do rollback ficam com o estado da tentativa anterior: cada pedido é
+            # montado de novo a partir da linha validada
+            for numero, obj, _ in novos:
+                try:
+                    session.add(pedido_service._build_order(obj, produtos))
+                    session.commit()
+                    resultado.importados += 1
+                except SQLAlchemyError as e:
+                    session.rollback()
+                    resultado.erros.append(
+                        ErroImportacao(linha=numero, detalhe=f"Erro ao gravar: {e}")
+                    )
+
+        # Os objetos gravados não são mais usados; libera a memória do lote
+        session.expunge_all()
+
+    def import_orders(
+        self,
+        session: Session,
+        linhas: Iterable[LinhaImportacao],
+        tamanho_lote: int = TAMANHO_LOTE,
+    ) -> ImportacaoResultado:
+        """Importa pedidos em lotes. Erros de uma linha não interrompem as demais."""
+        resultado = ImportacaoResultado()
+        iterador = iter(linhas)
+
+        while lote := list(islice(iterador, tamanho_lote)):
+            self._import_batch(session, lote, resultado)
+
+        if resultado.importados:
+            pedido_service._invalidate_cache()
+
+        resultado.erros.sort(key=lambda erro: erro.linha)
+        return resultado
+
+    def import_file(
+        self, session: Session, arquivo: TextIO, formato: str
+    ) -> ImportacaoResultado:
+        """Importa um arquivo NDJSON ou CSV."""
+        if formato == "csv":
+            linhas = read_csv(arquivo)
+        elif formato == "ndjson":
+            linhas = read_ndjson(arquivo)
+        else:
+            raise HTTPException(
+                status_code=400, detail="Formato de importação não suportado. Use CSV ou NDJSON."
+            )
+
+        try:
+            return self.import_orders(session, linhas)
+        except (csv.Error, UnicodeDecodeError):
+            raise HTTPException(
+                status_code=400, detail="Não foi possível ler o arquivo de importação."
+            )
+
+
+importacao_service = ImportacaoService()
@@ -1,10 +1,15 @@
+import base64
+import binascii
+import json
+from collections import defaultdict
+from collections.abc import Sequence
 from datetime import date
 from decimal import Decimal
-from typing import Literal, Sequence
+from typing import Any, Literal
 
 from fastapi import HTTPException
-from sqlalchemy import func, or_
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, func, or_, update
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import Session, select
 
 from ..models import (
@@ -12,35 +17,86 @@ from ..models import (
     ItemPedido,
     ItemPedidoInput,
     ItemPedidoUpdate,
+    OperacaoItem,
     Pedido,
     PedidoCreate,
     PedidoUpdate,
     Produto,
     StatusPedido,
 )
+from ..utils.busca import busca_fts, fts_disponivel, montar_termo_fts
 from ..utils.imagem import delete_art_image
 from .base_service import BaseService
 
 
 class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
+    cache_namespaces = ("dashboard",)
+
     def __init__(self):
         super().__init__(Pedido)
 
-    def _get_product_info(
-        self, session: Session, produto_id: int, preco_input: Decimal | None
-    ) -> tuple[Decimal, str]:
-        """Busca, valida, define preço e pega nome do produto."""
-        produto = session.get(Produto, produto_id)
-        if not produto:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Produto com ID {produto_id} não encontrado.",
-            )
+    def _get_products_map(
+        self, session: Session, produto_ids: set[int]
+    ) -> dict[int, Produto]:
+        """Busca todos os produtos informados em uma única query (IN)."""
+        if not produto_ids:
+            return {}
+
+        query = select(Produto).where(Produto.id.in_(produto_ids))  # type: ignore
+        return {produto.id: produto for produto in session.exec(query).all()}  # type: ignore
+
+    def _consolidate_items(self, itens: list[ItemPedidoInput]) -> list[ItemPedidoInput]:
+        """Junta entradas repetidas do mesmo produto somando as quantidades
+        (preço e observação da primeira entrada prevalecem). Não acessa o banco."""
+        consolidados: dict[int, ItemPedidoInput] = {}
+        for item in itens:
+            if item.produto_id in consolidados:
+                atual = consolidados[item.produto_id]
+                consolidados[item.produto_id] = atual.model_copy(
+                    update={"quantidade": atual.quantidade + item.quantidade}
+                )
+            else:
+                consolidados[item.produto_id] = item
+        return list(consolidados.values())
 
+    def _new_item(
+        self, item: ItemPedidoInput, produto: Produto, pedido_id: int | None = None
+    ) -> ItemPedido:
+        """Cria o item do pedido com nome e preço do produto já carregado."""
         # Se não houver valor praticado no input, usa o valor base do produto
-        preco = preco_input if preco_input is not None else produto.preco_base
+        preco = item.preco_unitario if item.preco_unitario is not None else produto.preco_base
+
+        return ItemPedido(
+            pedido_id=pedido_id,
+            produto_id=item.produto_id,
+            quantidade=item.quantidade,
+            observacoes=item.observacoes,
+            preco_unitario=preco,
+            nome_produto=produto.nome,
+        )
+
+    def _build_order(self, obj: PedidoCreate, produtos: dict[int, Produto]) -> Pedido:
+        """
+        Monta o pedido com os itens consolidados e o total calculado, usando os
+        produtos já carregados (não acessa o banco). Lança HTTPException se inválido.
+        """
+        if not obj.itens:
+            raise HTTPException(status_code=400, detail="O pedido não pode ser vazio.")
+
+        db_pedido = Pedido.model_validate(obj.model_dump(exclude={"itens"}))
+
+        for item in self._consolidate_items(obj.itens):
+            produto = produtos.get(item.produto_id)
+            if not produto:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Produto com ID {item.produto_id} não encontrado.",
+                )
+
+            db_pedido.itens.append(self._new_item(item, produto))
 
-        return preco, produto.nome
+        self._recalculate_totals(db_pedido)
+        return db_pedido
 
     def _validate_discount(
         self, subtotal: Decimal | Literal[0], desconto: Decimal | None
@@ -72,6 +128,9 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
 
         # Se passou pela validação, aplica o cálculo
         desconto = pedido.desconto or Decimal("0.0")
+        pedido.subtotal = subtotal
+        pedido.qtd_itens = len(pedido.itens)
+        pedido.qtd_unidades = sum(item.quantidade for item in pedido.itens)
         pedido.total = subtotal - desconto
 
         if pedido.total <= 0:
@@ -80,6 +139,38 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
                 detail="O valor total do pedido deve ser maior que R$ 0,00."
             )
 
+    def _encode_cursor(self, data_pedido: date, pedido_id: int) -> str:
+        """Gera o cursor opaco que aponta para a posição após o pedido informado."""
+        payload = json.dumps({"d": data_pedido.isoformat(), "i": pedido_id})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str) -> tuple[date, int]:
+        """Lê o cursor opaco e devolve a chave (data_pedido, id) ou lança 400."""
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            return date.fromisoformat(payload["d"]), int(payload["i"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise HTTPException(status_code=400, detail="Cursor de paginação inválido.")
+
+    def _count(
+        self,
+        session: Session,
+        query,
+        contagem: Literal["exata", "estimada", "nenhuma"],
+        has_filters: bool,
+    ) -> int | None:
+        """Conta o total de pedidos conforme o modo de contagem pedido pelo cliente."""
+        if contagem == "nenhuma":
+            return None
+
+        # Sem filtros, o maior ID é uma estimativa barata (lida direto do índice da PK)
+        if contagem == "estimada" and not has_filters:
+            return session.exec(select(func.max(Pedido.id))).one() or 0
+
+        count_query = select(func.count()).select_from(query.subquery())
+        return session.exec(count_query).one()
+
     def get_all_detailed(
         self,
         session: Session,
@@ -91,19 +182,43 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
         max_total: Decimal | None = None,
         skip: int = 0,
         limit: int = 10,
-    ) -> dict[str, Sequence[Pedido] | int]:
-        """Busca todos os pedidos com cliente e itens carregados, com paginação e permitindo filtros"""
+        cursor: str | None = None,
+        contagem: Literal["exata", "estimada", "nenhuma"] = "exata",
+        incluir_itens: bool = True,
+        campos: Sequence[str] | None = None,
+        expand: Sequence[str] | None = None,
+    ) -> dict[str, Sequence[Pedido] | Sequence[dict[str, Any]] | int | str | None]:
+        """
+        Busca todos os pedidos com cliente (e itens, se 'incluir_itens') carregados,
+        com paginação e permitindo filtros.
+
+        Com 'campos', busca só essas colunas e as relações listadas em 'expand'
+        ('cliente', 'itens'), devolvendo dicionários em vez de objetos.
+
+        Com 'cursor', a paginação é feita por chave (data_pedido, id) em ordem decrescente,
+        buscando direto a próxima página em vez de pular 'skip' linhas.
+        """
 
         # Trava de segurança para desempenho
-        if limit > 100:
-            limit = 100
+        limit = min(limit, 100)
 
         query = select(Pedido).join(
             Cliente
         )  # Join para permitir busca pelo nome do cliente
 
-        # Filtro de busca global (nome do cliente ou observação do pedido)
-        if q:
+        # Filtro de busca global (nome do cliente ou observação do pedido), pelos índices FTS
+        if q and fts_disponivel() and montar_termo_fts(q):
+            busca_cliente = busca_fts("cliente_fts", montar_termo_fts(q, ["nome"]))  # type: ignore
+            busca_pedido = busca_fts("pedido_fts", montar_termo_fts(q))  # type: ignore
+            query = query.where(
+                or_(
+                    Pedido.cliente_id.in_(select(busca_cliente.c.rowid)),  # type: ignore
+                    Pedido.id.in_(select(busca_pedido.c.rowid)),  # type: ignore
+                )
+            )
+
+        # Sem FTS, a mesma busca é feita com LIKE
+        elif q:
             query = query.where(
                 or_(
                     Cliente.nome.ilike(f"%{q}%"),  # type: ignore
@@ -131,21 +246,94 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
         if max_total is not None:
             query = query.where(Pedido.total <= max_total)
 
-        count_query = select(func.count()).select_from(query.subquery())
-        total = session.exec(count_query).one()
-
-        query = (
-            query.options(
-                joinedload(Pedido.cliente),  # type: ignore
-                joinedload(Pedido.itens),  # type: ignore
-            )
-            .offset(skip)
-            .limit(limit)
+        has_filters = any(
+            value is not None
+            for value in (q or None, status, data_pedido, data_conclusao, min_total, max_total)
         )
+        total = self._count(session, query, contagem, has_filters)
+
+        # Modo legado: paginação por deslocamento
+        if cursor is None:
+            query = query.offset(skip).limit(limit)
+
+        # Modo cursor: busca direto os registros após a última chave vista
+        # (cursor vazio indica a primeira página)
+        else:
+            # Cada página precisa de ao menos um pedido para gerar o próximo cursor
+            limit = max(limit, 1)
+
+            if cursor:
+                cursor_data, cursor_id = self._decode_cursor(cursor)
+                query = query.where(
+                    or_(
+                        Pedido.data_pedido < cursor_data,
+                        and_(Pedido.data_pedido == cursor_data, Pedido.id < cursor_id),  # type: ignore
+                    )
+                )
 
-        results = session.exec(query).unique().all()
+            # Busca um registro a mais para saber se existe uma próxima página
+            query = query.order_by(
+                Pedido.data_pedido.desc(),  # type: ignore
+                Pedido.id.desc(),  # type: ignore
+            ).limit(limit + 1)
 
-        return {"dados": results, "total": total}
+        if campos is not None:
+            results = self._select_projection(session, query, campos, expand or ())
+        else:
+            # O cliente (um por pedido) vem no mesmo SELECT. Os itens, quando pedidos, vêm
+            # em um segundo SELECT com IN: com joinedload a página seria multiplicada pelo
+            # número de itens e o LIMIT precisaria ir para uma subquery
+            query = query.options(joinedload(Pedido.cliente))  # type: ignore
+            if incluir_itens:
+                query = query.options(selectinload(Pedido.itens))  # type: ignore
+            results = list(session.exec(query).all())
+
+        proximo_cursor = None
+        if cursor is not None and len(results) > limit:
+            results = results[:limit]
+            ultimo = results[-1] if results else None
+            if isinstance(ultimo, dict):
+                proximo_cursor = self._encode_cursor(ultimo["data_pedido"], ultimo["id"])
+            elif ultimo is not None:
+                proximo_cursor = self._encode_cursor(ultimo.data_pedido, ultimo.id)  # type: ignore
+
+        return {"dados": results, "total": total, "proximo_cursor": proximo_cursor}
+
+    def _select_projection(
+        self, session: Session, query, campos: Sequence[str], expand: Sequence[str]
+    ) -> list[dict[str, Any]]:
+        """
+        Executa a listagem trazendo só as colunas pedidas e carrega as relações de
+        'expand' com uma query IN cada. Devolve dicionários prontos para serializar.
+        """
+        # Colunas usadas internamente (cursor e relações), mesmo que não pedidas
+        colunas = list(dict.fromkeys([*campos, "id", "data_pedido", "cliente_id"]))
+        pedidos = self._select_columns(session, query, colunas)
+        if not pedidos:
+            return pedidos
+
+        if "cliente" in expand:
+            cliente_ids = {pedido["cliente_id"] for pedido in pedidos}
+            clientes = {
+                cliente.id: cliente
+                for cliente in session.exec(
+                    select(Cliente).where(Cliente.id.in_(cliente_ids))  # type: ignore
+                )
+            }
+            for pedido in pedidos:
+                pedido["cliente"] = clientes.get(pedido["cliente_id"])
+
+        if "itens" in expand:
+            itens: dict[int, list[ItemPedido]] = defaultdict(list)
+            query_itens = select(ItemPedido).where(
+                ItemPedido.pedido_id.in_([pedido["id"] for pedido in pedidos])  # type: ignore
+            )
+            for item in session.exec(query_itens):
+                itens[item.pedido_id].append(item)  # type: ignore
+            for pedido in pedidos:
+                pedido["itens"] = itens[pedido["id"]]
+
+        return pedidos
 
     def get_by_id_detailed(self, session: Session, pedido_id: int) -> Pedido:
         """Busca um pedido específico com detalhes ou lança 404."""
@@ -160,54 +348,57 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
             raise HTTPException(status_code=404, detail="Pedido não encontrado")
         return db_pedido
 
+    def _version_query(self, id: Any) -> Any:
+        # A resposta do pedido inclui o cliente e os itens, então as datas deles
+        # (e a quantidade de itens, que muda ao remover um) também entram na versão
+        return (
+            select(
+                Pedido.updated_at,
+                Cliente.updated_at,
+                func.max(ItemPedido.updated_at),
+                func.count(ItemPedido.produto_id),  # type: ignore
+            )
+            .join(Cliente, Cliente.id == Pedido.cliente_id)  # type: ignore
+            .outerjoin(ItemPedido, ItemPedido.pedido_id == Pedido.id)  # type: ignore
+            .where(Pedido.id == id)
+            .group_by(Pedido.id)  # type: ignore
+        )
+
+    def _version_marks(self, db_obj: Pedido) -> tuple[Any, ...]:
+        return (
+            db_obj.updated_at,
+            db_obj.cliente.updated_at,
+            max((item.updated_at for item in db_obj.itens), default=None),
+            len(db_obj.itens),
+        )
+
     def create(self, session: Session, obj: PedidoCreate) -> Pedido:
         """Cria pedido com validação de cliente, produtos e cálculo de total."""
-        if not session.get(Cliente, obj.cliente_id):
-            raise HTTPException(status_code=404, detail="Cliente não encontrado")
-
         if not obj.itens:
             raise HTTPException(status_code=400, detail="O pedido não pode ser vazio.")
 
-        # Consolida itens duplicados no input inicial
-        itens_dict: dict[int, ItemPedido] = {}
-
-        for item in obj.itens:
-            # Lógica centralizada para validar produto e definir preço
-            preco, nome = self._get_product_info(
-                session, item.produto_id, item.preco_unitario
-            )
-
-            # Lógica de consolidação
-            if item.produto_id in itens_dict:
-                itens_dict[item.produto_id].quantidade += item.quantidade  # type: ignore
-            else:
-                itens_dict[item.produto_id] = ItemPedido(
-                    produto_id=item.produto_id,
-                    quantidade=item.quantidade,
-                    observacoes=item.observacoes,
-                    preco_unitario=preco,
-                    nome_produto=nome,
-                )
-
-        db_pedido = Pedido.model_validate(obj.model_dump(exclude={"itens"}))
+        cliente = session.get(Cliente, obj.cliente_id)
+        if not cliente:
+            raise HTTPException(status_code=404, detail="Cliente não encontrado")
 
-        # Associa os itens consolidados ao pedido
-        for novo_item in itens_dict.values():
-            db_pedido.itens.append(novo_item)
+        # Todos os produtos do pedido em uma única query, independente da quantidade de itens
+        produtos = self._get_products_map(session, {item.produto_id for item in obj.itens})
 
-        # Recalcula o total final (garantindo precisão Decimal)
-        self._recalculate_totals(db_pedido)
+        # Consolida itens duplicados, valida produtos e calcula o total
+        db_pedido = self._build_order(obj, produtos)
+        db_pedido.cliente = cliente
 
         session.add(db_pedido)
         session.commit()
-        session.refresh(db_pedido)
+        self._invalidate_cache()
 
         return db_pedido
 
     def update_and_recalculate(
         self, session: Session, db_pedido: Pedido, obj: PedidoUpdate
     ) -> Pedido:
-        """Atualiza, recalcula e valida se o novo desconto é compatível com o subtotal atual."""
+        """Atualiza, recalcula e valida se o novo desconto é compatível com o subtotal atual.
+        Espera o pedido carregado com os itens (get_by_id_detailed), usados no recálculo."""
 
         # Aplica as mudanças do schema
         update_data = obj.model_dump(exclude_unset=True)
@@ -218,7 +409,7 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
 
         session.add(db_pedido)
         session.commit()
-        session.refresh(db_pedido)
+        self._invalidate_cache()
 
         return db_pedido
 
@@ -231,56 +422,73 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
             raise HTTPException(status_code=404, detail="Item do pedido não encontrado")
         return db_item
 
-    def add_item(
-        self, session: Session, pedido_id: int, item: ItemPedidoInput
-    ) -> Pedido:
-        """Adiciona ou incrementa item no pedido e atualiza total."""
-        db_pedido = self.get_by_id_detailed(session, pedido_id)
-
+    def _add_or_increment(
+        self, db_pedido: Pedido, novo: ItemPedidoInput, produto: Produto
+    ) -> None:
+        """Soma a quantidade ao item do produto ou cria um item novo (só em memória)."""
         item_existente = next(
-            (i for i in db_pedido.itens if i.produto_id == item.produto_id), None
-        )
-        preco, nome = self._get_product_info(
-            session, item.produto_id, item.preco_unitario
+            (i for i in db_pedido.itens if i.produto_id == novo.produto_id), None
         )
 
         if item_existente:
             # Apenas incrementa se já existir
-            item_existente.quantidade += item.quantidade
+            item_existente.quantidade += novo.quantidade
             # Se o usuário enviou um novo valor unitário, atualiza também
-            if item.preco_unitario is not None:
-                item_existente.preco_unitario = item.preco_unitario
+            if novo.preco_unitario is not None:
+                item_existente.preco_unitario = novo.preco_unitario
 
             # Se veio uma observação nova, substitui a antiga. Se veio vazia, ignora e mantém a antiga.
-            if item.observacoes:
-                item_existente.observacoes = item.observacoes
+            if novo.observacoes:
+                item_existente.observacoes = novo.observacoes
         else:
-            novo_item = ItemPedido(
-                pedido_id=pedido_id,
-                produto_id=item.produto_id,
-                quantidade=item.quantidade,
-                observacoes=item.observacoes,
-                preco_unitario=preco,
-                nome_produto=nome,
-            )
-            db_pedido.itens.append(novo_item)
+            db_pedido.itens.append(self._new_item(novo, produto, db_pedido.id))
+
+    def _get_order_and_item(
+        self, session: Session, pedido_id: int, produto_id: int
+    ) -> tuple[Pedido, ItemPedido]:
+        """Pedido detalhado (usado na resposta) e o item do produto, em uma única query."""
+        db_pedido = self.get_by_id_detailed(session, pedido_id)
+        db_item = next((i for i in db_pedido.itens if i.produto_id == produto_id), None)
+        if not db_item:
+            raise HTTPException(status_code=404, detail="Item do pedido não encontrado")
+        return db_pedido, db_item
+
+    def add_item(
+        self,
+        session: Session,
+        pedido_id: int,
+        item: ItemPedidoInput | list[ItemPedidoInput],
+    ) -> Pedido:
+        """Adiciona ou incrementa um ou mais itens no pedido e atualiza total."""
+        novos_itens = self._consolidate_items(item if isinstance(item, list) else [item])
+        if not novos_itens:
+            raise HTTPException(status_code=400, detail="Nenhum item informado.")
+
+        db_pedido = self.get_by_id_detailed(session, pedido_id)
+        produtos = self._get_products_map(session, {i.produto_id for i in novos_itens})
+
+        for novo in novos_itens:
+            produto = produtos.get(novo.produto_id)
+            if not produto:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Produto com ID {novo.produto_id} não encontrado.",
+                )
+
+            self._add_or_increment(db_pedido, novo, produto)
 
         self._recalculate_totals(db_pedido)
 
         session.add(db_pedido)
         session.commit()
+        self._invalidate_cache()
         return db_pedido
 
     def update_item(
         self, session: Session, pedido_id: int, produto_id: int, item: ItemPedidoUpdate
     ) -> Pedido:
         """Atualiza a quantidade ou preço de um item e recalcula o total do pedido."""
-        db_pedido = self.get_by_id_detailed(session, pedido_id)
-
-        # Busca o item específico
-        db_item = next((i for i in db_pedido.itens if i.produto_id == produto_id), None)
-        if not db_item:
-            raise HTTPException(status_code=404, detail="Item do pedido não encontrado")
+        db_pedido, db_item = self._get_order_and_item(session, pedido_id, produto_id)
 
         # Aplica as atualizações parciais
         db_item.sqlmodel_update(item.model_dump(exclude_unset=True))
@@ -290,6 +498,75 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
 
         session.add(db_pedido)
         session.commit()
+        self._invalidate_cache()
+
+        return db_pedido
+
+    def apply_item_operations(
+        self, session: Session, pedido_id: int, operacoes: list[OperacaoItem]
+    ) -> Pedido:
+        """
+        Aplica várias adições, alterações e remoções de itens em uma única transação,
+        na ordem enviada: o pedido é carregado e recalculado uma vez, com um só commit.
+        Se alguma operação for inválida, nenhuma é salva. As artes dos itens removidos
+        só são apagadas do disco depois do commit.
+        """
+        if not operacoes:
+            raise HTTPException(status_code=400, detail="Nenhuma operação informada.")
+
+        db_pedido = self.get_by_id_detailed(session, pedido_id)
+        produtos = self._get_products_map(
+            session, {op.produto_id for op in operacoes if op.acao == "adicionar"}
+        )
+        caminhos_orfaos: list[str] = []
+
+        for op in operacoes:
+            if op.acao == "adicionar":
+                produto = produtos.get(op.produto_id)
+                if not produto:
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Produto com ID {op.produto_id} não encontrado.",
+                    )
+                novo = ItemPedidoInput.model_validate(
+                    op.model_dump(exclude={"acao"}, exclude_none=True)
+                )
+                self._add_or_increment(db_pedido, novo, produto)
+                continue
+
+            db_item = next(
+                (i for i in db_pedido.itens if i.produto_id == op.produto_id), None
+            )
+            if not db_item:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Item do pedido com o produto ID {op.produto_id} não encontrado.",
+                )
+
+            if op.acao == "atualizar":
+                db_item.sqlmodel_update(
+                    op.model_dump(exclude_unset=True, exclude={"acao", "produto_id"})
+                )
+            else:
+                if db_item.caminho_arte:
+                    caminhos_orfaos.append(db_item.caminho_arte)
+                db_pedido.itens.remove(db_item)
+                session.delete(db_item)
+
+        if not db_pedido.itens:
+            raise HTTPException(
+                status_code=400, detail="O pedido não pode ficar vazio."
+            )
+
+        self._recalculate_totals(db_pedido)
+
+        session.add(db_pedido)
+        session.commit()
+        self._invalidate_cache()
+
+        # Só apaga depois de ter salvo os dados
+        for caminho in caminhos_orfaos:
+            delete_art_image(caminho)
 
         return db_pedido
 
@@ -297,7 +574,7 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
         self, session: Session, pedido_id: int, produto_id: int, caminho_arte: str
     ) -> Pedido:
         """Atualiza o caminho da arte de um item específico e remove a antiga do disco."""
-        db_item = self.get_item_or_404(session, pedido_id, produto_id)
+        db_pedido, db_item = self._get_order_and_item(session, pedido_id, produto_id)
 
         # Guarda o caminho antigo antes de deletar
         caminho_antigo = db_item.caminho_arte
@@ -309,12 +586,57 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
         # Faz o commit primeiro
         # (se falhar, o arquivo antigo continua salvo no disco, evitando caminhos de imagens já deletadas)
         session.commit()
+        self._invalidate_cache()
 
         # Só apaga depois de ter salvo os dados
         if caminho_antigo:
             delete_art_image(caminho_antigo)
 
-        return self.get_by_id_detailed(session, pedido_id)
+        return db_pedido
+
+    def set_pending_art(
+        self, session: Session, pedido_id: int, produto_id: int, caminho_pendente: str
+    ) -> tuple[Pedido, str | None]:
+        """Aponta o item para o upload ainda não convertido e devolve o caminho da arte anterior,
+        que só é apagada quando a conversão terminar."""
+        db_pedido, db_item = self._get_order_and_item(session, pedido_id, produto_id)
+
+        caminho_antigo = db_item.caminho_arte
+        db_item.caminho_arte = caminho_pendente
+        session.add(db_item)
+        session.commit()
+        self._invalidate_cache()
+
+        return db_pedido, caminho_antigo
+
+    def finish_pending_art(
+        self,
+        session: Session,
+        pedido_id: int,
+        produto_id: int,
+        caminho_pendente: str,
+        caminho_arte: str | None,
+    ) -> bool:
+        """Troca o upload pendente pelo caminho final. Retorna False se o item
+        não aponta mais para esse upload (novo envio ou item removido).
+
+        A troca é um único UPDATE condicional: um envio que chegue entre a leitura
+        e a escrita nunca é sobrescrito."""
+        resultado = session.execute(
+            update(ItemPedido)
+            .where(
+                ItemPedido.pedido_id == pedido_id,  # type: ignore
+                ItemPedido.produto_id == produto_id,  # type: ignore
+                ItemPedido.caminho_arte == caminho_pendente,  # type: ignore
+            )
+            .values(caminho_arte=caminho_arte)
+        )
+        session.commit()
+        if not resultado.rowcount:  # type: ignore
+            return False
+
+        self._invalidate_cache()
+        return True
 
     def remove_item(self, session: Session, pedido_id: int, produto_id: int) -> Pedido:
         """Remove item e imagens orfãs."""
@@ -340,6 +662,7 @@ class PedidoService(BaseService[Pedido, PedidoCreate, PedidoUpdate]):
 
         # Faz o commit primeiro
         session.commit()
+        self._invalidate_cache()
 
         # Só apaga depois de ter salvo os dados
         if caminho_orfao:
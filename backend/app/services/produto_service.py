@@ -1,13 +1,17 @@
 from decimal import Decimal
-from typing import Sequence
+from typing import Any, Sequence
 
 from sqlmodel import Session, func, or_, select
 
 from ..models import Produto, ProdutoCreate, ProdutoUpdate
+from ..utils.busca import busca_fts
 from .base_service import BaseService
 
 
 class ProdutoService(BaseService[Produto, ProdutoCreate, ProdutoUpdate]):
+    fts_index = "produto_fts"
+    cache_namespaces = ("produtos",)
+
     def __init__(self):
         # Inicializa o serviço fixando o modelo Produto
         super().__init__(Produto)
@@ -20,10 +24,11 @@ class ProdutoService(BaseService[Produto, ProdutoCreate, ProdutoUpdate]):
         max_preco: Decimal | None = None,
         skip: int = 0,
         limit: int = 10,
-    ) -> dict[str, Sequence[Produto] | int]:
+        campos: Sequence[str] | None = None,
+    ) -> dict[str, Sequence[Produto] | Sequence[dict[str, Any]] | int]:
         """
         Retorna todos os produtos paginados com busca textual global
-        e filtros de intervalo de preço.
+        e filtros de intervalo de preço. Com 'campos', devolve só essas colunas.
         """
 
         # Trava de segurança para desempenho
@@ -32,8 +37,15 @@ class ProdutoService(BaseService[Produto, ProdutoCreate, ProdutoUpdate]):
 
         query = select(Produto)
 
-        # Filtro de busca global (nome, descrição ou unidade de medida)
-        if q:
+        # Filtro de busca global (nome, descrição ou unidade de medida), pelo índice FTS
+        if termo := self._fts_term(q):
+            busca = busca_fts("produto_fts", termo)
+            query = query.join(
+                busca, busca.c.rowid == Produto.id  # type: ignore
+            ).order_by(busca.c.rank)
+
+        # Sem FTS, a mesma busca é feita com LIKE
+        elif q:
             query = query.where(
                 or_(
                     Produto.nome.ilike(f"%{q}%"),  # type: ignore
@@ -53,6 +65,8 @@ class ProdutoService(BaseService[Produto, ProdutoCreate, ProdutoUpdate]):
         total = session.exec(count_query).one()
 
         query = query.offset(skip).limit(limit)
+        if campos:
+            return {"dados": self._select_columns(session, query, campos), "total": total}
         results = session.exec(query).all()
 
         return {"dados": results, "total": total}
@@ -0,0 +1,135 @@
+import re
+from typing import Any
+
+from sqlalchemy import Float, Integer, column, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+# Tabelas FTS5 e as expressões usadas para alimentar cada coluna indexada.
+# '{r}' é trocado por 'new' nos triggers e pelo nome da tabela na reconstrução.
+INDICES_FTS: dict[str, tuple[str, dict[str, str]]] = {
+    "cliente_fts": (
+        "cliente",
+        {
+            "nome": "{r}.nome",
+            "email": "{r}.email",
+            # Indexa também o telefone sem o DDI para permitir buscar pelo DDD
+            "telefone": "{r}.telefone || ' ' || replace({r}.telefone, '+55', '')",
+        },
+    ),
+    "produto_fts": (
+        "produto",
+        {
+            "nome": "{r}.nome",
+            "descricao": "{r}.descricao",
+            "unidade_medida": "{r}.unidade_medida",
+        },
+    ),
+    "pedido_fts": ("pedido", {"observacoes": "{r}.observacoes"}),
+}
+
+# Definido na inicialização do banco, indica se o SQLite possui o módulo FTS5
+_fts_disponivel = False
+
+
+def fts_disponivel() -> bool:
+    return _fts_disponivel
+
+
+def _criar_indice(connection: Connection, nome_fts: str) -> None:
+    """Cria a tabela virtual e os triggers de sincronização, populando o índice se for novo."""
+    tabela, colunas = INDICES_FTS[nome_fts]
+    nomes = ", ".join(colunas)
+    valores_new = ", ".join(expr.format(r="new") for expr in colunas.values())
+
+    ja_existe = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nome"),
+        {"nome": nome_fts},
+    ).first()
+
+    # 'remove_diacritics' faz "joao" encontrar "João"
+    connection.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {nome_fts} USING fts5("
+            f"{nomes}, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {nome_fts}_ai AFTER INSERT ON {tabela} BEGIN "
+            f"INSERT INTO {nome_fts}(rowid, {nomes}) VALUES (new.id, {valores_new}); END"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {nome_fts}_ad AFTER DELETE ON {tabela} BEGIN "
+            f"DELETE FROM {nome_fts} WHERE rowid = old.id; END"
+        )
+    )
+    connection.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {nome_fts}_au AFTER UPDATE OF {nomes} ON {tabela} BEGIN "
+            f"DELETE FROM {nome_fts} WHERE rowid = old.id; "
+            f"INSERT INTO {nome_fts}(rowid, {nomes}) VALUES (new.id, {valores_new}); END"
+        )
+    )
+
+    if not ja_existe:
+        reconstruir_indice(connection, nome_fts)
+
+
+def reconstruir_indice(connection: Connection, nome_fts: str) -> None:
+    """Apaga e repopula um índice FTS a partir da tabela de origem."""
+    tabela, colunas = INDICES_FTS[nome_fts]
+    nomes = ", ".join(colunas)
+    valores = ", ".join(expr.format(r=tabela) for expr in colunas.values())
+
+    connection.execute(text(f"DELETE FROM {nome_fts}"))
+    connection.execute(
+        text(
+            f"INSERT INTO {nome_fts}(rowid, {nomes}) SELECT {tabela}.id, {valores} FROM {tabela}"
+        )
+    )
+
+
+def configurar_fts(connection: Connection) -> bool:
+    """Cria os índices FTS5 caso o SQLite suporte. Se não suportar, a busca usa LIKE."""
+    global _fts_disponivel
+
+    try:
+        for nome_fts in INDICES_FTS:
+            _criar_indice(connection, nome_fts)
+        _fts_disponivel = True
+    except OperationalError as e:
+        print(f"Busca textual FTS5 indisponível, usando LIKE: {e}")
+        _fts_disponivel = False
+
+    return _fts_disponivel
+
+
+def montar_termo_fts(q: str, colunas: list[str] | None = None) -> str | None:
+    """
+    Converte o texto digitado em uma expressão MATCH com busca por prefixo em cada palavra.
+    Ex: 'joão sil' -> '"joão"* "sil"*'. Retorna None se não houver palavras.
+    """
+    palavras = re.findall(r"\w+", q)
+    if not palavras:
+        return None
+
+    termo = " ".join(f'"{palavra}"*' for palavra in palavras)
+    if colunas:
+        termo = "{" + " ".join(colunas) + "} : (" + termo + ")"
+    return termo
+
+
+def busca_fts(nome_fts: str, termo: str) -> Any:
+    """Subquery com (rowid, rank) dos registros que casam com o termo, para join ou IN."""
+    if nome_fts not in INDICES_FTS:
+        raise ValueError(f"Índice FTS desconhecido: {nome_fts}")
+
+    return (
+        text(f"SELECT rowid, rank FROM {nome_fts} WHERE {nome_fts} MATCH :termo")
+        .bindparams(termo=termo)
+        .columns(column("rowid", Integer), column("rank", Float))
+        .subquery(f"busca_{nome_fts}")
+    )
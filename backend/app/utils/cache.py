@@ -0,0 +1,130 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import TYPE_CHECKING, Any
+
+from fastapi import Response
+from sqlmodel import Session, SQLModel
+
+from ..config import CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+from .resposta import serializar
+
+if TYPE_CHECKING:
+    from ..config import Banco
+
+
+class ResponseCache:
+    """
+    Cache em memória das respostas JSON já serializadas, com expiração (TTL)
+    e descarte do item usado há mais tempo (LRU) quando atinge o limite.
+    As chaves são agrupadas por namespace para permitir invalidação por recurso.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[str, Hashable], tuple[float, bytes]] = (
+            OrderedDict()
+        )
+        # Incrementadas a cada invalidação (por namespace) e limpeza (todas): respostas
+        # montadas antes delas não são guardadas
+        self._generations: dict[str, int] = {}
+        self._clears = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, namespace: str, key: Hashable) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[(namespace, key)]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end((namespace, key))
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, namespace: str) -> tuple[int, int]:
+        with self._lock:
+            return self._clears, self._generations.get(namespace, 0)
+
+    def set(
+        self,
+        namespace: str,
+        key: Hashable,
+        value: bytes,
+        generation: tuple[int, int] | None = None,
+    ) -> None:
+        """
+        Guarda a resposta. Com 'generation' (lida antes de montar a resposta), descarta
+        o valor se o namespace foi invalidado nesse meio tempo, pois ele pode ter sido
+        montado com dados anteriores à escrita.
+        """
+        with self._lock:
+            if generation is not None and generation != (
+                self._clears,
+                self._generations.get(namespace, 0),
+            ):
+                return
+
+            self._entries[(namespace, key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((namespace, key))
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Remove todas as respostas guardadas dos namespaces informados."""
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            for chave in [k for k in self._entries if k[0] in namespaces]:
+                del self._entries[chave]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._clears += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entradas": len(self._entries),
+                "max_entradas": self.max_entries,
+                "ttl_segundos": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+
+
+async def cached_json_response(
+    namespace: str,
+    params: dict[str, Any],
+    schema: type[SQLModel],
+    banco: "Banco",
+    build: Callable[[Session], Any],
+) -> Response:
+    """
+    Devolve a resposta do cache ou executa 'build' no banco, serializa com o schema
+    público e guarda o JSON pronto para as próximas requisições iguais.
+    Nos acertos o banco nem é acessado.
+    """
+    key = tuple(sorted(params.items()))
+    content = response_cache.get(namespace, key)
+
+    if content is None:
+        geracao = response_cache.generation(namespace)
+        content = await banco.run(lambda session: serializar(schema, build(session)))
+        response_cache.set(namespace, key, content, generation=geracao)
+
+    return Response(content=content, media_type="application/json")
@@ -0,0 +1,102 @@
+import hashlib
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, NamedTuple
+
+from fastapi import HTTPException, Request, Response, status
+from sqlmodel import Session, text
+
+
+class Versao(NamedTuple):
+    """Identifica a versão atual de um registro (validadores do cache HTTP)."""
+
+    etag: str
+    modificado_em: datetime
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.modificado_em, usegmt=True),
+        }
+
+
+def _em_utc(data: datetime) -> datetime:
+    # O SQLite devolve as datas sem fuso, sempre gravadas em UTC
+    return data.replace(tzinfo=UTC) if data.tzinfo is None else data
+
+
+def criar_versao(recurso: str, id: Any, marcas: Sequence[Any]) -> Versao:
+    """
+    Monta a versão a partir das marcas que mudam a cada escrita (datas 'updated_at',
+    quantidade de itens...). A ETag é forte: muda sempre que o conteúdo pode ter mudado.
+    """
+    partes = [recurso, str(id)]
+    datas = []
+    for marca in marcas:
+        if isinstance(marca, datetime):
+            marca = _em_utc(marca)
+            datas.append(marca)
+        partes.append("" if marca is None else str(marca))
+
+    resumo = hashlib.blake2b("|".join(partes).encode(), digest_size=8).hexdigest()
+    return Versao(etag=f'"{resumo}"', modificado_em=max(datas))
+
+
+def _lista_etags(cabecalho: str) -> list[str]:
+    return [etag.strip() for etag in cabecalho.split(",") if etag.strip()]
+
+
+def nao_modificado(request: Request, versao: Versao) -> bool:
+    """
+    Confere o If-None-Match (ou, sem ele, o If-Modified-Since) de um GET.
+    True quando o cliente já tem a versão atual e pode receber 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = [etag.removeprefix("W/") for etag in _lista_etags(if_none_match)]
+        return "*" in etags or versao.etag in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            data = _em_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        # O Last-Modified só tem precisão de segundos
+        return versao.modificado_em.replace(microsecond=0) <= data
+
+    return False
+
+
+def resposta_nao_modificada(versao: Versao) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=versao.headers())
+
+
+def verificar_if_match(
+    request: Request, session: Session, versao_atual: Callable[[], Versao]
+) -> None:
+    """
+    Controle de concorrência otimista: com If-Match, a escrita só segue se o cliente
+    enviou a ETag da versão atual (comparação forte). Sem o cabeçalho, nada é consultado.
+
+    A transação de escrita é aberta antes de ler a versão ('BEGIN IMMEDIATE' pega o lock
+    de escrita do SQLite): duas escritas com a mesma ETag não passam juntas pela
+    verificação, a segunda espera a primeira terminar e recebe 412.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+
+    etags = _lista_etags(if_match)
+    if "*" in etags:
+        return
+
+    session.execute(text("BEGIN IMMEDIATE"))
+    if versao_atual().etag in etags:
+        return
+
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="O registro foi alterado desde a última leitura. Recarregue e tente novamente.",
+    )
@@ -1,57 +1,189 @@
-import io
 from pathlib import Path
 from uuid import uuid4
 
 from fastapi import HTTPException, UploadFile
 from PIL import Image, ImageOps
 
-from ..config import UPLOAD_DIR
+from ..config import ARTE_MAX_DIMENSAO, UPLOAD_DIR
 
 MAX_FILE_SIZE = 15 * 1024 * 1024  # 15 MB
+TAMANHO_BLOCO = 1024 * 1024  # Leitura do upload em blocos de 1 MB
+TAMANHO_CABECALHO = 16  # Bytes suficientes para reconhecer o formato
 
+# Limite de memória na decodificação: o bitmap RGBA de 40 MP ocupa ~160 MB.
+# Acima do limite o PIL recusa a imagem (proteção contra "decompression bomb")
+MAX_PIXELS = 40_000_000
+Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+MAX_LADO_WEBP = 16383  # Limite do próprio formato WEBP
+
+# Assinaturas (magic numbers) dos formatos aceitos
+ASSINATURAS = {
+    b"\x89PNG\r\n\x1a\n": "PNG",
+    b"\xff\xd8\xff": "JPEG",
+    b"RIFF": "WEBP",
+}
+
+# Lados máximos (px) das miniaturas geradas junto com a arte convertida
+TAMANHOS_MINIATURA = (128, 512)
+
+# Uploads recebidos que ainda aguardam conversão para WEBP
+PENDING_DIR = UPLOAD_DIR / "pendentes"
+PENDING_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _sniff_format(cabecalho: bytes) -> str | None:
+    """Identifica o formato pelos primeiros bytes do arquivo, sem decodificar nada."""
+    for assinatura, formato in ASSINATURAS.items():
+        if cabecalho.startswith(assinatura):
+            # WEBP fica dentro de um contêiner RIFF genérico
+            if formato == "WEBP" and cabecalho[8:12] != b"WEBP":
+                return None
+            return formato
+    return None
+
+
+def save_pending_upload(file: UploadFile, pedido_id: int, produto_id: int) -> Path:
+    """Valida e grava o upload original na pasta de pendentes em blocos, sem decodificar a imagem
+    (a conversão é feita depois, fora da requisição).
+
+    O formato é conferido pelos primeiros bytes antes de ler o restante, o tamanho é
+    limitado durante a cópia e as dimensões são lidas só do cabeçalho da imagem."""
+    file.file.seek(0)
+    cabecalho = file.file.read(TAMANHO_CABECALHO)
+
+    formato = _sniff_format(cabecalho)
+    if formato is None:
+        raise HTTPException(status_code=400, detail="Formato não suportado.")
+
+    file_name = (
+        f"arte_pedido_{pedido_id}_produto_{produto_id}_{uuid4().hex}.{formato.lower()}"
+    )
+    file_path = PENDING_DIR / file_name
 
-def process_art_image(file: UploadFile, pedido_id: int, produto_id: int) -> str:
-    """Processa e salva imagem em disco, garantindo que tenha
-    formatos permitidos e esteja dentro do tamanho máximo"""
     try:
-        # Pula para o final do arquivo para ver o tamanho
-        file.file.seek(0, 2)
-        file_size = file.file.tell()
-        file.file.seek(0)  # Volta o cursor para o início para o PIL conseguir ler
+        lidos = len(cabecalho)
+        with open(file_path, "wb") as destino:
+            destino.write(cabecalho)
+            while bloco := file.file.read(TAMANHO_BLOCO):
+                lidos += len(bloco)
+                if lidos > MAX_FILE_SIZE:
+                    raise HTTPException(
+                        status_code=400, detail="A imagem deve ter no máximo 15MB."
+                    )
+                destino.write(bloco)
+
+        # Image.open só lê o cabeçalho: confere se a imagem é válida e se o
+        # bitmap decodificado caberia no limite de pixels
+        try:
+            with Image.open(file_path) as img:
+                largura, altura = img.size
+        except Image.DecompressionBombError:
+            largura = altura = MAX_PIXELS
+        except Exception:
+            raise HTTPException(
+                status_code=400, detail="Erro ao processar imagem ou arquivo corrompido."
+            )
 
-        if file_size > MAX_FILE_SIZE:
+        if largura * altura > MAX_PIXELS:
             raise HTTPException(
-                status_code=400, detail="A imagem deve ter no máximo 15MB."
+                status_code=400, detail="A imagem tem resolução grande demais."
             )
+    except BaseException:
+        file_path.unlink(missing_ok=True)
+        raise
 
-        content = file.file.read()
-        img = Image.open(io.BytesIO(content))
-        if img.format not in ["PNG", "JPG", "JPEG", "WEBP"]:
-            raise HTTPException(status_code=400, detail="Formato não suportado.")
+    return file_path
 
+
+def art_variant_paths(caminho_arte: str | None) -> dict[str, str] | None:
+    """Monta os caminhos das miniaturas de uma arte já convertida.
+    Ex: '/uploads/arte.webp' -> {'128': '/uploads/arte_128.webp', ..., 'full': '/uploads/arte.webp'}"""
+    if not caminho_arte or "/pendentes/" in caminho_arte or not caminho_arte.endswith(".webp"):
+        return None
+
+    base = caminho_arte.removesuffix(".webp")
+    variantes = {str(tamanho): f"{base}_{tamanho}.webp" for tamanho in TAMANHOS_MINIATURA}
+    variantes["full"] = caminho_arte
+    return variantes
+
+
+def process_art_image(origem: str) -> str:
+    """Converte a imagem original para WEBP, corrigindo a rotação pelo EXIF,
+    e gera as miniaturas. A resolução enviada é mantida, exceto com ARTE_MAX_DIMENSAO ou
+    acima do limite do WEBP (a memória já foi limitada a MAX_PIXELS no upload).
+    Roda em um processo separado, por isso recebe e devolve apenas strings."""
+    file_name = f"{Path(origem).stem}.webp"
+    file_path = UPLOAD_DIR / file_name
+    lado_maximo = min(ARTE_MAX_DIMENSAO or MAX_LADO_WEBP, MAX_LADO_WEBP)
+
+    with Image.open(origem) as img:
+        # Em JPEG, o draft decodifica direto em escala reduzida (1/2, 1/4, 1/8)
+        # quando a imagem é maior que o necessário, poupando memória
+        img.draft("RGB", (lado_maximo, lado_maximo))
         img = ImageOps.exif_transpose(img)
-        file_name = f"arte_pedido_{pedido_id}_produto_{produto_id}_{uuid4().hex}.webp"
-        file_path = UPLOAD_DIR / file_name
+        img.thumbnail((lado_maximo, lado_maximo))
         img.save(str(file_path), "WEBP", quality=95)
-        return f"/uploads/{file_name}"
-    except HTTPException:
-        raise  # Deixa o erro com a mensagem original passar direto
-    except Exception:
-        raise HTTPException(
-            status_code=400, detail="Erro ao processar imagem ou arquivo corrompido."
-        )
+        _save_variants(img, file_path.stem)
+
+    return f"/uploads/{file_name}"
+
+
+def _save_variants(img: Image.Image, stem: str) -> None:
+    # Reduz a partir da maior miniatura para a menor, reaproveitando o resultado anterior
+    miniatura = img
+    for tamanho in sorted(TAMANHOS_MINIATURA, reverse=True):
+        miniatura = miniatura.copy()
+        miniatura.thumbnail((tamanho, tamanho))
+        miniatura.save(str(UPLOAD_DIR / f"{stem}_{tamanho}.webp"), "WEBP", quality=80)
+
+
+def arts_missing_variants() -> list[Path]:
+    """Artes convertidas sem alguma das miniaturas (convertidas antes delas existirem)."""
+    sufixos = tuple(f"_{tamanho}" for tamanho in TAMANHOS_MINIATURA)
+    return [
+        arte
+        for arte in sorted(UPLOAD_DIR.glob("*.webp"))
+        if not arte.stem.endswith(sufixos)
+        and not all((UPLOAD_DIR / f"{arte.stem}{sufixo}.webp").exists() for sufixo in sufixos)
+    ]
+
+
+def generate_missing_variants() -> int:
+    """Gera as miniaturas que faltam (as rotas já devolvem os caminhos delas).
+    Retorna quantas artes foram completadas."""
+    geradas = 0
+    for arte in arts_missing_variants():
+        try:
+            with Image.open(arte) as img:
+                img.load()
+                _save_variants(img, arte.stem)
+        except (OSError, ValueError, Image.DecompressionBombError) as e:
+            print(f"Não foi possível gerar as miniaturas de '{arte.name}': {e}")
+            continue
+        geradas += 1
+    return geradas
 
 
 def delete_art_image(caminho_arte: str | None):
-    """Remove uma imagem fisicamente do disco, se ela existir,
+    """Remove uma imagem fisicamente do disco (junto com suas miniaturas), se ela existir,
     garantindo que não apaga arquivos do sistema."""
     if not caminho_arte:
         return
 
+    for variante in (art_variant_paths(caminho_arte) or {}).values():
+        if variante != caminho_arte:
+            _delete_file(variante)
+    _delete_file(caminho_arte)
+
+
+def _delete_file(caminho_arte: str):
     try:
-        # Pega apenas o nome do arquivo, ignorando caminhos maliciosos
+        # Pega apenas o nome do arquivo, ignorando caminhos maliciosos.
+        # Uploads pendentes ficam na subpasta própria
         nome_arquivo = Path(caminho_arte).name
-        caminho_fisico = UPLOAD_DIR / nome_arquivo
+        pasta = PENDING_DIR if "/pendentes/" in caminho_arte else UPLOAD_DIR
+        caminho_fisico = pasta / nome_arquivo
 
         # Verifica se o arquivo existe e se realmente está dentro da pasta de uploads permitida
         if caminho_fisico.exists() and caminho_fisico.is_file():
@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from ..models.job import JobPublic, StatusJob
+
+MAX_JOBS = 500  # Quantidade de tarefas mantidas em memória para consulta
+
+
+class JobRegistry:
+    """Registro em memória das tarefas em segundo plano, consultado pelo cliente via polling."""
+
+    def __init__(self, max_jobs: int = MAX_JOBS):
+        self.max_jobs = max_jobs
+        self._jobs: OrderedDict[str, JobPublic] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, tipo: str) -> JobPublic:
+        agora = datetime.now(UTC)
+        job = JobPublic(id=uuid4().hex, tipo=tipo, criado_em=agora, atualizado_em=agora)
+
+        with self._lock:
+            self._jobs[job.id] = job
+            # Descarta as tarefas mais antigas
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+        return job.model_copy()
+
+    def update(self, job_id: str, **campos: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            self._jobs[job_id] = job.model_copy(
+                update={**campos, "atualizado_em": datetime.now(UTC)}
+            )
+
+    def start(self, job_id: str) -> None:
+        self.update(job_id, status=StatusJob.PROCESSANDO)
+
+    def finish(self, job_id: str, resultado: Any = None) -> None:
+        self.update(job_id, status=StatusJob.CONCLUIDO, progresso=1.0, resultado=resultado)
+
+    def fail(self, job_id: str, erro: str) -> None:
+        self.update(job_id, status=StatusJob.ERRO, erro=erro)
+
+    def run_in_background(self, tipo: str, tarefa: Callable[[JobPublic], Any]) -> JobPublic:
+        """Executa a tarefa em uma thread própria e devolve o job para acompanhamento."""
+        job = self.create(tipo)
+
+        def executar() -> None:
+            self.start(job.id)
+            try:
+                self.finish(job.id, resultado=tarefa(job))
+            except HTTPException as e:
+                self.fail(job.id, e.detail)
+            except PermissionError:
+                self.fail(job.id, "Erro de permissão: O sistema não tem acesso à pasta.")
+            except Exception as e:
+                self.fail(job.id, f"Falha ao realizar {tipo}: {e}")
+
+        threading.Thread(target=executar, name=f"{tipo}-{job.id}", daemon=True).start()
+        return job
+
+    def get(self, job_id: str) -> JobPublic | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+
+job_registry = JobRegistry()
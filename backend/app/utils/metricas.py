@@ -0,0 +1,194 @@
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import Engine, event
+from sqlmodel import Session
+
+from ..config import N_PLUS_ONE_THRESHOLD
+from .cache import response_cache
+
+# Limites (em segundos) dos buckets do histograma de duração das requisições
+BUCKETS_DURACAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class MetricasRequisicao:
+    """Contadores de uma única requisição, preenchidos pelos eventos do SQLAlchemy."""
+
+    __slots__ = ("comandos", "linhas", "queries", "tempo_db")
+
+    def __init__(self):
+        self.queries = 0
+        self.tempo_db = 0.0
+        self.linhas = 0
+        # Quantas vezes cada SELECT (já parametrizado) foi executado
+        self.comandos: Counter[str] = Counter()
+
+    def suspeitas_n_mais_1(self) -> list[tuple[str, int]]:
+        """SELECTs idênticos repetidos na requisição, típicos de consultas em laço."""
+        return [
+            (comando, vezes)
+            for comando, vezes in self.comandos.items()
+            if vezes >= N_PLUS_ONE_THRESHOLD
+        ]
+
+
+# A requisição em andamento. As rotas síncronas rodam no threadpool com uma cópia
+# do contexto, mas apontando para o mesmo objeto, então os contadores são somados nele
+requisicao_atual: ContextVar[MetricasRequisicao | None] = ContextVar(
+    "requisicao_atual", default=None
+)
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """Registra os eventos que medem o tempo e contam as queries de cada requisição."""
+
+    # O início fica no contexto do próprio comando: um comando que falha não chega ao
+    # after_cursor_execute e não deixa nada para trás na conexão
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes_de_executar(_conn, _cursor, _statement, _parameters, context, _executemany):
+        context._inicio_query = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def depois_de_executar(_conn, cursor, statement, _parameters, context, _executemany):
+        inicio = context._inicio_query
+        metricas = requisicao_atual.get()
+        if metricas is None:
+            return
+
+        metricas.queries += 1
+        metricas.tempo_db += time.perf_counter() - inicio
+        if statement.lstrip()[:6].upper() == "SELECT":
+            metricas.comandos[statement] += 1
+        elif cursor.rowcount > 0:
+            # Linhas afetadas por INSERT/UPDATE/DELETE
+            metricas.linhas += cursor.rowcount
+
+
+# O SQLite não informa quantas linhas um SELECT devolveu,
+# então contamos os objetos carregados pelo ORM
+@event.listens_for(Session, "loaded_as_persistent")
+def ao_carregar_objeto(_session: Session, _instance: Any) -> None:
+    metricas = requisicao_atual.get()
+    if metricas is not None:
+        metricas.linhas += 1
+
+
+class RegistroMetricas:
+    """Agrega as métricas por rota e gera o texto no formato do Prometheus."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requisicoes: Counter[tuple[str, str, int]] = Counter()
+        self._somas: dict[tuple[str, str], dict[str, float]] = defaultdict(
+            lambda: {
+                "quantidade": 0,
+                "duracao": 0.0,
+                "tempo_db": 0.0,
+                "queries": 0,
+                "linhas": 0,
+            }
+        )
+        self._buckets: dict[tuple[str, str], list[int]] = defaultdict(
+            lambda: [0] * len(BUCKETS_DURACAO)
+        )
+        self._n_mais_1: Counter[tuple[str, str]] = Counter()
+
+    def registrar(
+        self,
+        metodo: str,
+        rota: str,
+        status: int,
+        duracao: float,
+        metricas: MetricasRequisicao,
+    ) -> None:
+        chave = (metodo, rota)
+        with self._lock:
+            self._requisicoes[(metodo, rota, status)] += 1
+
+            somas = self._somas[chave]
+            somas["quantidade"] += 1
+            somas["duracao"] += duracao
+            somas["tempo_db"] += metricas.tempo_db
+            somas["queries"] += metricas.queries
+            somas["linhas"] += metricas.linhas
+
+            buckets = self._buckets[chave]
+            for i, limite in enumerate(BUCKETS_DURACAO):
+                if duracao <= limite:
+                    buckets[i] += 1
+
+            if metricas.suspeitas_n_mais_1():
+                self._n_mais_1[chave] += 1
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._requisicoes.clear()
+            self._somas.clear()
+            self._buckets.clear()
+            self._n_mais_1.clear()
+
+    def exportar(self) -> str:
+        """Monta a resposta do /metrics (formato de texto do Prometheus)."""
+        linhas: list[str] = []
+
+        def metrica(nome: str, tipo: str, ajuda: str) -> None:
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} {tipo}")
+
+        def amostra(nome: str, valor: float, **rotulos: Any) -> None:
+            texto = ",".join(f'{k}="{v}"' for k, v in rotulos.items())
+            linhas.append(f"{nome}{{{texto}}} {valor:g}" if texto else f"{nome} {valor:g}")
+
+        with self._lock:
+            metrica("http_requests_total", "counter", "Requisições atendidas.")
+            for (metodo, rota, status), total in sorted(self._requisicoes.items()):
+                amostra(
+                    "http_requests_total", total, method=metodo, route=rota, status=status
+                )
+
+            nome = "http_request_duration_seconds"
+            metrica(nome, "histogram", "Duração das requisições.")
+            for (metodo, rota), buckets in sorted(self._buckets.items()):
+                somas = self._somas[(metodo, rota)]
+                rotulos = {"method": metodo, "route": rota}
+                for limite, quantidade in zip(BUCKETS_DURACAO, buckets):
+                    amostra(f"{nome}_bucket", quantidade, **rotulos, le=limite)
+                amostra(f"{nome}_bucket", somas["quantidade"], **rotulos, le="+Inf")
+                amostra(f"{nome}_sum", somas["duracao"], **rotulos)
+                amostra(f"{nome}_count", somas["quantidade"], **rotulos)
+
+            for nome, campo, ajuda in [
+                ("db_time_seconds_total", "tempo_db", "Tempo gasto executando SQL."),
+                ("db_queries_total", "queries", "Queries SQL executadas."),
+                ("db_rows_total", "linhas", "Linhas alteradas e objetos carregados."),
+            ]:
+                metrica(nome, "counter", ajuda)
+                for (metodo, rota), somas in sorted(self._somas.items()):
+                    amostra(nome, somas[campo], method=metodo, route=rota)
+
+            metrica(
+                "db_n_plus_one_requests_total",
+                "counter",
+                "Requisições com SELECTs idênticos repetidos (possível N+1).",
+            )
+            for (metodo, rota), total in sorted(self._n_mais_1.items()):
+                amostra("db_n_plus_one_requests_total", total, method=metodo, route=rota)
+
+        # Contadores do cache de respostas
+        cache = response_cache.stats()
+        for nome, campo, tipo, ajuda in [
+            ("response_cache_hits_total", "hits", "counter", "Acertos do cache."),
+            ("response_cache_misses_total", "misses", "counter", "Falhas do cache."),
+            ("response_cache_evictions_total", "evictions", "counter", "Descartes (LRU)."),
+            ("response_cache_entries", "entradas", "gauge", "Respostas guardadas."),
+        ]:
+            metrica(nome, tipo, ajuda)
+            amostra(nome, cache[campo])
+
+        return "\n".join(linhas) + "\n"
+
+
+registro_metricas = RegistroMetricas()
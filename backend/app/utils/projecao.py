@@ -0,0 +1,75 @@
+from functools import lru_cache
+from typing import Any
+
+from fastapi import HTTPException, status
+from pydantic import create_model
+from sqlmodel import SQLModel
+
+
+@lru_cache(maxsize=32)
+def campos_de_coluna(schema: type[SQLModel], model: type[SQLModel]) -> tuple[str, ...]:
+    """Campos do schema público que são colunas da tabela (os que podem ir no ?fields=)."""
+    colunas = model.__table__.columns  # type: ignore
+    return tuple(nome for nome in schema.model_fields if nome in colunas)
+
+
+def parse_campos(
+    texto: str | None, permitidos: tuple[str, ...], parametro: str = "fields"
+) -> tuple[str, ...] | None:
+    """
+    Converte 'nome,email' em ('email', 'nome', 'id'), na ordem dos campos permitidos.
+    O 'id' sempre é incluído. Retorna None se o parâmetro não foi enviado.
+    """
+    if texto is None or not texto.strip():
+        return None
+
+    pedidos = {campo.strip() for campo in texto.split(",") if campo.strip()}
+    invalidos = pedidos - set(permitidos)
+    if invalidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campo(s) inválido(s) em '{parametro}': {', '.join(sorted(invalidos))}. "
+            f"Use: {', '.join(permitidos)}.",
+        )
+
+    if parametro == "fields":
+        pedidos.add("id")
+    return tuple(campo for campo in permitidos if campo in pedidos)
+
+
+@lru_cache(maxsize=128)
+def schema_projetado(
+    paginado: type[SQLModel],
+    schema: type[SQLModel],
+    campos: tuple[str, ...],
+    relacoes: tuple[tuple[str, Any], ...] = (),
+) -> type[SQLModel]:
+    """
+    Cria (uma vez por combinação) a resposta paginada com apenas os campos pedidos.
+    Os campos reaproveitam tipo e configuração do 'schema' completo e os demais campos
+    de 'paginado' (total, cursor...) são mantidos, então a serialização (Decimal, datas,
+    telefone...) é a mesma da resposta sem projeção.
+    """
+    definicoes: dict[str, Any] = {
+        nome: (schema.model_fields[nome].annotation, schema.model_fields[nome])
+        for nome in campos
+    }
+    for nome, tipo in relacoes:
+        definicoes[nome] = (tipo, None)
+
+    sufixo = "_".join(campos + tuple(nome for nome, _ in relacoes))
+    item = create_model(  # type: ignore
+        f"{schema.__name__}_{sufixo}", __base__=SQLModel, **definicoes
+    )
+
+    externos: dict[str, Any] = {
+        nome: (campo.annotation, campo)
+        for nome, campo in paginado.model_fields.items()
+        if nome != "dados"
+    }
+    return create_model(  # type: ignore
+        f"{paginado.__name__}_{sufixo}",
+        __base__=SQLModel,
+        dados=(list[item], ...),
+        **externos,
+    )
@@ -0,0 +1,80 @@
+from functools import lru_cache, reduce
+from operator import or_
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+
+from fastapi import Response
+from pydantic import BaseModel, EmailStr, TypeAdapter, create_model
+from pydantic_extra_types.phone_numbers import PhoneNumber
+
+
+def _tipo_saida(tipo: Any) -> Any:
+    """
+    Troca e-mail e telefone por 'str' (inclusive dentro de listas, opcionais e schemas
+    aninhados). Validá-los de novo na saída é caro (email_validator e phonenumbers rodam
+    em Python) e inútil: os valores vieram do banco, já validados na entrada, e são
+    serializados como texto de qualquer forma.
+    """
+    if isinstance(tipo, type):
+        if issubclass(tipo, (EmailStr, PhoneNumber)):
+            return str
+        if issubclass(tipo, BaseModel):
+            return _schema_saida(tipo)
+        return tipo
+
+    argumentos = get_args(tipo)
+    if get_origin(tipo) in (Union, UnionType):
+        return reduce(or_, (_tipo_saida(arg) for arg in argumentos))
+    if get_origin(tipo) is list:
+        return list[_tipo_saida(argumentos[0])]
+    return tipo
+
+
+@lru_cache(maxsize=256)
+def _schema_saida(schema: type[BaseModel]) -> type[BaseModel]:
+    """Subclasse do schema só com os campos trocados por '_tipo_saida'. Campos calculados,
+    padrões e a serialização (Decimal como texto, datas em ISO 8601) continuam os mesmos."""
+    trocados: dict[str, Any] = {}
+    for nome, campo in schema.model_fields.items():
+        tipo = _tipo_saida(campo.annotation)
+        if tipo != campo.annotation:
+            trocados[nome] = (tipo, campo)
+
+    if not trocados:
+        return schema
+    return create_model(schema.__name__, __base__=schema, **trocados)  # type: ignore
+
+
+@lru_cache(maxsize=256)
+def _adaptador(schema: Any) -> TypeAdapter:
+    """Um TypeAdapter por schema (montar o validador/serializador é caro)."""
+    return TypeAdapter(_tipo_saida(schema))
+
+
+def serializar(schema: Any, obj: Any) -> bytes:
+    """
+    Converte o objeto (ORM, dict ou lista) no schema público e gera o JSON em uma
+    única passada pelo núcleo em Rust do Pydantic, com o mesmo resultado da
+    serialização padrão do FastAPI.
+    """
+    adaptador = _adaptador(schema)
+    return adaptador.dump_json(adaptador.validate_python(obj, from_attributes=True))
+
+
+def json_response(
+    schema: Any,
+    obj: Any,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    Serializa a resposta ainda dentro da rota. Nas rotas síncronas isso evita que o
+    FastAPI agende outra execução no threadpool só para validar o 'response_model'.
+    O 'response_model' continua declarado na rota para documentar o schema.
+    """
+    return Response(
+        content=serializar(schema, obj),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -0,0 +1,115 @@
+import mimetypes
+import os
+from pathlib import Path
+from typing import Any
+
+from fastapi import Request
+from fastapi.staticfiles import StaticFiles
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+
+
+class UploadStaticFiles(StaticFiles):
+    """
+    Serve os uploads com cache de longa duração. As artes convertidas têm um
+    UUID no nome e nunca são sobrescritas, então o navegador pode guardá-las
+    para sempre. Os uploads pendentes são temporários e não entram no cache.
+    """
+
+    def file_response(
+        self, full_path: Any, stat_result: Any, scope: Scope, status_code: int = 200
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+
+        if "/pendentes/" in scope["path"]:
+            response.headers["Cache-Control"] = "no-cache"
+        else:
+            response.headers["Cache-Control"] = CACHE_IMUTAVEL
+        return response
+
+
+# Versões pré-comprimidas geradas no build (frontend/scripts/comprimir.mjs), por preferência
+CODIFICACOES = (("br", ".br"), ("gzip", ".gz"))
+
+
+class ArquivoFrontend:
+    """Um arquivo do build com o 'stat' e as versões comprimidas já resolvidos."""
+
+    __slots__ = ("cache_control", "caminho", "media_type", "stat", "versoes")
+
+    def __init__(self, caminho: Path, cache_control: str):
+        self.caminho = caminho
+        self.stat = caminho.stat()
+        self.media_type = mimetypes.guess_type(caminho.name)[0] or "text/plain"
+        self.cache_control = cache_control
+        # codificação -> (caminho, stat) da versão comprimida
+        self.versoes: dict[str, tuple[Path, os.stat_result]] = {}
+        for codificacao, extensao in CODIFICACOES:
+            comprimido = caminho.with_name(caminho.name + extensao)
+            if comprimido.is_file():
+                self.versoes[codificacao] = (comprimido, comprimido.stat())
+
+
+class FrontendEstatico:
+    """
+    Serve o build do frontend a partir de um mapa montado uma única vez, na inicialização,
+    sem consultar o disco para decidir o que responder. Depois de recompilar o frontend,
+    reinicie o servidor para atualizar o mapa.
+
+    Os arquivos em 'assets/' têm um hash no nome, então são guardados para sempre pelo
+    navegador. O index.html é sempre revalidado (ETag), para pegar o build novo.
+    """
+
+    def __init__(self, pasta: Path):
+        self.arquivos: dict[str, ArquivoFrontend] = {}
+        for caminho in pasta.rglob("*"):
+            if not caminho.is_file() or caminho.suffix in (".br", ".gz"):
+                continue
+            nome = caminho.relative_to(pasta).as_posix()
+            cache = CACHE_IMUTAVEL if nome.startswith("assets/") else "no-cache"
+            self.arquivos[nome] = ArquivoFrontend(caminho, cache)
+
+    @staticmethod
+    def _codificacao(arquivo: ArquivoFrontend, accept_encoding: str) -> str | None:
+        """Melhor versão comprimida aceita pelo navegador (ignora as recusadas com q=0)."""
+        aceitas = set()
+        for parte in accept_encoding.split(","):
+            nome, *parametros = [item.strip() for item in parte.split(";")]
+            peso = next((p[2:] for p in parametros if p.startswith("q=")), "1")
+            try:
+                if float(peso) > 0:
+                    aceitas.add(nome.lower())
+            except ValueError:
+                continue
+        return next((c for c in arquivo.versoes if c in aceitas), None)
+
+    def response(self, caminho: str, request: Request) -> Response:
+        arquivo = self.arquivos.get(caminho)
+        if arquivo is None:
+            # Arquivo de build que não existe: 404 em vez do index.html no lugar de um JS
+            if caminho.startswith("assets/") or "index.html" not in self.arquivos:
+                return PlainTextResponse("Not Found", status_code=404)
+            # Rotas do React Router
+            arquivo = self.arquivos["index.html"]
+
+        headers = {"Cache-Control": arquivo.cache_control}
+        enviado, stat = arquivo.caminho, arquivo.stat
+        if arquivo.versoes:
+            headers["Vary"] = "Accept-Encoding"
+            codificacao = self._codificacao(
+                arquivo, request.headers.get("accept-encoding", "")
+            )
+            if codificacao:
+                enviado, stat = arquivo.versoes[codificacao]
+                headers["Content-Encoding"] = codificacao
+
+        # O FileResponse atende pedidos com Range e gera ETag/Last-Modified
+        response = FileResponse(
+            enviado, stat_result=stat, media_type=arquivo.media_type, headers=headers
+        )
+        if request.headers.get("if-none-match") == response.headers["etag"]:
+            return NotModifiedResponse(response.headers)
+        return response
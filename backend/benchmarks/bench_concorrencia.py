@@ -0,0 +1,181 @@
+"""
+Escalabilidade com requisições simultâneas: rotas no threadpool x AsyncSession (aiosqlite).
+
+Dispara as mesmas requisições com níveis crescentes de concorrência, primeiro com o banco
+no threadpool (o padrão) e depois com DB_ASYNC, limitando o threadpool a poucas threads.
+No modo síncrono, as requisições além desse limite esperam na fila por uma thread;
+no assíncrono, esperam apenas pelo banco.
+
+Uso (dentro da pasta backend, requer o grupo 'dev' e as dependências opcionais 'async'):
+    python -m benchmarks.bench_concorrencia --escala 0.1 --threads 4 --concorrencias 1 4 16 64
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Callable
+from pathlib import Path
+from typing import Any
+
+import httpx
+from anyio import to_thread
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine
+
+from app.config import Banco, aplicar_pragmas, get_banco
+from app.main import app
+from app.models import StatusPedido
+from app.utils.cache import response_cache
+
+from .comum import comparar, estatisticas, salvar_resultados, ultimo_resultado
+from .dados import QTD_PEDIDOS, SEMENTE_PADRAO, copiar_banco
+
+SUITE = "concorrencia"
+
+
+def _caminhos(escala: float, quantidade: int, semente: int) -> list[str]:
+    """Leituras em que o SQLite faz a maior parte do trabalho (contagens e filtros)."""
+    rng = random.Random(semente)
+    qtd_pedidos = max(1, int(QTD_PEDIDOS * escala))
+    status = [s.value for s in StatusPedido]
+    opcoes = [
+        lambda: f"/pedidos/?status={rng.choice(status)}&limit=10&incluir_itens=false",
+        lambda: f"/pedidos/?min_total={rng.randint(50, 500)}&limit=10&incluir_itens=false",
+        lambda: f"/pedidos/{rng.randint(1, qtd_pedidos)}",
+    ]
+    return [rng.choice(opcoes)() for _ in range(quantidade)]
+
+
+def _dependencia_banco(
+    engine: Any, async_engine: Any
+) -> Callable[[], AsyncIterator[Banco]]:
+    """Substituto do get_banco preso aos motores de uma rodada."""
+
+    async def banco_da_requisicao() -> AsyncIterator[Banco]:
+        banco = Banco(engine, async_engine)
+        try:
+            yield banco
+        finally:
+            await banco.close()
+
+    return banco_da_requisicao
+
+
+async def _rodada(
+    cliente: httpx.AsyncClient, caminhos: list[str], concorrencia: int
+) -> dict[str, Any]:
+    """Executa todos os caminhos com 'concorrencia' requisições em andamento ao mesmo tempo."""
+    fila = iter(caminhos)
+    tempos: list[float] = []
+    erros = 0
+
+    async def trabalhador() -> None:
+        nonlocal erros
+        for caminho in fila:
+            inicio = time.perf_counter()
+            resposta = await cliente.get(caminho)
+            tempos.append((time.perf_counter() - inicio) * 1000)
+            if resposta.status_code >= 400:
+                erros += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    return {
+        **estatisticas(tempos),
+        "erros": erros,
+        "requisicoes_por_segundo": len(caminhos) / duracao,
+    }
+
+
+async def executar(args: argparse.Namespace, banco_bench: Path) -> dict[str, dict[str, Any]]:
+    # O mesmo limite que o lifespan aplica com THREADPOOL_SIZE
+    to_thread.current_default_thread_limiter().total_tokens = args.threads
+
+    # Pools grandes nos dois modos: o limite medido é o das threads, não o de conexões
+    tamanho_pool = max(args.concorrencias)
+    engine = create_engine(
+        f"sqlite:///{banco_bench}",
+        connect_args={"check_same_thread": False},
+        pool_size=tamanho_pool,
+    )
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{banco_bench}", pool_size=tamanho_pool
+    )
+    event.listen(engine, "connect", aplicar_pragmas)
+    event.listen(async_engine.sync_engine, "connect", aplicar_pragmas)
+
+    caminhos = _caminhos(args.escala, args.requisicoes, args.semente)
+    resultados: dict[str, dict[str, Any]] = {}
+
+    for modo, motor_async in (("threadpool", None), ("async", async_engine)):
+        app.dependency_overrides[get_banco] = _dependencia_banco(engine, motor_async)
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://bench") as cliente:
+            await _rodada(cliente, caminhos[:20], 1)  # Aquecimento
+
+            for concorrencia in args.concorrencias:
+                nome = f"{modo}[{concorrencia} simultâneas]"
+                resultados[nome] = await _rodada(cliente, caminhos, concorrencia)
+                r = resultados[nome]
+                print(
+                    f"{nome:<32} {r['mediana']:>9.2f} {r['p95']:>9.2f}"
+                    f" {r['requisicoes_por_segundo']:>8.0f} {r['erros']:>6}"
+                )
+
+    app.dependency_overrides.clear()
+    engine.dispose()
+    await async_engine.dispose()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Escalabilidade: threadpool x async")
+    parser.add_argument(
+        "--escala", type=float, default=0.1, help="Fração dos volumes padrão"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=4, help="Tamanho do threadpool durante o teste"
+    )
+    parser.add_argument(
+        "--concorrencias", type=int, nargs="+", default=[1, 4, 16, 64]
+    )
+    parser.add_argument("--requisicoes", type=int, default=500)
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument(
+        "--limite", type=float, default=0.10, help="Piora da mediana aceita (0.10 = 10%%)"
+    )
+    args = parser.parse_args()
+
+    # Só as rotas sem cache entram no teste, mas o cache fica desligado por garantia
+    response_cache.max_entries = 0
+
+    print(f"{'modo':<32} {'mediana':>9} {'p95':>9} {'req/s':>8} {'erros':>6}")
+    with tempfile.TemporaryDirectory() as pasta:
+        banco_bench = Path(pasta) / "bench.db"
+        copiar_banco(args.escala, banco_bench).dispose()
+        resultados = asyncio.run(executar(args, banco_bench))
+
+    parametros = {
+        "escala": args.escala,
+        "threads": args.threads,
+        "concorrencias": args.concorrencias,
+        "requisicoes": args.requisicoes,
+        "semente": args.semente,
+    }
+    caminho = salvar_resultados(SUITE, resultados, parametros)
+    print(f"\nResultados salvos em {caminho}")
+
+    anterior = args.comparar or ultimo_resultado(SUITE, caminho)
+    if anterior and comparar(anterior, resultados, args.limite):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Mede a criação de pedidos (PedidoService.create) variando a quantidade de itens.
+Com a busca dos produtos em um único IN, o número de queries e a latência
+devem ficar praticamente constantes conforme os itens aumentam.
+
+Uso (dentro da pasta backend):
+    python -m benchmarks.bench_criar_pedido
+"""
+
+import statistics
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import Cliente, ItemPedidoInput, PedidoCreate, Produto
+from app.services.pedido_service import pedido_service
+
+QUANTIDADES_ITENS = [1, 5, 20, 50, 100]
+REPETICOES = 30
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_engine(f"sqlite:///{Path(pasta) / 'bench.db'}")
+        SQLModel.metadata.create_all(engine)
+
+        queries = 0
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def contar(*_):
+            nonlocal queries
+            queries += 1
+
+        with Session(engine) as session:
+            cliente = Cliente(nome="Cliente Benchmark")
+            session.add(cliente)
+            session.add_all(
+                Produto(nome=f"Produto {i}", preco_base=Decimal("10.00"))
+                for i in range(max(QUANTIDADES_ITENS))
+            )
+            session.commit()
+            cliente_id = cliente.id
+            produto_ids = list(range(1, max(QUANTIDADES_ITENS) + 1))
+
+            print(f"{'itens':>6} {'queries':>8} {'mediana (ms)':>13} {'p95 (ms)':>9}")
+            for qtd in QUANTIDADES_ITENS:
+                pedido = PedidoCreate(
+                    cliente_id=cliente_id,  # type: ignore
+                    itens=[ItemPedidoInput(produto_id=pid) for pid in produto_ids[:qtd]],
+                )
+
+                tempos = []
+                for _ in range(REPETICOES):
+                    queries = 0
+                    inicio = time.perf_counter()
+                    pedido_service.create(session, pedido)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                    session.expunge_all()
+
+                p95 = statistics.quantiles(tempos, n=20)[-1]
+                print(f"{qtd:>6} {queries:>8} {statistics.median(tempos):>13.2f} {p95:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Cenários de carga HTTP contra a aplicação FastAPI rodando no próprio processo.
+
+Simula o uso do sistema (listagens, buscas, dashboard, criação de pedidos...) com
+pesos por cenário e várias threads em paralelo, usando um banco com dados sintéticos.
+Registra latência por cenário, vazão total e erros, e salva tudo em JSON.
+
+Uso (dentro da pasta backend, requer o grupo de dependências 'dev'):
+    python -m benchmarks.bench_http --escala 0.1 --requisicoes 2000 --concorrencia 8
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlmodel import Session
+
+from app.config import Banco, get_banco, get_session
+from app.main import app
+from app.models import StatusPedido
+from app.utils.cache import response_cache
+
+from .comum import comparar, estatisticas, salvar_resultados, ultimo_resultado
+from .dados import QTD_CLIENTES, QTD_PEDIDOS, QTD_PRODUTOS, SEMENTE_PADRAO, copiar_banco
+
+SUITE = "http"
+
+Cenario = Callable[[TestClient, random.Random], Response]
+
+
+def _cenarios(escala: float) -> dict[str, tuple[int, Cenario]]:
+    """nome -> (peso, requisição). Os pesos imitam o uso real: muita leitura, pouca escrita."""
+    qtd_clientes = max(1, int(QTD_CLIENTES * escala))
+    qtd_produtos = max(10, int(QTD_PRODUTOS * escala))
+    qtd_pedidos = max(1, int(QTD_PEDIDOS * escala))
+    status = [s.value for s in StatusPedido]
+    buscas = ["silva", "ana", "caneca", "urgente", "presente", "souza"]
+
+    def criar_pedido(c: TestClient, rng: random.Random) -> Response:
+        itens = [
+            {"produto_id": pid, "quantidade": rng.randint(1, 5)}
+            for pid in rng.sample(range(1, qtd_produtos + 1), rng.randint(1, 4))
+        ]
+        return c.post(
+            "/pedidos/", json={"cliente_id": rng.randint(1, qtd_clientes), "itens": itens}
+        )
+
+    def mudar_status(c: TestClient, rng: random.Random) -> Response:
+        return c.patch(
+            f"/pedidos/{rng.randint(1, qtd_pedidos)}", json={"status": rng.choice(status)}
+        )
+
+    return {
+        "GET /dashboard": (15, lambda c, _: c.get("/dashboard/")),
+        "GET /pedidos": (20, lambda c, _: c.get("/pedidos/?limit=20")),
+        "GET /pedidos?cursor": (
+            10,
+            lambda c, _: c.get("/pedidos/?limit=20&cursor=&contagem=nenhuma"),
+        ),
+        "GET /pedidos?status": (
+            10,
+            lambda c, rng: c.get("/pedidos/", params={"status": rng.choice(status)}),
+        ),
+        "GET /pedidos?q": (
+            8,
+            lambda c, rng: c.get("/pedidos/", params={"q": rng.choice(buscas)}),
+        ),
+        "GET /pedidos/{id}": (
+            10,
+            lambda c, rng: c.get(f"/pedidos/{rng.randint(1, qtd_pedidos)}"),
+        ),
+        "GET /clientes?q": (
+            8,
+            lambda c, rng: c.get("/clientes/", params={"q": rng.choice(buscas)}),
+        ),
+        "GET /clientes?skip": (
+            4,
+            lambda c, rng: c.get("/clientes/", params={"skip": rng.randint(0, qtd_clientes)}),
+        ),
+        "GET /produtos?q": (
+            5,
+            lambda c, rng: c.get("/produtos/", params={"q": rng.choice(buscas)}),
+        ),
+        "POST /pedidos": (6, criar_pedido),
+        "PATCH /pedidos/{id}": (4, mudar_status),
+    }
+
+
+def executar(
+    cliente: TestClient,
+    cenarios: dict[str, tuple[int, Cenario]],
+    requisicoes: int,
+    concorrencia: int,
+    semente: int,
+) -> tuple[dict[str, dict[str, Any]], float]:
+    """Dispara as requisições sorteadas e devolve as estatísticas por cenário e a duração."""
+    sorteio = random.Random(semente)
+    nomes = sorteio.choices(
+        list(cenarios), weights=[peso for peso, _ in cenarios.values()], k=requisicoes
+    )
+
+    tempos: dict[str, list[float]] = defaultdict(list)
+    erros: dict[str, int] = defaultdict(int)
+    trava = threading.Lock()
+
+    def requisitar(indice: int, nome: str) -> None:
+        rng = random.Random(semente + indice)
+        inicio = time.perf_counter()
+        resposta = cenarios[nome][1](cliente, rng)
+        duracao = (time.perf_counter() - inicio) * 1000
+
+        with trava:
+            tempos[nome].append(duracao)
+            if resposta.status_code >= 400:
+                erros[nome] += 1
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concorrencia) as executor:
+        for futuro in [executor.submit(requisitar, i, n) for i, n in enumerate(nomes)]:
+            futuro.result()
+    duracao_total = time.perf_counter() - inicio
+
+    resultados = {}
+    for nome in cenarios:
+        if tempos[nome]:
+            resultados[nome] = {**estatisticas(tempos[nome]), "erros": erros[nome]}
+
+    todos = [t for lista in tempos.values() for t in lista]
+    resultados["total"] = {
+        **estatisticas(todos),
+        "erros": sum(erros.values()),
+        "requisicoes_por_segundo": requisicoes / duracao_total,
+    }
+    return resultados, duracao_total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cenários de carga HTTP em processo")
+    parser.add_argument(
+        "--escala", type=float, default=0.1, help="Fração dos volumes padrão"
+    )
+    parser.add_argument("--requisicoes", type=int, default=1000)
+    parser.add_argument("--concorrencia", type=int, default=4)
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument(
+        "--sem-cache", action="store_true", help="Desativa o cache de respostas"
+    )
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument(
+        "--limite", type=float, default=0.10, help="Piora da mediana aceita (0.10 = 10%%)"
+    )
+    args = parser.parse_args()
+
+    if args.sem_cache:
+        response_cache.max_entries = 0
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = copiar_banco(args.escala, Path(pasta) / "bench.db")
+
+        def get_bench_session():
+            with Session(engine, expire_on_commit=False) as session:
+                yield session
+
+        async def get_bench_banco():
+            banco = Banco(engine, None)
+            try:
+                yield banco
+            finally:
+                await banco.close()
+
+        # Sem o 'with', o TestClient não roda o lifespan (que abriria o banco da aplicação)
+        app.dependency_overrides[get_session] = get_bench_session
+        app.dependency_overrides[get_banco] = get_bench_banco
+        cliente = TestClient(app)
+
+        resultados, duracao = executar(
+            cliente, _cenarios(args.escala), args.requisicoes, args.concorrencia, args.semente
+        )
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    print(f"{'cenário':<24} {'mediana':>9} {'p95':>9} {'max':>9} {'req':>6} {'erros':>6}")
+    for nome, r in resultados.items():
+        print(
+            f"{nome:<24} {r['mediana']:>9.2f} {r['p95']:>9.2f} {r['max']:>9.2f}"
+            f" {r['rodadas']:>6} {r['erros']:>6}"
+        )
+    total = resultados["total"]
+    print(f"\n{args.requisicoes} requisições em {duracao:.1f}s")
+    print(f"({total['requisicoes_por_segundo']:.0f} req/s, {args.concorrencia} threads)")
+
+    parametros = {
+        "escala": args.escala,
+        "requisicoes": args.requisicoes,
+        "concorrencia": args.concorrencia,
+        "semente": args.semente,
+        "cache": not args.sem_cache,
+    }
+    caminho = salvar_resultados(SUITE, resultados, parametros)
+    print(f"\nResultados salvos em {caminho}")
+
+    anterior = args.comparar or ultimo_resultado(SUITE, caminho)
+    if anterior and comparar(anterior, resultados, args.limite):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Vazão da serialização das respostas JSON (listagem de pedidos com itens e cliente).
+
+Compara, sobre os mesmos pedidos já carregados do banco:
+  - jsonable_encoder: conversão para dict + json.dumps (caminho antigo do FastAPI);
+  - response_model: a rota devolve os objetos ORM e o FastAPI valida e serializa;
+  - json_response: a rota serializa direto com o TypeAdapter (app/utils/resposta.py).
+
+Os dois últimos rodam como rotas HTTP de verdade, então a diferença inclui o trabalho
+extra do FastAPI após a rota (nas rotas síncronas, uma ida a mais ao threadpool).
+Também confere que os três geram exatamente o mesmo JSON (Decimal e datas).
+
+Uso (dentro da pasta backend, requer o grupo de dependências 'dev'):
+    python -m benchmarks.bench_serializacao --escala 0.1 --tamanhos 10 50 200
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.models import PedidoPublicPaginated
+from app.services.pedido_service import pedido_service
+from app.utils.resposta import json_response
+
+from .comum import comparar, imprimir_tabela, medir, salvar_resultados, ultimo_resultado
+from .dados import copiar_banco
+
+SUITE = "serializacao"
+
+
+def _app_comparacao(resultados: dict[int, dict[str, Any]]) -> FastAPI:
+    """Duas rotas com o mesmo conteúdo, uma em cada forma de serializar."""
+    app = FastAPI()
+
+    @app.get("/response-model/{tamanho}", response_model=PedidoPublicPaginated)
+    def via_response_model(tamanho: int) -> Any:
+        return resultados[tamanho]
+
+    @app.get("/json-response/{tamanho}", response_model=PedidoPublicPaginated)
+    def via_json_response(tamanho: int) -> Response:
+        return json_response(PedidoPublicPaginated, resultados[tamanho])
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vazão da serialização JSON")
+    parser.add_argument(
+        "--escala", type=float, default=0.1, help="Fração dos volumes padrão"
+    )
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--rodadas", type=int, default=50)
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument(
+        "--limite", type=float, default=0.10, help="Piora da mediana aceita (0.10 = 10%%)"
+    )
+    args = parser.parse_args()
+
+    resultados: dict[str, dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = copiar_banco(args.escala, Path(pasta) / "bench.db")
+
+        with Session(engine) as session:
+            # Carrega tudo antes: a medição é só da serialização
+            paginas = {
+                tamanho: pedido_service.get_all_detailed(session, limit=tamanho)
+                for tamanho in args.tamanhos
+            }
+            cliente = TestClient(_app_comparacao(paginas))
+
+            for tamanho, pagina in paginas.items():
+                # Valores da iteração presos como padrão: as funções são chamadas depois
+                def legado(pagina: Any = pagina) -> bytes:
+                    conteudo = jsonable_encoder(PedidoPublicPaginated.model_validate(pagina))
+                    return json.dumps(conteudo, separators=(",", ":")).encode()
+
+                caminhos = {
+                    "jsonable_encoder": legado,
+                    "response_model": lambda tamanho=tamanho: cliente.get(
+                        f"/response-model/{tamanho}"
+                    ).content,
+                    "json_response": lambda tamanho=tamanho: cliente.get(
+                        f"/json-response/{tamanho}"
+                    ).content,
+                }
+
+                conteudos = {nome: json.loads(func()) for nome, func in caminhos.items()}
+                if len({json.dumps(c, sort_keys=True) for c in conteudos.values()}) != 1:
+                    print(f"JSON diferente entre os caminhos com {tamanho} pedidos!")
+                    sys.exit(1)
+                tamanho_bytes = len(caminhos["json_response"]())
+
+                for nome, func in caminhos.items():
+                    resultado = medir(func, rodadas=args.rodadas)
+                    resultado["bytes"] = tamanho_bytes
+                    resultado["mb_por_segundo"] = (
+                        tamanho_bytes / 1_000_000 / (resultado["mediana"] / 1000)
+                    )
+                    chave = f"{nome}[{tamanho} pedidos]"
+                    resultados[chave] = resultado
+                    print(
+                        f"{chave:<40} {resultado['mediana']:>9.2f} ms"
+                        f"  {resultado['mb_por_segundo']:>7.1f} MB/s"
+                    )
+
+        engine.dispose()
+
+    print()
+    imprimir_tabela(resultados)
+
+    parametros = {"escala": args.escala, "tamanhos": args.tamanhos, "rodadas": args.rodadas}
+    caminho = salvar_resultados(SUITE, resultados, parametros)
+    print(f"\nResultados salvos em {caminho}")
+
+    anterior = args.comparar or ultimo_resultado(SUITE, caminho)
+    if anterior and comparar(anterior, resultados, args.limite):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
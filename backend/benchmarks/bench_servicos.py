@@ -0,0 +1,233 @@
+"""
+Microbenchmarks dos serviços sobre um banco com dados sintéticos (ver benchmarks/dados.py).
+
+Mede listagens, buscas, criação de pedidos, inclusão de itens, o dashboard e a
+conversão de artes. Além do tempo, registra quantas queries cada chamada executa.
+O resultado é salvo em JSON e comparado com a execução anterior da mesma suíte.
+
+Uso (dentro da pasta backend):
+    python -m benchmarks.bench_servicos --escala 0.1
+    python -m benchmarks.bench_servicos --escala 1 --filtro pedidos --comparar resultados/x.json
+"""
+
+import argparse
+import itertools
+import random
+import sys
+import tempfile
+from collections.abc import Callable
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.models import ItemPedidoInput, PedidoCreate, StatusPedido
+from app.services.cliente_service import cliente_service
+from app.services.dashboard_service import dashboard_service
+from app.services.pedido_service import pedido_service
+from app.services.produto_service import produto_service
+from app.utils.imagem import delete_art_image, process_art_image
+
+from .comum import (
+    comparar,
+    imprimir_tabela,
+    medir,
+    salvar_resultados,
+    ultimo_resultado,
+)
+from .dados import QTD_CLIENTES, QTD_PEDIDOS, QTD_PRODUTOS, SEMENTE_PADRAO, copiar_banco
+
+SUITE = "servicos"
+
+
+def _benchmarks(
+    session: Session, escala: float, pasta: Path
+) -> dict[str, tuple[Callable[[], Any], Callable[[], Any] | None]]:
+    """Monta os cenários: nome -> (função medida, preparação fora da medição)."""
+    rng = random.Random(SEMENTE_PADRAO)
+    qtd_clientes = max(1, int(QTD_CLIENTES * escala))
+    qtd_produtos = max(10, int(QTD_PRODUTOS * escala))
+    qtd_pedidos = max(1, int(QTD_PEDIDOS * escala))
+
+    def novo_pedido() -> PedidoCreate:
+        return PedidoCreate(
+            cliente_id=rng.randint(1, qtd_clientes),
+            itens=[
+                ItemPedidoInput(produto_id=pid, quantidade=rng.randint(1, 5))
+                for pid in rng.sample(range(1, qtd_produtos + 1), 3)
+            ],
+        )
+
+    pedidos_alvo = itertools.cycle(
+        rng.sample(range(1, qtd_pedidos + 1), min(qtd_pedidos, 500))
+    )
+
+    def adicionar_item() -> None:
+        pedido_service.add_item(
+            session,
+            next(pedidos_alvo),
+            ItemPedidoInput(produto_id=rng.randint(1, qtd_produtos)),
+        )
+
+    # Arte de teste: foto grande, como as enviadas pelo celular
+    origem = pasta / "arte_benchmark.jpg"
+    Image.radial_gradient("L").resize((4000, 3000)).convert("RGB").save(origem, quality=90)
+    artes: list[str] = []
+
+    def converter_arte() -> None:
+        artes.append(process_art_image(str(origem)))
+
+    def limpar_artes() -> None:
+        while artes:
+            delete_art_image(artes.pop())
+
+    limpar_sessao = session.expunge_all
+
+    return {
+        "clientes.get_all": (
+            lambda: cliente_service.get_all(session, skip=0, limit=50),
+            limpar_sessao,
+        ),
+        "clientes.get_all[busca]": (
+            lambda: cliente_service.get_all(
+                session, q="silva", limit=50, search_fields=["nome", "email", "telefone"]
+            ),
+            limpar_sessao,
+        ),
+        "clientes.get_all[offset profundo]": (
+            lambda: cliente_service.get_all(session, skip=qtd_clientes // 2, limit=50),
+            limpar_sessao,
+        ),
+        "produtos.get_all_paginated[busca]": (
+            lambda: produto_service.get_all_paginated(session, q="caneca", limit=50),
+            limpar_sessao,
+        ),
+        "pedidos.get_all_detailed": (
+            lambda: pedido_service.get_all_detailed(session, limit=50),
+            limpar_sessao,
+        ),
+        "pedidos.get_all_detailed[sem itens]": (
+            lambda: pedido_service.get_all_detailed(session, limit=50, incluir_itens=False),
+            limpar_sessao,
+        ),
+        "pedidos.get_all_detailed[fields]": (
+            lambda: pedido_service.get_all_detailed(
+                session, limit=50, campos=("id", "status", "total", "qtd_itens")
+            ),
+            limpar_sessao,
+        ),
+        "pedidos.get_all_detailed[sem contagem]": (
+            lambda: pedido_service.get_all_detailed(
+                session, limit=50, cursor="", contagem="nenhuma"
+            ),
+            limpar_sessao,
+        ),
+        "pedidos.get_all_detailed[status]": (
+            lambda: pedido_service.get_all_detailed(
+                session, status=StatusPedido.EM_PRODUCAO, limit=50
+            ),
+            limpar_sessao,
+        ),
+        "pedidos.get_all_detailed[busca]": (
+            lambda: pedido_service.get_all_detailed(session, q="urgente", limit=50),
+            limpar_sessao,
+        ),
+        "pedidos.get_all_detailed[offset profundo]": (
+            lambda: pedido_service.get_all_detailed(
+                session, skip=qtd_pedidos // 2, limit=50
+            ),
+            limpar_sessao,
+        ),
+        "pedidos.create": (
+            lambda: pedido_service.create(session, novo_pedido()),
+            limpar_sessao,
+        ),
+        "pedidos.add_item": (adicionar_item, limpar_sessao),
+        "dashboard.get_dashboard_data": (
+            lambda: dashboard_service.get_dashboard_data(session),
+            limpar_sessao,
+        ),
+        "dashboard.get_series[36 meses]": (
+            lambda: dashboard_service.get_series(
+                session, date(2023, 1, 1), date(2025, 12, 31), "mes"
+            ),
+            limpar_sessao,
+        ),
+        "clientes.get_upcoming_birthdays[30 dias]": (
+            lambda: cliente_service.get_upcoming_birthdays(
+                session, dias=30, limit=50, hoje=date(2026, 12, 20)
+            ),
+            limpar_sessao,
+        ),
+        "imagem.process_art_image": (converter_arte, limpar_artes),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks dos serviços")
+    parser.add_argument(
+        "--escala", type=float, default=0.1, help="Fração dos volumes padrão"
+    )
+    parser.add_argument("--rodadas", type=int, default=30)
+    parser.add_argument("--filtro", help="Roda só os benchmarks que contêm este texto")
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument(
+        "--limite", type=float, default=0.10, help="Piora da mediana aceita (0.10 = 10%%)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = copiar_banco(args.escala, Path(pasta) / "bench.db")
+
+        queries = 0
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def contar(*_):
+            nonlocal queries
+            queries += 1
+
+        resultados: dict[str, dict[str, Any]] = {}
+        with Session(engine) as session:
+            cenarios = _benchmarks(session, args.escala, Path(pasta))
+            for nome, (func, preparar) in cenarios.items():
+                if args.filtro and args.filtro not in nome:
+                    continue
+
+                # A conversão de arte é bem mais lenta que as queries
+                rodadas = args.rodadas
+                if nome.startswith("imagem."):
+                    rodadas = max(3, rodadas // 5)
+                resultado = medir(func, rodadas=rodadas, preparar=preparar)
+
+                # Uma chamada extra só para contar as queries
+                if preparar:
+                    preparar()
+                queries = 0
+                func()
+                resultado["queries"] = queries
+
+                resultados[nome] = resultado
+                print(f"{nome:<40} {resultado['mediana']:>9.2f} ms  {queries:>3} queries")
+
+            # Remove as artes geradas na contagem de queries
+            cenarios["imagem.process_art_image"][1]()  # type: ignore
+
+        engine.dispose()
+
+    print()
+    imprimir_tabela(resultados)
+
+    parametros = {"escala": args.escala, "rodadas": args.rodadas, "filtro": args.filtro}
+    caminho = salvar_resultados(SUITE, resultados, parametros)
+    print(f"\nResultados salvos em {caminho}")
+
+    anterior = args.comparar or ultimo_resultado(SUITE, caminho)
+    if anterior and comparar(anterior, resultados, args.limite):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Medição, gravação e comparação dos resultados dos benchmarks.
+
+Cada execução é salva em JSON na pasta 'resultados', com a versão do código,
+permitindo comparar com uma execução anterior e apontar regressões.
+"""
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+PASTA_RESULTADOS = Path(__file__).resolve().parent / "resultados"
+LIMITE_REGRESSAO = 0.10  # Mediana 10% mais lenta que a anterior conta como regressão
+
+
+def medir(
+    func: Callable[[], Any],
+    rodadas: int = 30,
+    aquecimento: int = 2,
+    preparar: Callable[[], Any] | None = None,
+) -> dict[str, float | int]:
+    """Executa 'func' várias vezes e devolve as estatísticas em milissegundos.
+    'preparar' roda antes de cada rodada e fica fora da medição."""
+    for _ in range(aquecimento):
+        if preparar:
+            preparar()
+        func()
+
+    tempos = []
+    for _ in range(rodadas):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+
+    return estatisticas(tempos)
+
+
+def estatisticas(tempos: list[float]) -> dict[str, float | int]:
+    tempos = sorted(tempos)
+    return {
+        "rodadas": len(tempos),
+        "min": tempos[0],
+        "max": tempos[-1],
+        "media": statistics.fmean(tempos),
+        "mediana": statistics.median(tempos),
+        "p95": tempos[min(len(tempos) - 1, int(len(tempos) * 0.95))],
+        "desvio": statistics.stdev(tempos) if len(tempos) > 1 else 0.0,
+    }
+
+
+def _versao_codigo() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconhecida"
+
+
+def salvar_resultados(
+    suite: str, resultados: dict[str, dict[str, Any]], parametros: dict[str, Any]
+) -> Path:
+    """Grava a execução em 'resultados/<suite>_<data>.json'."""
+    PASTA_RESULTADOS.mkdir(exist_ok=True)
+    agora = datetime.now()
+    caminho = PASTA_RESULTADOS / f"{suite}_{agora:%Y-%m-%d_%H-%M-%S}.json"
+
+    caminho.write_text(
+        json.dumps(
+            {
+                "suite": suite,
+                "data": agora.isoformat(timespec="seconds"),
+                "versao": _versao_codigo(),
+                "python": sys.version.split()[0],
+                "plataforma": platform.platform(),
+                "parametros": parametros,
+                "resultados": resultados,
+            },
+            indent=2,
+            ensure_ascii=False,
+        )
+    )
+    return caminho
+
+
+def ultimo_resultado(suite: str, atual: Path) -> Path | None:
+    """Encontra a execução anterior da suíte com a mesma escala (para comparação automática)."""
+    escala = json.loads(atual.read_text())["parametros"].get("escala")
+    for arquivo in sorted(PASTA_RESULTADOS.glob(f"{suite}_*.json"), reverse=True):
+        if arquivo == atual:
+            continue
+        if json.loads(arquivo.read_text())["parametros"].get("escala") == escala:
+            return arquivo
+    return None
+
+
+def comparar(
+    anterior: Path,
+    resultados: dict[str, dict[str, Any]],
+    limite: float = LIMITE_REGRESSAO,
+) -> list[str]:
+    """Compara as medianas com uma execução anterior e devolve os nomes que regrediram."""
+    base = json.loads(anterior.read_text())
+    print(f"\nComparando com {anterior.name} (versão {base.get('versao')}):")
+
+    regressoes = []
+    for nome, atual in resultados.items():
+        antigo = base["resultados"].get(nome)
+        if not antigo or not antigo.get("mediana"):
+            print(f"  {nome:<40} (novo)")
+            continue
+
+        variacao = atual["mediana"] / antigo["mediana"] - 1
+        marca = ""
+        if variacao > limite:
+            marca = "  <-- REGRESSÃO"
+            regressoes.append(nome)
+        print(
+            f"  {nome:<40} {antigo['mediana']:>9.2f} -> {atual['mediana']:>9.2f} ms"
+            f" ({variacao:+.1%}){marca}"
+        )
+    return regressoes
+
+
+def imprimir_tabela(resultados: dict[str, dict[str, Any]]) -> None:
+    print(f"{'benchmark':<40} {'mediana':>9} {'p95':>9} {'min':>9} {'rodadas':>8}")
+    for nome, r in resultados.items():
+        print(
+            f"{nome:<40} {r['mediana']:>9.2f} {r['p95']:>9.2f} {r['min']:>9.2f}"
+            f" {r['rodadas']:>8}"
+        )
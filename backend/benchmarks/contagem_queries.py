@@ -0,0 +1,259 @@
+"""
+Quantidade de comandos SQL de cada rota de escrita, comparada com a esperada.
+
+Faz uma sequência de escritas pela API (criar e alterar clientes, produtos e pedidos,
+mexer nos itens, excluir) e conta os SELECT/INSERT/UPDATE/DELETE de cada requisição.
+Cada rota tem um número fixo de comandos, independente da quantidade de itens do pedido:
+falha quando alguma requisição emite comandos diferentes dos esperados (QUERIES_ESPERADAS),
+como uma nova leitura do registro depois do commit ou um lazy load dos itens.
+
+Uso (dentro da pasta backend, requer o grupo de dependências 'dev'):
+    python -m benchmarks.contagem_queries
+    python -m benchmarks.contagem_queries --detalhes
+"""
+
+import argparse
+import sys
+import tempfile
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+from httpx import Response
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.config import Banco, get_banco, get_session
+from app.main import app
+from app.utils.cache import response_cache
+
+from .dados import copiar_banco
+
+# Comandos por requisição. Os INSERT em resumo_status e resumo_diario são os resumos
+# do dashboard (um por status afetado em cada tabela)
+QUERIES_ESPERADAS: dict[str, dict[str, int]] = {
+    "POST /clientes": {"INSERT": 1},
+    "PATCH /clientes/{id}": {"SELECT": 1, "UPDATE": 1},
+    "POST /produtos": {"INSERT": 1},
+    "PATCH /produtos/{id}": {"SELECT": 1, "UPDATE": 1},
+    # Cliente, produtos (IN), pedido, itens (um INSERT para todos) e resumos
+    "POST /pedidos": {"SELECT": 2, "INSERT": 4},
+    # Troca de status: os resumos do status antigo e do novo
+    "PATCH /pedidos/{id}": {"SELECT": 1, "UPDATE": 1, "INSERT": 4},
+    # O If-Match confere a versão atual antes de carregar o pedido
+    "PATCH /pedidos/{id} [If-Match]": {"SELECT": 2, "UPDATE": 1, "INSERT": 2},
+    "POST /pedidos/{id}/itens": {"SELECT": 2, "UPDATE": 1, "INSERT": 3},
+    "PATCH /pedidos/{id}/itens/{produto_id}": {"SELECT": 1, "UPDATE": 2, "INSERT": 2},
+    "PATCH /pedidos/{id}/itens": {"SELECT": 2, "UPDATE": 2, "INSERT": 3, "DELETE": 1},
+    "DELETE /pedidos/{id}/itens/{produto_id}": {
+        "SELECT": 1,
+        "UPDATE": 1,
+        "INSERT": 2,
+        "DELETE": 1,
+    },
+    # Antes de excluir, o ORM carrega os registros vinculados (pedidos do cliente, itens do produto)
+    "DELETE /clientes/{id}": {"SELECT": 2, "DELETE": 1},
+    "DELETE /produtos/{id}": {"SELECT": 2, "DELETE": 1},
+}
+
+
+def _cenarios() -> list[tuple[str, Callable[[TestClient, dict[str, Any]], Response]]]:
+    """Escritas em sequência. 'ids' guarda os registros criados pelas anteriores."""
+
+    def guardar(chave: str, resposta: Response, ids: dict[str, Any]) -> Response:
+        if resposta.is_success:
+            ids[chave] = resposta.json()["id"]
+            ids[f"{chave}_etag"] = resposta.headers.get("etag")
+        return resposta
+
+    def criar_produto(chave: str, nome: str, preco: str):
+        return lambda c, ids: guardar(
+            chave, c.post("/produtos/", json={"nome": nome, "preco_base": preco}), ids
+        )
+
+    def pedido(ids: dict[str, Any], sufixo: str = "") -> str:
+        return f"/pedidos/{ids['pedido']}{sufixo}"
+
+    return [
+        (
+            "POST /clientes",
+            lambda c, ids: guardar(
+                "cliente",
+                c.post(
+                    "/clientes/",
+                    json={"nome": "Contagem de Queries", "telefone": "+5511912345678"},
+                ),
+                ids,
+            ),
+        ),
+        (
+            "PATCH /clientes/{id}",
+            lambda c, ids: c.patch(
+                f"/clientes/{ids['cliente']}", json={"observacoes": "Atualizado"}
+            ),
+        ),
+        ("POST /produtos", criar_produto("produto", "Produto da contagem A", "10")),
+        ("POST /produtos", criar_produto("produto_b", "Produto da contagem B", "4.5")),
+        ("POST /produtos", criar_produto("produto_c", "Produto da contagem C", "7")),
+        ("POST /produtos", criar_produto("produto_d", "Produto da contagem D", "2.25")),
+        (
+            "PATCH /produtos/{id}",
+            lambda c, ids: c.patch(f"/produtos/{ids['produto']}", json={"preco_base": "12"}),
+        ),
+        (
+            "POST /pedidos",
+            lambda c, ids: guardar(
+                "pedido",
+                c.post(
+                    "/pedidos/",
+                    json={
+                        "cliente_id": ids["cliente"],
+                        "itens": [
+                            {"produto_id": ids["produto"], "quantidade": 2},
+                            {"produto_id": ids["produto_b"], "preco_unitario": "3"},
+                        ],
+                    },
+                ),
+                ids,
+            ),
+        ),
+        (
+            "PATCH /pedidos/{id}",
+            lambda c, ids: guardar(
+                "pedido", c.patch(pedido(ids), json={"status": "Em Produção"}), ids
+            ),
+        ),
+        (
+            "PATCH /pedidos/{id} [If-Match]",
+            lambda c, ids: c.patch(
+                pedido(ids),
+                json={"desconto": "1.5"},
+                headers={"If-Match": ids["pedido_etag"]},
+            ),
+        ),
+        (
+            "POST /pedidos/{id}/itens",
+            lambda c, ids: c.post(
+                pedido(ids, "/itens"), json={"produto_id": ids["produto_c"]}
+            ),
+        ),
+        (
+            "PATCH /pedidos/{id}/itens/{produto_id}",
+            lambda c, ids: c.patch(
+                pedido(ids, f"/itens/{ids['produto_c']}"), json={"quantidade": 3}
+            ),
+        ),
+        (
+            "PATCH /pedidos/{id}/itens",
+            lambda c, ids: c.patch(
+                pedido(ids, "/itens"),
+                json=[
+                    {"acao": "remover", "produto_id": ids["produto_b"]},
+                    {"acao": "atualizar", "produto_id": ids["produto"], "quantidade": 1},
+                    {"acao": "adicionar", "produto_id": ids["produto_d"], "quantidade": 2},
+                ],
+            ),
+        ),
+        (
+            "DELETE /pedidos/{id}/itens/{produto_id}",
+            lambda c, ids: c.delete(pedido(ids, f"/itens/{ids['produto_c']}")),
+        ),
+        (
+            "DELETE /produtos/{id}",
+            lambda c, ids: c.delete(f"/produtos/{ids['produto_c']}"),
+        ),
+        (
+            "POST /clientes",
+            lambda c, ids: guardar(
+                "cliente_b",
+                c.post(
+                    "/clientes/",
+                    json={"nome": "Cliente sem pedidos", "telefone": "+5511987650000"},
+                ),
+                ids,
+            ),
+        ),
+        (
+            "DELETE /clientes/{id}",
+            lambda c, ids: c.delete(f"/clientes/{ids['cliente_b']}"),
+        ),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comandos SQL por rota de escrita")
+    parser.add_argument(
+        "--escala", type=float, default=0.01, help="Fração dos volumes padrão"
+    )
+    parser.add_argument(
+        "--detalhes", action="store_true", help="Mostra os comandos de cada requisição"
+    )
+    args = parser.parse_args()
+
+    response_cache.max_entries = 0
+
+    falhas = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = copiar_banco(args.escala, Path(pasta) / "bench.db")
+
+        capturadas: list[str] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def capturar(_conn, _cursor, statement, _parametros, _context, _executemany):
+            comando = statement.lstrip().split(None, 1)[0].upper()
+            if comando in ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE"):
+                capturadas.append(statement)
+
+        # As mesmas sessões da aplicação (sem expirar os objetos no commit)
+        def get_bench_session():
+            with Session(engine, expire_on_commit=False) as session:
+                yield session
+
+        async def get_bench_banco():
+            banco = Banco(engine, None)
+            try:
+                yield banco
+            finally:
+                await banco.close()
+
+        # Sem o 'with', o TestClient não roda o lifespan (que abriria o banco da aplicação)
+        app.dependency_overrides[get_session] = get_bench_session
+        app.dependency_overrides[get_banco] = get_bench_banco
+        cliente = TestClient(app)
+
+        ids: dict[str, Any] = {}
+        for nome, requisicao in _cenarios():
+            capturadas.clear()
+            resposta = requisicao(cliente, ids)
+
+            contagem = Counter(s.lstrip().split(None, 1)[0].upper() for s in capturadas)
+            esperada = QUERIES_ESPERADAS[nome]
+            problema = None
+            if not resposta.is_success:
+                problema = f"status {resposta.status_code}: {resposta.text[:200]}"
+            elif contagem != Counter(esperada):
+                problema = f"esperado {dict(sorted(esperada.items()))}"
+
+            situacao = "FALHA" if problema else "ok"
+            resumo = " ".join(f"{k}={v}" for k, v in sorted(contagem.items()))
+            print(f"{nome:<42} {resumo:<40} {situacao}")
+            if problema:
+                falhas += 1
+                print(f"    {problema}")
+            if problema or args.detalhes:
+                for statement in capturadas:
+                    print(f"    {' '.join(statement.split())[:150]}")
+
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    if falhas:
+        print(f"\n{falhas} requisições com comandos diferentes dos esperados.")
+        sys.exit(1)
+    print("\nTodas as escritas emitem só os comandos esperados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Gerador de dados sintéticos para os benchmarks.
+
+Cria um banco SQLite com volumes realistas de clientes, produtos, pedidos e itens.
+Com a mesma semente e escala, o conteúdo gerado é sempre o mesmo, permitindo
+comparar os resultados entre versões do código.
+
+Uso (dentro da pasta backend):
+    python -m benchmarks.dados --escala 0.1 --saida /tmp/bench.db
+"""
+
+import argparse
+import random
+import shutil
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, insert
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.models import Cliente, ItemPedido, Pedido, Produto, StatusPedido
+from app.services.dashboard_service import dashboard_service
+from app.utils.busca import configurar_fts
+
+# Volumes com escala 1.0
+QTD_CLIENTES = 100_000
+QTD_PRODUTOS = 5_000
+QTD_PEDIDOS = 1_000_000
+
+SEMENTE_PADRAO = 42
+TAMANHO_LOTE = 10_000  # Linhas por INSERT em lote
+
+# Distribuição dos status: a maior parte do histórico já foi concluída
+DISTRIBUICAO_STATUS = {
+    StatusPedido.CONCLUIDO: 0.62,
+    StatusPedido.CANCELADO: 0.06,
+    StatusPedido.AGUARDANDO_PAGAMENTO: 0.08,
+    StatusPedido.AGUARDANDO_ARTE: 0.08,
+    StatusPedido.EM_PRODUCAO: 0.10,
+    StatusPedido.PRONTO_RETIRADA: 0.06,
+}
+
+# Quantidade de itens por pedido e seus pesos
+DISTRIBUICAO_ITENS = {1: 0.45, 2: 0.30, 3: 0.15, 4: 0.07, 6: 0.03}
+
+DIAS_HISTORICO = 3 * 365
+
+# Bancos já gerados, reaproveitados entre execuções (chave: escala e semente)
+PASTA_CACHE = Path(__file__).resolve().parent / "dados"
+
+NOMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Heitor",
+    "Isabela", "João", "Larissa", "Marcos", "Natália", "Otávio", "Patrícia", "Rafael",
+    "Sofia", "Thiago", "Vitória", "William",
+]
+SOBRENOMES = [
+    "Silva", "Souza", "Oliveira", "Santos", "Pereira", "Lima", "Carvalho", "Ferreira",
+    "Rodrigues", "Almeida", "Costa", "Gomes", "Martins", "Araújo", "Ribeiro",
+]
+TIPOS_PRODUTO = [
+    "Caneca", "Camiseta", "Quadro", "Almofada", "Chaveiro", "Adesivo", "Agenda",
+    "Ecobag", "Azulejo", "Convite",
+]
+MATERIAIS = ["Cerâmica", "Algodão", "MDF", "Vinil", "Couro", "Papel Couché", "Poliéster"]
+# DDDs válidos (os telefones passam pela validação do TelefoneBR ao serem lidos)
+DDDS = [11, 12, 19, 21, 24, 27, 31, 41, 47, 48, 51, 61, 62, 71, 81, 85, 91]
+UNIDADES = ["un", "kit", "m²", "cento"]
+OBSERVACOES = [
+    None, None, None, "Entregar embrulhado para presente", "Cliente busca no sábado",
+    "Arte enviada pelo WhatsApp", "Urgente", "Conferir cores com a cliente",
+]
+
+
+def _escolher(rng: random.Random, distribuicao: dict[Any, float]) -> Any:
+    """Sorteia uma chave da distribuição (chave -> peso)."""
+    return rng.choices(list(distribuicao), weights=list(distribuicao.values()))[0]
+
+
+def _inserir(session: Session, model: type[SQLModel], linhas: list[dict]) -> None:
+    if linhas:
+        session.execute(insert(model), linhas)  # type: ignore
+        linhas.clear()
+
+
+def gerar_dados(
+    engine: Engine, escala: float = 1.0, semente: int = SEMENTE_PADRAO
+) -> dict[str, int]:
+    """Popula um banco vazio. Retorna a quantidade de linhas criadas por tabela."""
+    rng = random.Random(semente)
+    qtd_clientes = max(1, int(QTD_CLIENTES * escala))
+    qtd_produtos = max(10, int(QTD_PRODUTOS * escala))
+    qtd_pedidos = max(1, int(QTD_PEDIDOS * escala))
+    hoje = date(2026, 1, 1)  # Data fixa para o conteúdo não depender do dia da execução
+
+    SQLModel.metadata.create_all(engine)
+    contagem = {"cliente": qtd_clientes, "produto": qtd_produtos, "pedido": qtd_pedidos}
+
+    with Session(engine) as session:
+        linhas: list[dict] = []
+        for i in range(1, qtd_clientes + 1):
+            telefone = f"+55{rng.choice(DDDS)}9{rng.randint(60000000, 99999999)}"
+            nascimento = date(rng.randint(1950, 2008), rng.randint(1, 12), rng.randint(1, 28))
+            nome = f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+            telefone = telefone if rng.random() < 0.8 else None
+            email = f"cliente{i}@exemplo.com.br" if rng.random() < 0.6 else None
+            nascimento = nascimento if rng.random() < 0.7 else None
+            linhas.append(
+                {
+                    "id": i,
+                    "nome": nome,
+                    "telefone": telefone,
+                    "email": email,
+                    "data_nascimento": nascimento,
+                    # O INSERT em lote não passa pelos eventos do ORM
+                    "mes_nascimento": nascimento.month if nascimento else None,
+                    "dia_nascimento": nascimento.day if nascimento else None,
+                }
+            )
+            if len(linhas) >= TAMANHO_LOTE:
+                _inserir(session, Cliente, linhas)
+        _inserir(session, Cliente, linhas)
+
+        precos: dict[int, tuple[str, Decimal]] = {}
+        for i in range(1, qtd_produtos + 1):
+            nome = f"{rng.choice(TIPOS_PRODUTO)} {rng.choice(MATERIAIS)} {i}"
+            preco = Decimal(rng.randint(500, 25000)) / 100
+            precos[i] = (nome, preco)
+            linhas.append(
+                {
+                    "id": i,
+                    "nome": nome,
+                    "descricao": f"{nome} personalizado",
+                    "preco_base": preco,
+                    "unidade_medida": rng.choice(UNIDADES),
+                }
+            )
+        _inserir(session, Produto, linhas)
+
+        itens: list[dict] = []
+        contagem["item_pedido"] = 0
+        for i in range(1, qtd_pedidos + 1):
+            status = _escolher(rng, DISTRIBUICAO_STATUS)
+            data_pedido = hoje - timedelta(days=rng.randint(0, DIAS_HISTORICO))
+
+            subtotal = Decimal(0)
+            qtd_unidades = 0
+            qtd_itens = _escolher(rng, DISTRIBUICAO_ITENS)
+            for produto_id in rng.sample(range(1, qtd_produtos + 1), qtd_itens):
+                nome_produto, preco = precos[produto_id]
+                quantidade = rng.choice((1, 1, 1, 2, 5, 10))
+                subtotal += preco * quantidade
+                qtd_unidades += quantidade
+                itens.append(
+                    {
+                        "pedido_id": i,
+                        "produto_id": produto_id,
+                        "quantidade": quantidade,
+                        "preco_unitario": preco,
+                        "nome_produto": nome_produto,
+                    }
+                )
+
+            desconto = Decimal(0)
+            if rng.random() < 0.1:
+                desconto = (subtotal * Decimal("0.1")).quantize(Decimal("0.01"))
+            linhas.append(
+                {
+                    "id": i,
+                    "cliente_id": rng.randint(1, qtd_clientes),
+                    "data_pedido": data_pedido,
+                    "data_conclusao": data_pedido + timedelta(days=rng.randint(1, 20))
+                    if status == StatusPedido.CONCLUIDO
+                    else None,
+                    "status": status.value,
+                    "observacoes": rng.choice(OBSERVACOES),
+                    "desconto": desconto,
+                    "qtd_itens": qtd_itens,
+                    "qtd_unidades": qtd_unidades,
+                    "subtotal": subtotal,
+                    "total": subtotal - desconto,
+                }
+            )
+
+            if len(linhas) >= TAMANHO_LOTE:
+                contagem["item_pedido"] += len(itens)
+                _inserir(session, Pedido, linhas)
+                _inserir(session, ItemPedido, itens)
+
+        contagem["item_pedido"] += len(itens)
+        _inserir(session, Pedido, linhas)
+        _inserir(session, ItemPedido, itens)
+        session.commit()
+
+        # Os INSERTs em lote não passam pelos eventos do ORM: o resumo é recriado no fim
+        dashboard_service.rebuild_summary(session)
+
+    # Criar os índices FTS depois da carga é bem mais rápido que manter pelos triggers
+    with engine.begin() as connection:
+        configurar_fts(connection)
+
+    return contagem
+
+
+def obter_banco(escala: float, semente: int = SEMENTE_PADRAO) -> Path:
+    """Devolve o caminho de um banco gerado, criando-o apenas na primeira vez."""
+    PASTA_CACHE.mkdir(exist_ok=True)
+    caminho = PASTA_CACHE / f"bench_{escala:g}_{semente}.db"
+    if caminho.exists():
+        return caminho
+
+    temporario = caminho.with_suffix(".tmp")
+    temporario.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{temporario}")
+
+    inicio = time.perf_counter()
+    contagem = gerar_dados(engine, escala, semente)
+    engine.dispose()
+    temporario.replace(caminho)
+
+    print(f"Banco gerado em {time.perf_counter() - inicio:.1f}s: {contagem}")
+    return caminho
+
+
+def copiar_banco(escala: float, destino: Path, semente: int = SEMENTE_PADRAO) -> Engine:
+    """Copia o banco gerado para 'destino' (os benchmarks de escrita alteram os dados)
+    e devolve um engine apontando para a cópia, com o FTS já configurado."""
+    shutil.copyfile(obter_banco(escala, semente), destino)
+    engine = create_engine(f"sqlite:///{destino}", connect_args={"check_same_thread": False})
+    with engine.begin() as connection:
+        configurar_fts(connection)
+    return engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera um banco com dados sintéticos")
+    parser.add_argument(
+        "--escala", type=float, default=1.0, help="Fração dos volumes padrão"
+    )
+    parser.add_argument("--semente", type=int, default=SEMENTE_PADRAO)
+    parser.add_argument(
+        "--saida", type=Path, help="Arquivo do banco (padrão: cache dos benchmarks)"
+    )
+    args = parser.parse_args()
+
+    if args.saida is None:
+        print(obter_banco(args.escala, args.semente))
+        return
+
+    if args.saida.exists():
+        parser.error(f"O arquivo '{args.saida}' já existe.")
+
+    engine = create_engine(f"sqlite:///{args.saida}")
+    inicio = time.perf_counter()
+    contagem = gerar_dados(engine, args.escala, args.semente)
+    print(f"Banco gerado em {time.perf_counter() - inicio:.1f}s: {contagem}")
+
+
+if __name__ == "__main__":
+    main()
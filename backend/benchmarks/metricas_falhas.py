@@ -0,0 +1,70 @@
+"""
+Regressão das métricas de banco quando um comando SQL falha.
+
+Instrumenta um banco temporário como o da aplicação, executa na mesma conexão comandos
+que falham seguidos de um que funciona e confere o que foi medido: só o comando que
+terminou entra na contagem, o tempo medido é o dele e a conexão não guarda nada dos
+comandos que falharam (ela volta para o pool e seria reaproveitada).
+
+Uso (dentro da pasta backend):
+    python -m benchmarks.metricas_falhas
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, exc, text
+
+from app.utils.metricas import MetricasRequisicao, instrumentar_engine, requisicao_atual
+
+FALHAS = 3
+
+
+def main() -> None:
+    problemas: list[str] = []
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_engine(f"sqlite:///{Path(pasta) / 'metricas.db'}")
+        instrumentar_engine(engine)
+
+        metricas = MetricasRequisicao()
+        token = requisicao_atual.set(metricas)
+        try:
+            with engine.connect() as conn:
+                for _ in range(FALHAS):
+                    try:
+                        conn.execute(text("SELECT * FROM tabela_inexistente"))
+                    except exc.OperationalError:
+                        conn.rollback()
+
+                inicio = time.perf_counter()
+                conn.execute(text("SELECT 1")).all()
+                duracao = time.perf_counter() - inicio
+
+                # Estado deixado na conexão pelos eventos de medição
+                sobras = {
+                    chave: valor for chave, valor in conn.info.items() if valor
+                }
+        finally:
+            requisicao_atual.reset(token)
+        engine.dispose()
+
+    if metricas.queries != 1:
+        problemas.append(f"{metricas.queries} queries contadas (esperado 1)")
+    if not 0 <= metricas.tempo_db <= duracao:
+        problemas.append(
+            f"tempo medido {metricas.tempo_db:.6f}s fora do comando ({duracao:.6f}s)"
+        )
+    if sobras:
+        problemas.append(f"a conexão guardou dados das falhas: {sobras}")
+
+    for problema in problemas:
+        print(f"FALHA: {problema}")
+    if problemas:
+        sys.exit(1)
+    print(f"{FALHAS} comandos com erro e 1 sem erro: métricas corretas.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Regressão dos planos de execução das queries emitidas pelos serviços (EXPLAIN QUERY PLAN).
+
+Roda os cenários do bench_servicos e mais algumas operações (buscas por ID, exclusões de
+registros vinculados), captura cada SELECT/UPDATE/DELETE executado e pede ao SQLite o
+plano de cada um. Falha quando uma query lê uma tabela grande inteira ('SCAN tabela',
+sem índice), a não ser que a leitura esteja entre as esperadas (LEITURAS_ESPERADAS).
+
+Varreduras na ordem da própria tabela que terminam no LIMIT da query (sem WHERE nem
+ordenação temporária, como 'ORDER BY id DESC LIMIT 5') não são consideradas leituras
+completas. Com um filtro, a leitura pode percorrer a tabela inteira antes de completar
+o LIMIT.
+
+Uso (dentro da pasta backend):
+    python -m benchmarks.plano_consultas --escala 0.01
+    python -m benchmarks.plano_consultas --escala 0.1 --filtro pedidos --detalhes
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastapi import HTTPException
+from sqlalchemy import Engine, event
+from sqlmodel import Session, func, select
+
+from app.models import (
+    ItemPedido,
+    ItemPedidoUpdate,
+    OperacaoItem,
+    Pedido,
+    PedidoUpdate,
+    StatusPedido,
+)
+from app.services.cliente_service import cliente_service
+from app.services.pedido_service import pedido_service
+from app.services.produto_service import produto_service
+
+from .bench_servicos import _benchmarks
+from .dados import copiar_banco
+
+# Tabelas que crescem com o uso: ler qualquer uma delas inteira é uma regressão
+TABELAS_GRANDES = {"cliente", "produto", "pedido", "item_pedido"}
+
+# Leituras completas esperadas por cenário (tabela -> motivo), para as exceções aceitas
+LEITURAS_ESPERADAS: dict[str, dict[str, str]] = {}
+
+# Sufixo dos nomes gerados pelo SQLAlchemy para aliases ('cliente_1', 'pedido_2'...)
+_ALIAS = re.compile(r"_\d+$")
+_SCAN = re.compile(r"^SCAN (\w+)(.*)$")
+_LIMIT_FINAL = re.compile(r"LIMIT \?(?: OFFSET \?)?\s*$")
+_WHERE = re.compile(r"\bWHERE\b", re.IGNORECASE)
+
+
+def _cenarios_extras(session: Session) -> dict[str, Callable[[], Any]]:
+    """Operações fora do bench_servicos que também rodam em tabelas grandes.
+    As escritas vêm por último e usam pedidos diferentes dos lidos antes."""
+    pedido = session.exec(select(Pedido).order_by(Pedido.id).limit(1)).one()  # type: ignore
+    produto_vinculado = session.exec(select(ItemPedido.produto_id).limit(1)).one()
+    # Pedido com mais de um item, para remover um sem deixá-lo vazio
+    pedido_itens, produto_item = session.exec(
+        select(ItemPedido.pedido_id, func.min(ItemPedido.produto_id))
+        .where(ItemPedido.pedido_id != pedido.id)
+        .group_by(ItemPedido.pedido_id)  # type: ignore
+        .having(func.count() > 1)
+        .limit(1)
+    ).one()
+    pedido_excluido = session.exec(
+        select(Pedido.id).order_by(Pedido.id.desc()).limit(1)  # type: ignore
+    ).one()
+    session.expunge_all()
+
+    def excluir_vinculado(service: Any, id: int) -> Callable[[], Any]:
+        # A exclusão falha (o registro tem pedidos) e não altera nada: só importa o plano
+        # das queries que o ORM faz para achar os registros dependentes
+        def executar() -> None:
+            try:
+                service.delete(session, id)
+            except HTTPException:
+                pass
+
+        return executar
+
+    return {
+        "clientes.get_by_id": lambda: cliente_service.get_by_id(session, pedido.cliente_id),
+        "clientes.delete[vinculado]": excluir_vinculado(cliente_service, pedido.cliente_id),
+        "produtos.delete[vinculado]": excluir_vinculado(produto_service, produto_vinculado),
+        "pedidos.get_by_id_detailed": lambda: pedido_service.get_by_id_detailed(
+            session, pedido.id  # type: ignore
+        ),
+        "pedidos.get_version": lambda: pedido_service.get_version(session, pedido.id),
+        "pedidos.get_all_detailed[status+data_pedido]": lambda: (
+            pedido_service.get_all_detailed(
+                session,
+                status=StatusPedido(pedido.status),
+                data_pedido=pedido.data_pedido,
+                limit=50,
+            )
+        ),
+        "pedidos.get_all_detailed[status+total]": lambda: pedido_service.get_all_detailed(
+            session,
+            status=StatusPedido.EM_PRODUCAO,
+            min_total=pedido.total,
+            max_total=pedido.total * 2,
+            limit=50,
+        ),
+        "pedidos.update_and_recalculate": lambda: pedido_service.update_and_recalculate(
+            session,
+            pedido_service.get_by_id_detailed(session, pedido_itens),
+            PedidoUpdate(status=StatusPedido.CONCLUIDO, observacoes="Plano de consultas"),
+        ),
+        "pedidos.update_item": lambda: pedido_service.update_item(
+            session, pedido_itens, produto_item, ItemPedidoUpdate(quantidade=3)
+        ),
+        "pedidos.apply_item_operations": lambda: pedido_service.apply_item_operations(
+            session,
+            pedido_itens,
+            [OperacaoItem(acao="atualizar", produto_id=produto_item, quantidade=2)],
+        ),
+        "pedidos.remove_item": lambda: pedido_service.remove_item(
+            session, pedido_itens, produto_item
+        ),
+        "pedidos.delete": lambda: pedido_service.delete(session, pedido_excluido),
+    }
+
+
+def _explicar(engine: Engine, statement: str, parametros: Any) -> list[str]:
+    """Detalhes do plano (uma linha por passo). Usa uma conexão DBAPI, fora dos eventos."""
+    conexao = engine.raw_connection()
+    try:
+        cursor = conexao.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parametros)
+        return [linha[3] for linha in cursor.fetchall()]
+    finally:
+        conexao.close()
+
+
+def _leituras_completas(statement: str, plano: list[str]) -> set[str]:
+    """Tabelas grandes lidas inteiras: 'SCAN tabela' sem índice (nem tabela virtual do FTS)."""
+    # Sem filtro, as linhas saem na ordem da varredura e a leitura para ao completar o LIMIT
+    if (
+        _LIMIT_FINAL.search(statement)
+        and not _WHERE.search(statement)
+        and not any("TEMP B-TREE" in d for d in plano)
+    ):
+        return set()
+
+    tabelas = set()
+    for detalhe in plano:
+        encontrado = _SCAN.match(detalhe)
+        if not encontrado or "USING" in encontrado[2] or "VIRTUAL TABLE" in encontrado[2]:
+            continue
+        tabela = _ALIAS.sub("", encontrado[1])
+        if tabela in TABELAS_GRANDES:
+            tabelas.add(tabela)
+    return tabelas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Planos de execução das queries dos serviços")
+    parser.add_argument(
+        "--escala", type=float, default=0.01, help="Fração dos volumes padrão"
+    )
+    parser.add_argument("--filtro", help="Confere só os cenários que contêm este texto")
+    parser.add_argument(
+        "--detalhes", action="store_true", help="Mostra o plano de todas as queries"
+    )
+    args = parser.parse_args()
+
+    falhas = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = copiar_banco(args.escala, Path(pasta) / "bench.db")
+
+        capturadas: list[tuple[str, Any]] = []
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def capturar(_conn, _cursor, statement, parametros, _context, executemany):
+            comando = statement.lstrip().split(None, 1)[0].upper()
+            if not executemany and comando in ("SELECT", "WITH", "UPDATE", "DELETE"):
+                capturadas.append((statement, parametros))
+
+        with Session(engine) as session:
+            cenarios = {
+                nome: func
+                for nome, (func, _) in _benchmarks(session, args.escala, Path(pasta)).items()
+                if not nome.startswith("imagem.")
+            }
+            cenarios.update(_cenarios_extras(session))
+
+            for nome, func in cenarios.items():
+                if args.filtro and args.filtro not in nome:
+                    continue
+
+                capturadas.clear()
+                func()
+                session.expunge_all()
+
+                esperadas = LEITURAS_ESPERADAS.get(nome, {})
+                problemas = []
+                vistas = set()
+                for statement, parametros in capturadas:
+                    if statement in vistas:
+                        continue
+                    vistas.add(statement)
+
+                    plano = _explicar(engine, statement, parametros)
+                    lidas = _leituras_completas(statement, plano) - esperadas.keys()
+                    if lidas:
+                        problemas.append((statement, plano, lidas))
+                    elif args.detalhes:
+                        print(f"\n[{nome}] {' '.join(statement.split())[:150]}")
+                        for detalhe in plano:
+                            print(f"    {detalhe}")
+
+                situacao = "FALHA" if problemas else "ok"
+                print(f"{nome:<45} {len(vistas):>3} queries  {situacao}")
+                for statement, plano, lidas in problemas:
+                    falhas += 1
+                    print(f"    Lê inteira: {', '.join(sorted(lidas))}")
+                    print(f"    {' '.join(statement.split())[:300]}")
+                    for detalhe in plano:
+                        print(f"        {detalhe}")
+
+        engine.dispose()
+
+    if falhas:
+        print(f"\n{falhas} queries lendo tabelas grandes inteiras.")
+        sys.exit(1)
+    print("\nNenhuma query lê uma tabela grande inteira.")
+
+
+if __name__ == "__main__":
+    main()
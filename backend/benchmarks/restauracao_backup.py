@@ -0,0 +1,158 @@
+"""
+Regressão da restauração de backups feitos por versões anteriores.
+
+Cria um banco atual vazio e um backup com o esquema da primeira versão (sem as colunas
+desnormalizadas, sem os resumos do dashboard e sem os índices de busca), restaura esse
+backup pelo BackupService e lê as rotas que dependem do esquema atual. Falha quando
+alguma responde com erro ou não encontra os dados do backup.
+
+Uso (dentro da pasta backend, requer o grupo de dependências 'dev'):
+    python -m benchmarks.restauracao_backup
+"""
+
+import sqlite3
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, create_engine
+
+import app.services.backup_service as modulo_backup
+from app.config import Banco, create_db_and_tables, get_banco, get_session
+from app.main import app
+from app.services.backup_service import backup_service
+from app.utils.cache import response_cache
+
+NOME_BACKUP = "backup_2025-01-02_10-00-00.db"
+
+# Tabelas como eram criadas antes das migrações (só as colunas usadas aqui importam)
+ESQUEMA_ORIGINAL = """
+CREATE TABLE cliente (
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    nome VARCHAR NOT NULL, telefone VARCHAR(20), email VARCHAR(100),
+    data_nascimento DATE, observacoes VARCHAR, id INTEGER NOT NULL,
+    PRIMARY KEY (id), UNIQUE (email)
+);
+CREATE INDEX ix_cliente_nome ON cliente (nome);
+CREATE TABLE produto (
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    nome VARCHAR NOT NULL, descricao VARCHAR, preco_base NUMERIC(10, 2) NOT NULL,
+    unidade_medida VARCHAR(20), id INTEGER NOT NULL, PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_produto_nome ON produto (nome);
+CREATE TABLE pedido (
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    data_pedido DATE NOT NULL, data_conclusao DATE, status VARCHAR NOT NULL,
+    observacoes VARCHAR, desconto NUMERIC(10, 2) NOT NULL, total NUMERIC(10, 2) NOT NULL,
+    cliente_id INTEGER NOT NULL, id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(cliente_id) REFERENCES cliente (id)
+);
+CREATE INDEX ix_pedido_status ON pedido (status);
+CREATE TABLE item_pedido (
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    quantidade INTEGER NOT NULL, preco_unitario NUMERIC(10, 2) NOT NULL,
+    nome_produto VARCHAR NOT NULL, caminho_arte VARCHAR, observacoes VARCHAR,
+    pedido_id INTEGER NOT NULL, produto_id INTEGER NOT NULL,
+    PRIMARY KEY (pedido_id, produto_id),
+    FOREIGN KEY(pedido_id) REFERENCES pedido (id),
+    FOREIGN KEY(produto_id) REFERENCES produto (id)
+);
+INSERT INTO cliente (id, nome, telefone, data_nascimento)
+    VALUES (1, 'Cliente do Backup Antigo', '+5511912345678', '1990-07-15');
+INSERT INTO produto (id, nome, preco_base) VALUES (1, 'Caneca', 25), (2, 'Camiseta', 40);
+INSERT INTO pedido (id, data_pedido, status, desconto, total, cliente_id)
+    VALUES (1, '2025-01-02', 'Em Produção', 0, 90, 1);
+INSERT INTO item_pedido (quantidade, preco_unitario, nome_produto, pedido_id, produto_id)
+    VALUES (2, 25, 'Caneca', 1, 1), (1, 40, 'Camiseta', 1, 2);
+"""
+
+# Rota lida depois da restauração e o que a resposta precisa trazer do backup
+VERIFICACOES: dict[str, Callable[[Any], bool]] = {
+    "/pedidos/": lambda corpo: corpo["dados"][0]["qtd_itens"] == 2,
+    "/pedidos/?incluir_itens=false": lambda corpo: corpo["dados"][0]["subtotal"] == "90.00",
+    "/dashboard/": lambda corpo: corpo["status"]["emProducao"] == 1,
+    "/dashboard/series?inicio=2025-01-01&fim=2025-01-03": lambda corpo: (
+        sum(ponto["pedidos"] for ponto in corpo["pontos"]) == 1
+    ),
+    "/clientes/": lambda corpo: corpo["total"] == 1,
+    "/clientes/?q=antigo": lambda corpo: corpo["total"] == 1,
+}
+
+
+def main() -> None:
+    falhas = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        pasta_backups = Path(pasta) / "backups"
+        pasta_backups.mkdir()
+
+        conexao = sqlite3.connect(pasta_backups / NOME_BACKUP)
+        conexao.executescript(ESQUEMA_ORIGINAL)
+        conexao.close()
+
+        banco_atual = Path(pasta) / "gestor.db"
+        engine = create_engine(
+            f"sqlite:///{banco_atual}", connect_args={"check_same_thread": False}
+        )
+        create_db_and_tables(engine)
+
+        # O serviço trabalha sobre o banco e a pasta de backups temporários
+        for nome, valor in {
+            "BACKUP_DIR": pasta_backups,
+            "ULTIMO_BACKUP": pasta_backups / "ultimo_backup.json",
+            "VERIFICACOES": pasta_backups / "verificacoes.json",
+            "db_path": banco_atual,
+            "engine": engine,
+            "async_engine": None,
+        }.items():
+            setattr(modulo_backup, nome, valor)
+
+        print(f"Restaurado: {backup_service.restore_backup(NOME_BACKUP)}")
+
+        def get_bench_session():
+            with Session(engine, expire_on_commit=False) as session:
+                yield session
+
+        async def get_bench_banco():
+            banco = Banco(engine, None)
+            try:
+                yield banco
+            finally:
+                await banco.close()
+
+        app.dependency_overrides[get_session] = get_bench_session
+        app.dependency_overrides[get_banco] = get_bench_banco
+        response_cache.clear()
+        # Erros do banco viram respostas 500 em vez de interromper a verificação
+        cliente = TestClient(app, raise_server_exceptions=False)
+
+        for rota, conferir in VERIFICACOES.items():
+            resposta = cliente.get(rota)
+            problema = None
+            if not resposta.is_success:
+                problema = f"status {resposta.status_code}: {resposta.text[:200]}"
+            elif not conferir(resposta.json()):
+                problema = f"dados do backup ausentes: {resposta.text[:200]}"
+
+            print(f"{rota:<55} {'FALHA' if problema else 'ok'}")
+            if problema:
+                falhas += 1
+                print(f"    {problema}")
+
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    if falhas:
+        print(f"\n{falhas} rotas com erro depois de restaurar um backup antigo.")
+        sys.exit(1)
+    print("\nO backup antigo foi restaurado com o esquema atual.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+// Gera versões pré-comprimidas (.br e .gz) dos arquivos de texto do build.
+// O backend escolhe a versão conforme o Accept-Encoding do navegador, sem comprimir
+// nada durante as requisições. Roda automaticamente depois do 'vite build'.
+import { readdirSync, readFileSync, statSync, writeFileSync } from "node:fs";
+import path from "node:path";
+import { brotliCompressSync, constants, gzipSync } from "node:zlib";
+
+const DIST = path.resolve(import.meta.dirname, "..", "dist");
+const EXTENSOES = new Set([".html", ".js", ".css", ".svg", ".json", ".txt", ".map", ".ico"]);
+const TAMANHO_MINIMO = 1024; // Arquivos menores não compensam
+
+function arquivos(pasta) {
+  return readdirSync(pasta, { withFileTypes: true }).flatMap((entrada) => {
+    const caminho = path.join(pasta, entrada.name);
+    return entrada.isDirectory() ? arquivos(caminho) : [caminho];
+  });
+}
+
+let total = 0;
+for (const arquivo of arquivos(DIST)) {
+  if (!EXTENSOES.has(path.extname(arquivo)) || statSync(arquivo).size < TAMANHO_MINIMO) {
+    continue;
+  }
+
+  const conteudo = readFileSync(arquivo);
+  const versoes = {
+    ".br": brotliCompressSync(conteudo, {
+      params: { [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY },
+    }),
+    ".gz": gzipSync(conteudo, { level: 9 }),
+  };
+
+  for (const [extensao, comprimido] of Object.entries(versoes)) {
+    // Só mantém a versão comprimida se ela for realmente menor
+    if (comprimido.length < conteudo.length) {
+      writeFileSync(arquivo + extensao, comprimido);
+      total++;
+    }
+  }
+}
+
+console.log(`${total} arquivos pré-comprimidos em ${path.relative(process.cwd(), DIST)}`);
@@ -1,9 +1,17 @@
 import { useState } from "react";
 import { apiBase } from "@/services/apiBase";
+import { waitForJob } from "@/services/jobs.service";
 import { Button, CircularProgress } from "@mui/material";
 import { CloudSync } from "@mui/icons-material"; // Um ícone bonito de nuvem
 import toast from "react-hot-toast";
 
+// O backup roda em segundo plano no backend; consulta a tarefa até terminar
+async function runBackup() {
+  const { job } = await apiBase.post("backup/", {});
+  const resultado = await waitForJob(job.id);
+  return `Backup '${resultado.arquivo}' salvo com sucesso!`;
+}
+
 export default function BackupButton() {
   const [isBackingUp, setIsBackingUp] = useState(false);
 
@@ -11,10 +19,10 @@ export default function BackupButton() {
     setIsBackingUp(true);
     
     await toast.promise(
-      apiBase.post("backup/", {}),
+      runBackup(),
       {
         loading: "Gerando backup...",
-        success: (response: any) => response.success || "Backup salvo com sucesso!",
+        success: (message: string) => message || "Backup salvo com sucesso!",
         error: (err: any) => err.detail || "Erro ao gerar backup.",
       }
     );
@@ -1,7 +1,7 @@
 import { Link } from "react-router";
 import { formatNumber } from "@/utils/format.utils";
 import { statusStyles } from "@/utils/constants";
-import { PedidoPublic } from "@/types/pedido.types";
+import { PedidoResumoPublic } from "@/types/pedido.types";
 
 import {
   Table,
@@ -17,7 +17,7 @@ import { ArrowForward } from "@mui/icons-material";
 import FormSection from "@/components/FormSection";
 
 interface RecentOrdersWidgetProps {
-  pedidos: PedidoPublic[];
+  pedidos: PedidoResumoPublic[];
 }
 
 function RecentOrdersWidget({ pedidos }: RecentOrdersWidgetProps) {
@@ -85,6 +85,10 @@ function ItemTableRow({
   const imgUrl = item.caminho_arte?.startsWith("blob:")
     ? item.caminho_arte
     : `${API_URL}${item.caminho_arte}`;
+  // Usa a miniatura na prévia quando o backend já gerou as versões reduzidas
+  const thumbUrl = item.miniaturas?.["128"]
+    ? `${API_URL}${item.miniaturas["128"]}`
+    : imgUrl;
 
   return (
     <TableRow>
@@ -173,7 +177,13 @@ function ItemTableRow({
                 <img
                   loading="lazy"
                   decoding="async"
-                  src={imgUrl}
+                  src={thumbUrl}
+                  onError={(e) => {
+                    // Arte sem miniatura no servidor: mostra a versão completa
+                    if (e.currentTarget.dataset.fallback) return;
+                    e.currentTarget.dataset.fallback = "1";
+                    e.currentTarget.src = imgUrl;
+                  }}
                   className="w-16 h-16 object-cover rounded-lg shadow-sm border-2 border-transparent hover:border-pink-400 transition-all cursor-zoom-in"
                 />
               </Tooltip>
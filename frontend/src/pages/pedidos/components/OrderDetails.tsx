@@ -110,6 +110,9 @@ function OrderDetails({ pedido, onClose, onEdit }: OrderDetailsProps) {
           <div className="flex flex-col">
             {pedido.itens.map((item, index) => {
               const imgUrl = `${API_URL}${item.caminho_arte}`;
+              const thumbUrl = item.miniaturas?.["128"]
+                ? `${API_URL}${item.miniaturas["128"]}`
+                : imgUrl;
               const nomeItem = item.nome_produto;
               return (
                 <div
@@ -129,7 +132,13 @@ function OrderDetails({ pedido, onClose, onEdit }: OrderDetailsProps) {
                             <img
                               loading="lazy"
                               decoding="async"
-                              src={imgUrl}
+                              src={thumbUrl}
+                              onError={(e) => {
+                                // Arte sem miniatura no servidor: mostra a versão completa
+                                if (e.currentTarget.dataset.fallback) return;
+                                e.currentTarget.dataset.fallback = "1";
+                                e.currentTarget.src = imgUrl;
+                              }}
                               className="w-16 h-16 object-cover rounded-lg shadow-sm border-2 border-transparent hover:border-pink-400 transition-all cursor-zoom-in"
                             />
                           </Tooltip>
@@ -169,11 +169,17 @@ export function useOrderManager(
     if (isEditing) {
       const fd = new FormData();
       fd.append("file", file);
-      fetcher.submit(fd, {
-        method: "post",
-        action: `/pedidos/${defaultValues?.id}/itens/${produto_id}/upload-arte`,
-        encType: "multipart/form-data",
-      });
+
+      // A action espera a conversão da arte em segundo plano (/jobs/{id}); depois o
+      // pedido é recarregado e o item passa a mostrar a arte final
+      const toastId = toast.loading("Processando a arte...");
+      fetcher
+        .submit(fd, {
+          method: "post",
+          action: `/pedidos/${defaultValues?.id}/itens/${produto_id}/upload-arte`,
+          encType: "multipart/form-data",
+        })
+        .finally(() => toast.dismiss(toastId));
     } else {
       const previewUrl = URL.createObjectURL(file);
       setLocalItems((prev) => {
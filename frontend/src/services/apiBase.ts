@@ -27,6 +27,21 @@ async function handleResponse(response: Response): Promise<any> {
   return response.json();
 }
 
+function sendPost(path: string, data: any): Promise<Response> {
+  // Verifica se os dados são um FormData
+  const isFormData = data instanceof FormData;
+
+  return fetch(`${API_URL}/${path}`, {
+    method: "POST",
+    // Se for FormData, não envia headers, caso contrário envia
+    ...(isFormData
+      ? {}
+      : { headers: { "Content-Type": "application/json" } }),
+    // Se for FormData, envia o objeto direto. Se não, stringify.
+    body: isFormData ? data : JSON.stringify(data),
+  });
+}
+
 export const apiBase = {
   get: async <T = any>(path: string): Promise<T> => {
     const response = await fetch(`${API_URL}/${path}`);
@@ -34,19 +49,16 @@ export const apiBase = {
   },
 
   post: async <T = any>(path: string, data: any): Promise<T> => {
-    // Verifica se os dados são um FormData
-    const isFormData = data instanceof FormData;
+    return handleResponse(await sendPost(path, data));
+  },
 
-    const response = await fetch(`${API_URL}/${path}`, {
-      method: "POST",
-      // Se for FormData, não envia headers, caso contrário envia
-      ...(isFormData
-        ? {}
-        : { headers: { "Content-Type": "application/json" } }),
-      // Se for FormData, envia o objeto direto. Se não, stringify.
-      body: isFormData ? data : JSON.stringify(data),
-    });
-    return handleResponse(response);
+  // Igual ao post, mas devolve também os headers (ex: 'X-Job-Id' das tarefas em segundo plano)
+  postWithHeaders: async <T = any>(
+    path: string,
+    data: any,
+  ): Promise<{ data: T; headers: Headers }> => {
+    const response = await sendPost(path, data);
+    return { data: await handleResponse(response), headers: response.headers };
   },
 
   patch: async <T = any>(path: string, data: any): Promise<T> => {
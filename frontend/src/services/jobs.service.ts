@@ -0,0 +1,17 @@
+import { apiBase } from "./apiBase";
+import { JobPublic } from "../types/common.types";
+
+// Consulta a tarefa em segundo plano até terminar e devolve o resultado
+export async function waitForJob(jobId: string, intervalo = 500) {
+  while (true) {
+    await new Promise((resolve) => setTimeout(resolve, intervalo));
+    const job = await apiBase.get<JobPublic>(`jobs/${jobId}`);
+
+    if (job.status === "concluido") {
+      return job.resultado;
+    }
+    if (job.status === "erro") {
+      throw { detail: job.erro };
+    }
+  }
+}
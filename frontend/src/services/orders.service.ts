@@ -1,5 +1,6 @@
 import { createCrudService } from "./factory";
 import { apiBase } from "./apiBase";
+import { waitForJob } from "./jobs.service";
 import {
   PedidoPublic,
   PedidoCreate,
@@ -37,15 +38,22 @@ export const ordersService = {
     return response;
   },
 
+  // A conversão da arte roda em segundo plano: espera a tarefa terminar e
+  // devolve o pedido recarregado, já com a arte final no item
   uploadArt: async (
     pedido_id: number,
     produto_id: number,
     formData: FormData,
-  ) => {
-    const response = await apiBase.post(
+  ): Promise<PedidoPublic> => {
+    const { data, headers } = await apiBase.postWithHeaders<PedidoPublic>(
       `${basePath}/${pedido_id}/itens/${produto_id}/upload-arte`,
       formData,
     );
-    return response;
+
+    const jobId = headers.get("X-Job-Id");
+    if (!jobId) return data;
+
+    await waitForJob(jobId);
+    return apiBase.get<PedidoPublic>(`${basePath}/${pedido_id}`);
   },
 };
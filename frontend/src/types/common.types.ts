@@ -3,3 +3,13 @@ export interface PaginatedResponse<T> {
   dados: T[];
   total: number;
 }
+
+// Tarefa em segundo plano do backend (consultada em /jobs/{id})
+export interface JobPublic {
+  id: string;
+  tipo: string;
+  status: "pendente" | "processando" | "concluido" | "erro";
+  progresso: number;
+  resultado: any;
+  erro: string | null;
+}
@@ -1,5 +1,5 @@
 import { ClientePublic } from "./cliente.types";
-import { PedidoPublic } from "./pedido.types";
+import { PedidoResumoPublic } from "./pedido.types";
 
 export interface DashboardData {
   status: {
@@ -12,6 +12,6 @@ export interface DashboardData {
     aguardandoArte: number;
     pronto: number;
   };
-  pedidosRecentes: PedidoPublic[];
+  pedidosRecentes: PedidoResumoPublic[];
   aniversariantes: ClientePublic[];
 }
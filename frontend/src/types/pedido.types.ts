@@ -38,6 +38,8 @@ export interface ItemPedidoPublic {
   preco_unitario: number;
   observacoes?: string | null;
   caminho_arte?: string | null;
+  // Versões reduzidas da arte, por tamanho ("128", "512" e "full")
+  miniaturas?: Record<string, string> | null;
   valor_total?: number;
 }
 
@@ -60,14 +62,23 @@ export interface PedidoCreate {
   desconto?: number;
 }
 
-export interface PedidoPublic extends PedidoBase {
+// Pedido sem os itens (listagens com ?incluir_itens=false e dashboard)
+export interface PedidoResumoPublic extends PedidoBase {
   id: number;
   cliente?: ClientePublic | null;
+  qtd_itens: number;
+  subtotal: number;
+}
+
+export interface PedidoPublic extends PedidoResumoPublic {
   itens: ItemPedidoPublic[];
   produtos: ProdutoPublic[];
 }
 
-export type PedidoPaginated = PaginatedResponse<PedidoPublic>;
+// 'proximo_cursor' só vem preenchido na paginação por cursor (?cursor=)
+export type PedidoPaginated = PaginatedResponse<PedidoPublic> & {
+  proximo_cursor?: string | null;
+};
 
 export interface PedidoUpdate extends Partial<PedidoBase> {
   //